@@ -1,7 +1,22 @@
 import os
-import unicodedata
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from catalogo import registrar_reporte, resolver_base
+import series  # noqa: F401  (suscribe la actualización de series al registro de reportes)
+import busqueda  # noqa: F401  (suscribe el índice de búsqueda al registro de reportes)
+import arranque  # noqa: F401  (suscribe la instantánea de arranque al registro de reportes)
+from reportes import (
+    EscritorReporte, ResumenParcial, formatos_configurados, guardar_reporte, guardar_resumen, iterar_reporte,
+)
+import matriz
+from motor_clasificacion import formatear_evidencia, normalizar as _normalizar
+from memo_clasificacion import obtener_memo
+from procesos_vistos import ARRASTRADO, clave_proceso, hash_contenido, obtener_indice
+import metricas
 
 # --- CONFIGURACIÓN DE RUTAS DINÁMICAS ---
 BASE_PATH = os.getcwd()
@@ -21,54 +36,49 @@ for d in [DATA_DIR, FALLBACK_DIR]:
         print(f"⚠️ No se pudo crear {d}: {e}")
 
 # --- MATRIZ TEÓRICA - Ph.D. Vicente Humberto Monteverde ---
-MATRIZ_TEORICA = {
-    "Privatización / Concesión": {
-        "keywords": ["concesion", "privatizacion", "venta de pliegos", "subvaluacion"],
-        "transferencia": "Estado a Privados",
-        "peso": 9.0,
-    },
-    "Obra Pública / Contratos": {
-        "keywords": ["obra publica", "licitacion", "contratacion directa", "sobreprecio", "redeterminacion"],
-        "transferencia": "Estado a Empresas",
-        "peso": 8.5,
-    },
-    "Tarifas Servicios Públicos": {
-        "keywords": ["cuadro tarifario", "aumento de tarifa", "revision tarifaria", "peaje"],
-        "transferencia": "Usuarios a Concesionarias",
-        "peso": 7.5,
-    },
-    "Precios de Consumo Regulados": {
-        "keywords": ["precios justos", "canasta basica", "viveres", "alimento"],
-        "transferencia": "Consumidores a Productores",
-        "peso": 6.5,
-    },
-    "Salarios y Paritarias": {
-        "keywords": ["paritaria", "salario minimo", "ajuste salarial", "convenio colectivo"],
-        "transferencia": "Asalariados a Empleadores",
-        "peso": 5.5,
-    },
-    "Jubilaciones / Pensiones": {
-        "keywords": ["movilidad jubilatoria", "haber minimo", "anses", "ajuste previsional"],
-        "transferencia": "Jubilados al Estado",
-        "peso": 10.0,
-    },
-    "Traslado de Impuestos": {
-        "keywords": ["iva", "ingresos brutos", "doble imposicion", "presion tributaria"],
-        "transferencia": "Contribuyentes al Estado",
-        "peso": 9.5,
-    },
-}
+# Se lee de matriz_teorica.json (ver matriz.py) y se recarga si el archivo cambia.
+# Los nombres del módulo reflejan la versión vigente: se actualizan en matriz_vigente().
+MATRIZ = matriz.vigente()
+MATRIZ_TEORICA = MATRIZ.categorias
+
+# Huella de la matriz: cambia si se modifica cualquier keyword, peso o transferencia
+VERSION_MATRIZ = MATRIZ.version
+
+# Autómata compilado una sola vez a partir de la matriz
+AUTOMATA_MATRIZ = MATRIZ.automata
+
+# Nombre anterior de las reglas (categoría -> keywords), usado por test_auditoria.py
+REGLAS_CLASIFICACION = MATRIZ.reglas
+
+
+def matriz_vigente():
+    """Matriz actual (recargada si cambió matriz_teorica.json)"""
+    global MATRIZ, MATRIZ_TEORICA, VERSION_MATRIZ, AUTOMATA_MATRIZ, REGLAS_CLASIFICACION
+    actual = matriz.vigente()
+    if actual is not MATRIZ:
+        MATRIZ, MATRIZ_TEORICA, VERSION_MATRIZ = actual, actual.categorias, actual.version
+        AUTOMATA_MATRIZ, REGLAS_CLASIFICACION = actual.automata, actual.reglas
+    return actual
 
 
 def limpiar_texto_curado(texto):
     """Normaliza texto eliminando acentos y convirtiendo a minúsculas"""
     if not isinstance(texto, str):
         return ""
-    texto = texto.lower()
-    return "".join(
-        c for c in unicodedata.normalize("NFD", texto)
-        if unicodedata.category(c) != "Mn"
+    return _normalizar(texto)
+
+
+def normalizar_textos(serie):
+    """
+    Versión por columna de limpiar_texto_curado: normaliza cada valor distinto
+    una sola vez y reconstruye la serie con los códigos de factorize.
+    """
+    codigos, unicos = pd.factorize(serie)
+    limpios = np.array(
+        [limpiar_texto_curado(t) for t in unicos] + [""],  # el último cubre los NaN (código -1)
+        dtype=object,
     )
+    return pd.Series(limpios[codigos], index=serie.index, dtype=object)
 
 
 def evaluar_riesgo(score):
@@ -80,64 +90,300 @@ def evaluar_riesgo(score):
     return "Bajo"
 
 
-def analizar_boletin(df, directorio_destino=None):
+def _resultado_serializable(resultado):
+    """Lo que se guarda de una clasificación (sin objetos Coincidencia) para reutilizarla"""
+    return {
+        "categoria": resultado["categoria"],
+        "categorias": resultado["categorias"],
+        "palabras": resultado["palabras"],
+        "conteo": resultado["conteo"],
+        "evidencia": formatear_evidencia(resultado["coincidencias"]),
+    }
+
+
+def _fin_de_etapa(etapa, inicio):
+    """Registra la duración de una etapa de analizar_boletin y devuelve el inicio de la siguiente"""
+    ahora = time.perf_counter()
+    metricas.ETAPA_ANALISIS.observar(ahora - inicio, etapa=etapa)
+    return ahora
+
+
+# Guardado en segundo plano: un solo hilo, así los reportes se escriben en orden
+_persistencia = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistencia")
+_pendientes = set()
+_pendientes_lock = threading.Lock()
+
+
+def _en_segundo_plano(funcion):
+    futuro = _persistencia.submit(funcion)
+    with _pendientes_lock:
+        _pendientes.add(futuro)
+
+    def _terminado(f):
+        with _pendientes_lock:
+            _pendientes.discard(f)
+        if f.exception() is not None:
+            print(f"❌ Error al guardar el reporte en segundo plano: {f.exception()}")
+        elif f.result() is None:
+            print("❌ El reporte no se pudo guardar en ningún formato")
+
+    futuro.add_done_callback(_terminado)
+    return futuro
+
+
+def esperar_persistencia(timeout=None):
+    """Espera a que terminen los guardados en segundo plano. True si no queda ninguno pendiente."""
+    with _pendientes_lock:
+        pendientes = list(_pendientes)
+    _, sin_terminar = wait(pendientes, timeout=timeout)
+    return not sin_terminar
+
+
+# Columnas del reporte final
+COLUMNAS_REPORTE = [
+    "fecha", "nro_proceso", "detalle", "tipo_proceso",
+    "tipo_decision", "transferencia",
+    "indice_fenomeno_corruptivo", "nivel_riesgo_teorico", "link", "fuente",
+    "categorias_detectadas", "palabras_clave_detectadas", "evidencia_xai",
+    "estado_proceso", "version_matriz",
+]
+
+
+def _directorio_guardado(directorio_destino):
+    # Prioridad: directorio_destino > DATA_DIR > FALLBACK_DIR (/tmp)
+    for candidate in [directorio_destino, DATA_DIR, FALLBACK_DIR]:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    os.makedirs(FALLBACK_DIR, exist_ok=True)
+    return FALLBACK_DIR
+
+
+def _ruta_base(save_dir):
+    fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(save_dir, f"reporte_fenomenos_{fecha_str}")
+
+
+def clasificar_filas(df, indice=None, matriz_actual=None, memo=None):
+    """
+    Normaliza y clasifica df en el lugar (agrega texto_clean, estado_proceso,
+    version_matriz y las columnas de la matriz). indice: IndiceProcesos para
+    reutilizar clasificaciones (None = clasificar todo). matriz_actual: la
+    versión a aplicar (por defecto la vigente). memo: MemoClasificacion con
+    resultados de textos ya vistos. Devuelve (claves, hashes, clasificación
+    por fila, conteo por categoría {categoria: [filas, coincidencias]}).
+    """
+    matriz_actual = matriz_actual or matriz_vigente()
+    categorias = matriz_actual.categorias
+    # 1. Limpieza y preparación
+    inicio = time.perf_counter()
+    metricas.FILAS_ANALIZADAS.inc(len(df))
+    df["texto_clean"] = normalizar_textos(df["detalle"])
+    inicio = _fin_de_etapa("normalizacion", inicio)
+
+    # Procesos ya vistos (nro_proceso + hash del detalle)
+    nros = df["nro_proceso"] if "nro_proceso" in df.columns else [None] * len(df)
+    hashes = [hash_contenido(d) for d in df["detalle"]]
+    claves = [clave_proceso(n, h) for n, h in zip(nros, hashes)]
+    if indice is not None:
+        estados, previas = indice.revisar(claves, hashes, matriz_actual.version)
+    else:
+        estados, previas = ["nuevo"] * len(df), [None] * len(df)
+    df["estado_proceso"] = estados
+
+    # 2. Aplicación de la Matriz Teórica: una sola pasada del autómata por texto distinto,
+    # salvo los textos cuya clasificación ya está en el índice o en el memo
+    frecuencias = df["texto_clean"].value_counts()
+    resultados = {}
+    for texto, previa in zip(df["texto_clean"], previas):
+        if previa is not None:
+            resultados.setdefault(texto, previa)
+    reutilizados = len(resultados)
+    if memo is not None:
+        pendientes = [t for t in frecuencias.index if t not in resultados]
+        resultados.update(memo.obtener(pendientes, matriz_actual.version))
+    memorizados = len(resultados) - reutilizados
+    nuevos = {}
+    for texto in frecuencias.index:
+        if texto not in resultados:
+            nuevos[texto] = _resultado_serializable(matriz_actual.automata.clasificar(texto))
+    resultados.update(nuevos)
+    if memo is not None:
+        memo.guardar(nuevos, matriz_actual.version)
+    metricas.TEXTOS_CLASIFICADOS.inc(len(nuevos), origen="automata")
+    metricas.TEXTOS_CLASIFICADOS.inc(reutilizados, origen="reutilizado")
+    metricas.TEXTOS_CLASIFICADOS.inc(memorizados, origen="memo")
+    if indice is not None:
+        arrastrados = estados.count(ARRASTRADO)
+        print(f"🔁 Procesos: {len(df) - arrastrados} nuevos/modificados, {arrastrados} arrastrados "
+              f"({len(nuevos)} textos clasificados, {reutilizados} reutilizados, {memorizados} del memo)")
+
+    def _columna(funcion):
+        return df["texto_clean"].map({t: funcion(r) for t, r in resultados.items()})
+
+    df["tipo_decision"] = _columna(lambda r: r["categoria"] or matriz.SIN_CATEGORIA)
+    df["transferencia"] = _columna(
+        lambda r: categorias[r["categoria"]]["transferencia"] if r["categoria"] else matriz.SIN_CATEGORIA
+    )
+    df["indice_fenomeno_corruptivo"] = _columna(
+        lambda r: float(categorias[r["categoria"]]["peso"]) if r["categoria"] else 0.0
+    ).astype(float)
+
+    # Columnas XAI: todas las categorías, palabras clave y posiciones que explican la decisión
+    df["categorias_detectadas"] = _columna(lambda r: "; ".join(r["categorias"]))
+    df["palabras_clave_detectadas"] = _columna(lambda r: "; ".join(r["palabras"]))
+    df["evidencia_xai"] = _columna(lambda r: r["evidencia"])
+
+    # Conteo por categoría (filas con al menos una coincidencia y coincidencias totales)
+    conteo = {c: [0, 0] for c in categorias}
+    for texto, r in resultados.items():
+        for categoria, n in r["conteo"].items():
+            conteo[categoria][0] += int(frecuencias[texto])
+            conteo[categoria][1] += int(frecuencias[texto]) * n
+
+    df["nivel_riesgo_teorico"] = df["indice_fenomeno_corruptivo"].apply(evaluar_riesgo)
+    df["version_matriz"] = matriz_actual.version
+    _fin_de_etapa("clasificacion", inicio)
+    return claves, hashes, [resultados[t] for t in df["texto_clean"]], conteo
+
+
+def _tabla_coincidencias(conteo):
+    return pd.DataFrame([
+        {"categoria": c, "filas": filas, "coincidencias": coincidencias}
+        for c, (filas, coincidencias) in conteo.items()
+    ])
+
+
+def analizar_boletin(df, directorio_destino=None, incremental=True, formatos=None, en_segundo_plano=False):
     """
     Aplica la matriz de Monteverde y guarda el reporte resultante.
+    Con incremental=True sólo se clasifican los procesos nuevos o modificados;
+    el resto reutiliza la clasificación guardada en el índice de procesos vistos,
+    y los textos ya clasificados alguna vez salen del memo de clasificaciones.
+    formatos: archivos a escribir (por defecto FORMATOS_REPORTE, p.ej. "xlsx,parquet").
+    Con en_segundo_plano=True se devuelve el resultado apenas se clasifica y el
+    reporte se guarda en otro hilo: en lugar de la ruta se devuelve el Future
+    del guardado, cuyo resultado es la ruta real (o None si no se pudo escribir
+    en ningún formato); esperar_persistencia() espera a todos.
+    Devuelve (df clasificado, ruta del reporte, coincidencias por categoría).
+    Para entradas que no entran en memoria, ver analizar_por_bloques.
     """
     if df is None or df.empty:
         return pd.DataFrame(), None, pd.DataFrame()
+    formatos = formatos_configurados(formatos)
 
     df = df.copy()
+    save_dir = _directorio_guardado(directorio_destino)
+    base = resolver_base(save_dir, DATA_DIR)
+    indice = obtener_indice(base) if incremental else None
+    memo = obtener_memo(base) if incremental else None
+    actual = matriz_vigente()
+    claves, hashes, clasificaciones, conteo = clasificar_filas(df, indice, actual, memo)
+    df_coincidencias = _tabla_coincidencias(conteo)
 
-    # 1. Limpieza y preparación
-    df["texto_clean"] = df["detalle"].apply(limpiar_texto_curado)
-    df["tipo_decision"] = "No identificado"
-    df["transferencia"] = "No identificado"
-    df["indice_fenomeno_corruptivo"] = 0.0
-
-    # 2. Aplicación de la Matriz Teórica
-    for categoria, info in MATRIZ_TEORICA.items():
-        pattern = "|".join(info["keywords"])
-        mask = df["texto_clean"].str.contains(pattern, na=False, regex=True)
-        df.loc[mask, "tipo_decision"] = categoria
-        df.loc[mask, "transferencia"] = info["transferencia"]
-        df.loc[mask, "indice_fenomeno_corruptivo"] = info["peso"]
+    # 3. Guardado
+    ruta_base = _ruta_base(save_dir)
+    df_export = df[[c for c in COLUMNAS_REPORTE if c in df.columns]]
 
-    df["nivel_riesgo_teorico"] = df["indice_fenomeno_corruptivo"].apply(evaluar_riesgo)
+    def _guardar():
+        inicio = time.perf_counter()
+        ruta = guardar_reporte(df_export, ruta_base, formatos)
+        if ruta:
+            # La versión se archiva junto a los reportes que la usan (la necesita la recalificación)
+            matriz.archivar(actual, base)
+            registrar_reporte(ruta, DATA_DIR, filas=len(df_export), df=df_export)
+            if indice is not None:
+                indice.actualizar(claves, hashes, clasificaciones, actual.version)
+        _fin_de_etapa("escritura", inicio)
+        return ruta
 
-    # 3. Determinar directorio de guardado
-    # Prioridad: directorio_destino > DATA_DIR > FALLBACK_DIR (/tmp)
-    for candidate in [directorio_destino, DATA_DIR, FALLBACK_DIR]:
-        if candidate and os.path.exists(candidate):
-            save_dir = candidate
-            break
-    else:
-        save_dir = FALLBACK_DIR
-        os.makedirs(save_dir, exist_ok=True)
+    if en_segundo_plano:
+        return df, _en_segundo_plano(_guardar), df_coincidencias
+    return df, _guardar(), df_coincidencias
 
-    fecha_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    nombre_base = f"reporte_fenomenos_{fecha_str}"
-    path_excel = os.path.join(save_dir, f"{nombre_base}.xlsx")
 
-    # Columnas deseadas para el reporte final
-    cols = [
-        "fecha", "nro_proceso", "detalle", "tipo_proceso",
-        "tipo_decision", "transferencia",
-        "indice_fenomeno_corruptivo", "nivel_riesgo_teorico", "link",
-    ]
-    df_export = df[[c for c in cols if c in df.columns]]
+def _columnas_entrada(bloque):
+    """Encabezados de archivos externos (p.ej. 'Fecha', 'Detalle' del BORA, con BOM) a minúsculas"""
+    bloque = bloque.rename(columns=lambda c: str(c).lstrip("\ufeff").strip().lower())
+    if "detalle" not in bloque.columns:
+        raise ValueError("La entrada no tiene columna 'detalle'")
+    return bloque
+
+
+def analizar_por_bloques(fuente, directorio_destino=None, incremental=True, formatos=None, filas_por_bloque=None):
+    """
+    Variante de analizar_boletin para entradas grandes. fuente es un iterable
+    de DataFrames o la ruta de un archivo (.csv, .xlsx, .parquet) que se lee
+    por bloques de filas_por_bloque. Cada bloque se clasifica, se agrega al
+    reporte (EscritorReporte) y se entrega: la memoria no depende del tamaño
+    de la entrada. Al agotarse, el generador devuelve (filas, ruta del
+    reporte, coincidencias por categoría); analizar_archivo lo recorre entero.
+    """
+    formatos = formatos_configurados(formatos)
+    if isinstance(fuente, (str, os.PathLike)):
+        fuente = iterar_reporte(os.fspath(fuente), filas_por_bloque=filas_por_bloque)
+    save_dir = _directorio_guardado(directorio_destino)
+    base = resolver_base(save_dir, DATA_DIR)
+    indice = obtener_indice(base) if incremental else None
+    memo = obtener_memo(base) if incremental else None
+    # Una sola versión de la matriz para todo el reporte, aunque se recargue a mitad de camino
+    actual = matriz_vigente()
+    conteo = {c: [0, 0] for c in actual.categorias}
+    resumen = ResumenParcial()
 
     try:
-        df_export.to_excel(path_excel, index=False, engine="openpyxl")
-        print(f"✅ Reporte generado: {path_excel}")
-    except Exception as e:
-        print(f"❌ Error al guardar Excel: {e}. Intentando CSV...")
-        path_excel = os.path.join(save_dir, f"{nombre_base}.csv")
+        with EscritorReporte(_ruta_base(save_dir), formatos) as escritor:
+            for bloque in fuente:
+                if bloque.empty:
+                    continue
+                bloque = _columnas_entrada(bloque)
+                claves, hashes, clasificaciones, conteo_bloque = clasificar_filas(bloque, indice, actual, memo)
+                for categoria, (filas, coincidencias) in conteo_bloque.items():
+                    conteo[categoria][0] += filas
+                    conteo[categoria][1] += coincidencias
+
+                inicio = time.perf_counter()
+                export = bloque[[c for c in COLUMNAS_REPORTE if c in bloque.columns]]
+                escritor.agregar(export)
+                resumen.agregar(export)
+                if indice is not None:
+                    # En memoria: el índice se guarda sólo si el reporte queda escrito
+                    indice.actualizar(claves, hashes, clasificaciones, actual.version, guardar=False)
+                _fin_de_etapa("escritura", inicio)
+                yield bloque
+            ruta = escritor.cerrar()
+    except BaseException:
+        if indice is not None:
+            indice.descartar_cambios()
+        raise
+
+    if ruta:
+        print(f"✅ Reporte generado: {ruta} ({escritor.filas} filas)")
+        guardar_resumen(resumen.resultado(), ruta)
+        matriz.archivar(actual, base)
+        # Sin df: búsqueda y series leen la copia columnar cuando la necesitan
+        registrar_reporte(ruta, DATA_DIR, filas=escritor.filas)
+        if indice is not None:
+            indice.guardar()
+    elif indice is not None:
+        indice.descartar_cambios()
+    return escritor.filas, ruta, _tabla_coincidencias(conteo)
+
+
+def analizar_archivo(fuente, directorio_destino=None, **opciones):
+    """Recorre analizar_por_bloques sin retener los bloques. Devuelve (filas, ruta, coincidencias)."""
+    bloques = analizar_por_bloques(fuente, directorio_destino, **opciones)
+    while True:
         try:
-            df_export.to_csv(path_excel, index=False)
-            print(f"✅ Reporte CSV generado: {path_excel}")
-        except Exception as e2:
-            print(f"❌ Error al guardar CSV: {e2}")
-            path_excel = None
+            next(bloques)
+        except StopIteration as fin:
+            return fin.value
+
+
+if __name__ == "__main__":
+    import sys
 
-    return df, path_excel, pd.DataFrame()
+    if len(sys.argv) < 2:
+        print("Uso: python analisis.py <archivo.csv|.xlsx|.parquet> [directorio_destino]")
+        sys.exit(1)
+    filas, ruta, _ = analizar_archivo(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"📊 {filas} filas analizadas -> {ruta}")
@@ -0,0 +1,217 @@
+"""
+Arranque en frío
+================
+
+En Railway el contenedor escala a cero y el primer pedido pagaba importar
+pandas, leer el último reporte y compilar las plantillas. Para acortarlo:
+
+- modulo_perezoso("pandas") devuelve un sustituto que importa el módulo
+  recién cuando se usa un atributo (main, reportes y filas_reporte lo usan);
+- cada vez que se registra el reporte más reciente se guarda una instantánea
+  en <datos>/arranque/: ultimo.json (entrada del catálogo + resumen) y
+  ultimo.arrow (Arrow IPC sin comprimir, se abre con mmap);
+- al arrancar, el resumen se restaura en el acto y un hilo importa pandas,
+  mapea la instantánea y precompila las plantillas.
+
+La instantánea vive junto a los datos: sólo sirve si se generó en el mismo
+árbol que lee el servidor. La imagen de Docker la genera al construirse
+(`python arranque.py /app/data`) a partir de los reportes versionados; si en
+producción se monta un volumen sobre /app/data, la que vale es la del volumen,
+que se crea con el primer reporte registrado ahí (o corriendo ese comando).
+
+Los tiempos de importación y del primer byte se informan por consola y en
+/metrics (monitor_arranque_*).
+"""
+
+import importlib
+import json
+import os
+import threading
+import time
+from catalogo import al_registrar
+import metricas
+
+DIRECTORIO_INSTANTANEA = "arranque"
+ARCHIVO_ENTRADA = "ultimo.json"
+ARCHIVO_TABLA = "ultimo.arrow"
+
+
+class _ModuloPerezoso:
+    """Importa el módulo real la primera vez que se pide un atributo"""
+
+    def __init__(self, nombre):
+        self._nombre = nombre
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        modulo = self._modulo
+        if modulo is None:
+            # import_module ya serializa importaciones concurrentes del mismo módulo
+            modulo = self._modulo = importlib.import_module(self._nombre)
+        return getattr(modulo, atributo)
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "sin cargar"
+        return f"<módulo perezoso {self._nombre} ({estado})>"
+
+
+def modulo_perezoso(nombre):
+    return _ModuloPerezoso(nombre)
+
+
+# ==========================================
+# INSTANTÁNEA DEL ÚLTIMO REPORTE
+# ==========================================
+def _directorio(base_dir):
+    return os.path.join(base_dir, DIRECTORIO_INSTANTANEA)
+
+
+def guardar_instantanea(base_dir, entrada, df, resumen):
+    """Escribe ultimo.arrow y después ultimo.json (el .json es el que la valida)"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    from reportes import _preparar_para_arrow
+
+    directorio = _directorio(base_dir)
+    os.makedirs(directorio, exist_ok=True)
+    tabla = os.path.join(directorio, ARCHIVO_TABLA)
+    indice = os.path.join(directorio, ARCHIVO_ENTRADA)
+    tmp = None
+    try:
+        tmp = tabla + ".tmp"
+        feather.write_feather(
+            pa.Table.from_pandas(_preparar_para_arrow(df), preserve_index=False), tmp, compression="uncompressed"
+        )
+        os.replace(tmp, tabla)
+        tmp = indice + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "id": entrada["id"],
+                "mtime": entrada.get("mtime"),
+                "filas": len(df),
+                "resumen": resumen,
+            }, f, ensure_ascii=False, default=str)
+        os.replace(tmp, indice)
+        return indice
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar la instantánea de arranque: {e}")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+
+
+def leer_instantanea(base_dir, entrada):
+    """Datos de ultimo.json si corresponden a esa entrada del catálogo (mismo id y mtime); si no, None"""
+    if entrada is None:
+        return None
+    try:
+        with open(os.path.join(_directorio(base_dir), ARCHIVO_ENTRADA), encoding="utf-8") as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if datos.get("id") != entrada["id"] or datos.get("mtime") != entrada.get("mtime"):
+        return None
+    return datos
+
+
+def leer_tabla(base_dir):
+    """DataFrame de ultimo.arrow, mapeado en memoria (sin copiar el archivo)"""
+    import pyarrow as pa
+    with pa.memory_map(os.path.join(_directorio(base_dir), ARCHIVO_TABLA), "r") as fuente:
+        tabla = pa.ipc.open_file(fuente).read_all()
+    return tabla.to_pandas()
+
+
+@al_registrar
+def actualizar_instantanea(catalogo, entrada, df):
+    # Sólo interesa el reporte vigente (una recalificación de uno viejo no lo reemplaza)
+    ultimo = catalogo.ultimo()
+    if ultimo is None or ultimo["id"] != entrada["id"]:
+        return
+    from matriz import vigente
+    from reportes import _pyarrow_disponible, compactar, leer_reporte, leer_resumen
+    if not _pyarrow_disponible():
+        return
+    if df is None:
+        df = leer_reporte(entrada["ruta"])
+    # Categóricas -> diccionarios de Arrow: la instantánea vuelve ya compactada
+    df = compactar(df, vigente().valores_columnas)
+    guardar_instantanea(catalogo.base_dir, entrada, df, leer_resumen(entrada["ruta"]))
+
+
+def generar_instantanea(base_dir):
+    """Instantánea del último reporte del catálogo de base_dir (p. ej. al construir la imagen)"""
+    from catalogo import obtener_catalogo
+    catalogo = obtener_catalogo(base_dir)
+    entrada = catalogo.ultimo()
+    if entrada is None:
+        print(f"ℹ️ Sin reportes en {base_dir}: no hay instantánea que generar")
+        return None
+    actualizar_instantanea(catalogo, entrada, None)
+    if leer_instantanea(catalogo.base_dir, entrada) is None:
+        print(f"⚠️ No se generó la instantánea de {entrada['id']}")
+        return None
+    print(f"⚡ Instantánea de arranque generada: {entrada['id']}")
+    return entrada
+
+
+# ==========================================
+# TIEMPOS DE ARRANQUE
+# ==========================================
+class Arranque:
+    """Marca de inicio del proceso, tiempo de importación y primer byte servido"""
+
+    def __init__(self, inicio):
+        self.inicio = inicio
+        self.importacion = None
+        self.primer_byte = None
+        self._lock = threading.Lock()
+
+    def importado(self):
+        self.importacion = time.perf_counter() - self.inicio
+        metricas.ARRANQUE_IMPORTACION.set(round(self.importacion, 4))
+        print(f"🚀 Aplicación importada en {self.importacion:.2f} s")
+
+    def primera_respuesta(self, inicio_peticion, ruta):
+        """Se llama al terminar cada respuesta; sólo registra la primera"""
+        if self.primer_byte is not None:
+            return
+        with self._lock:
+            if self.primer_byte is not None:
+                return
+            ahora = time.perf_counter()
+            self.primer_byte = ahora - self.inicio
+        metricas.ARRANQUE_PRIMER_BYTE.set(round(self.primer_byte, 4))
+        metricas.ARRANQUE_PRIMERA_PETICION.set(round(ahora - inicio_peticion, 4))
+        print(f"⏱️ Primer byte ({ruta}) a {self.primer_byte:.2f} s del arranque, "
+              f"{ahora - inicio_peticion:.3f} s de pedido")
+
+
+def precalentar(cargar_tabla=None, plantillas=None, nombres=()):
+    """
+    En un hilo: importa pandas (y pyarrow), ejecuta cargar_tabla (p.ej. mapear
+    la instantánea) y compila las plantillas. Devuelve el hilo.
+    """
+    def _precalentar():
+        inicio = time.perf_counter()
+        try:
+            import pandas  # noqa: F401
+            from reportes import _pyarrow_disponible
+            _pyarrow_disponible()
+            if cargar_tabla is not None:
+                cargar_tabla()
+            for nombre in nombres:
+                plantillas.get_template(nombre)
+        except Exception as e:
+            print(f"⚠️ Precalentamiento incompleto: {e}")
+            return
+        metricas.ARRANQUE_PRECALENTAMIENTO.set(round(time.perf_counter() - inicio, 4))
+
+    hilo = threading.Thread(target=_precalentar, name="precalentar", daemon=True)
+    hilo.start()
+    return hilo
+
+
+if __name__ == "__main__":
+    import sys
+    generar_instantanea(sys.argv[1] if len(sys.argv) > 1 else "data")
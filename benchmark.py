@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de los caminos críticos
+==================================
+
+Genera corpus sintéticos de licitaciones (1k a 1M filas) y árboles de datos
+con 10 a 10.000 reportes, y mide:
+
+- limpiar_texto_curado / normalizar_textos (cache frío y caliente)
+- analizar_boletin completo (clasificación + guardado)
+- escritura del reporte (Excel, copia columnar, resumen)
+- buscar_todos_los_xlsx (catálogo en frío, desde el JSON y en memoria)
+- cargar_ultimo_reporte (desde el Excel, desde la copia columnar y desde la cache)
+
+Los resultados se guardan en JSON para comparar corridas entre commits.
+
+USO:
+    python benchmark.py                      # 1k-100k filas, 10-1.000 reportes
+    python benchmark.py --completo           # hasta 1M filas y 10.000 reportes
+    python benchmark.py --filas 1000,50000 --reportes 10
+    python benchmark.py --comparar resultados_benchmark/anterior.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+FILAS_RAPIDO = [1_000, 10_000, 100_000]
+FILAS_COMPLETO = FILAS_RAPIDO + [1_000_000]
+REPORTES_RAPIDO = [10, 100, 1_000]
+REPORTES_COMPLETO = REPORTES_RAPIDO + [10_000]
+FILAS_POR_REPORTE = 200
+DIRECTORIO_RESULTADOS = "resultados_benchmark"
+
+# ==========================================
+# CORPUS SINTÉTICO
+# ==========================================
+_ORGANISMOS = [
+    "Ministerio de Economía", "Vialidad Nacional", "ANSES", "Ministerio de Salud",
+    "ENARGAS", "Secretaría de Energía", "Municipalidad de Córdoba", "AySA",
+    "Nucleoeléctrica Argentina S.A.", "Ministerio de Seguridad",
+]
+_PROCEDIMIENTOS = [
+    "Licitación Pública", "Licitación Privada", "Contratación Directa",
+    "Concurso de Precios", "Subasta Pública", "Compra Menor",
+]
+_OBJETOS = [
+    "adquisición de resmas de papel", "servicio de limpieza integral",
+    "provisión de insumos hospitalarios", "mantenimiento de rutas nacionales",
+    "obra pública de saneamiento", "redeterminación de precios del contrato",
+    "concesión del servicio de peaje", "revisión tarifaria del gas natural",
+    "actualización del cuadro tarifario", "movilidad jubilatoria y haber mínimo",
+    "régimen de promoción industrial", "emisión de deuda en el mercado internacional",
+    "programa de precios justos para la canasta básica", "convenio colectivo de trabajo",
+    "reestructuración de pasivos con bonos", "compra de vehículos utilitarios",
+]
+_ADORNOS = ["", " - Expediente EX-2026-{n}", " (segundo llamado)", " — Año 2026", " N° {n}/2026"]
+
+
+def generar_corpus(filas, semilla=42):
+    """DataFrame con el formato que entrega diario.extraer_licitaciones"""
+    rng = random.Random(semilla)
+    inicio = datetime(2026, 1, 1)
+    datos = {
+        "fecha": [], "nro_proceso": [], "detalle": [], "tipo_proceso": [],
+        "fecha_apertura": [], "link": [], "fuente": [],
+    }
+    for i in range(filas):
+        procedimiento = rng.choice(_PROCEDIMIENTOS)
+        detalle = (
+            f"{rng.choice(_ORGANISMOS)}. {procedimiento} para {rng.choice(_OBJETOS)}"
+            + rng.choice(_ADORNOS).format(n=rng.randint(1, 99999))
+        )
+        fecha = inicio + timedelta(days=rng.randint(0, 365))
+        datos["fecha"].append(fecha.strftime("%Y-%m-%d"))
+        datos["nro_proceso"].append(f"{rng.randint(1, 999)}-{i:07d}-CDI26")
+        datos["detalle"].append(detalle)
+        datos["tipo_proceso"].append(procedimiento)
+        datos["fecha_apertura"].append((fecha + timedelta(days=15)).strftime("%d/%m/%Y"))
+        datos["link"].append(f"https://comprar.gob.ar/PLIEGO/VistaPreviaPliegoCiudadano.aspx?qs={i}")
+        datos["fuente"].append("Benchmark")
+    return pd.DataFrame(datos)
+
+
+def generar_arbol(directorio, reportes, filas_por_reporte=FILAS_POR_REPORTE):
+    """Árbol data/YYYY-MM/reporte_fenomenos_*.xlsx con un reporte por día (copias de uno real)"""
+    from analisis import analizar_boletin
+
+    modelo_dir = os.path.join(directorio, "_modelo")
+    os.makedirs(modelo_dir)
+    _, modelo, _ = analizar_boletin(generar_corpus(filas_por_reporte), modelo_dir, incremental=False)
+    inicio = datetime(2026, 1, 1)
+    ultimo = None
+    for i in range(reportes):
+        momento = inicio - timedelta(hours=6 * i)
+        mes_dir = os.path.join(directorio, momento.strftime("%Y-%m"))
+        os.makedirs(mes_dir, exist_ok=True)
+        destino = os.path.join(mes_dir, f"reporte_fenomenos_{momento.strftime('%Y%m%d_%H%M%S')}.xlsx")
+        shutil.copyfile(modelo, destino)
+        ultimo = ultimo or destino
+    shutil.rmtree(modelo_dir)
+    return ultimo
+
+
+# ==========================================
+# MEDICIÓN
+# ==========================================
+def medir(funcion, repeticiones=3, preparar=None):
+    """Segundos de cada repetición (preparar() corre antes de cada una y no se mide)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+class Resultados:
+    def __init__(self):
+        self.casos = []
+
+    def agregar(self, caso, tiempos, **parametros):
+        minimo = min(tiempos)
+        registro = {
+            "caso": caso,
+            **parametros,
+            "repeticiones": len(tiempos),
+            "min_s": round(minimo, 6),
+            "mediana_s": round(statistics.median(tiempos), 6),
+        }
+        if parametros.get("filas") and minimo > 0:
+            registro["filas_por_s"] = round(parametros["filas"] / minimo)
+        self.casos.append(registro)
+        detalle = ", ".join(f"{k}={v}" for k, v in parametros.items())
+        print(f"   ⏱️ {caso} ({detalle}): {minimo * 1000:.1f} ms")
+        return registro
+
+
+def _repeticiones(filas, base):
+    return base if filas <= 100_000 else 1
+
+
+# ==========================================
+# CASOS
+# ==========================================
+def bench_normalizacion(resultados, tamanos, repeticiones):
+    import analisis
+
+    print("\n🔤 Normalización de texto")
+    for filas in tamanos:
+        serie = generar_corpus(filas)["detalle"]
+        rep = _repeticiones(filas, repeticiones)
+        frio = medir(lambda: [analisis.limpiar_texto_curado(t) for t in serie], rep,
+                     preparar=analisis._normalizar.cache_clear)
+        resultados.agregar("limpiar_texto_curado_frio", frio, filas=filas)
+        caliente = medir(lambda: [analisis.limpiar_texto_curado(t) for t in serie], rep)
+        resultados.agregar("limpiar_texto_curado_caliente", caliente, filas=filas)
+        columna = medir(lambda: analisis.normalizar_textos(serie), rep, preparar=analisis._normalizar.cache_clear)
+        resultados.agregar("normalizar_textos", columna, filas=filas)
+
+
+def bench_analisis(resultados, tamanos, repeticiones, directorio):
+    from analisis import analizar_boletin
+
+    print("\n🧠 analizar_boletin (clasificación + guardado)")
+    for filas in tamanos:
+        df = generar_corpus(filas)
+        destino = os.path.join(directorio, f"analisis_{filas}")
+        os.makedirs(destino, exist_ok=True)
+        tiempos = medir(lambda: analizar_boletin(df, destino, incremental=False), _repeticiones(filas, repeticiones))
+        resultados.agregar("analizar_boletin", tiempos, filas=filas)
+        shutil.rmtree(destino)
+
+
+def bench_escritura(resultados, tamanos, repeticiones, directorio):
+    from analisis import analizar_boletin
+    from reportes import EscritorReporte, escribir_columnar, escribir_resumen
+
+    def _escribir_streaming(df, ruta_base, formatos):
+        escritor = EscritorReporte(ruta_base, formatos)
+        escritor.agregar(df)
+        escritor.cerrar()
+
+    print("\n💾 Escritura del reporte")
+    for filas in tamanos:
+        destino = os.path.join(directorio, f"escritura_{filas}")
+        os.makedirs(destino, exist_ok=True)
+        df, _, _ = analizar_boletin(generar_corpus(filas), destino, incremental=False)
+        df = df.drop(columns=["texto_clean"])
+        ruta = os.path.join(destino, "reporte_fenomenos_bench.xlsx")
+        rep = _repeticiones(filas, repeticiones)
+        resultados.agregar("escribir_excel", medir(lambda: df.to_excel(ruta, index=False, engine="openpyxl"), rep), filas=filas)
+        base = os.path.join(destino, "reporte_fenomenos_streaming")
+        resultados.agregar("escribir_xlsx_streaming", medir(lambda: _escribir_streaming(df, base, "xlsx"), rep), filas=filas)
+        resultados.agregar("escribir_csv_streaming", medir(lambda: _escribir_streaming(df, base, "csv"), rep), filas=filas)
+        resultados.agregar("escribir_columnar", medir(lambda: escribir_columnar(df, ruta), rep), filas=filas)
+        resultados.agregar("escribir_resumen", medir(lambda: escribir_resumen(df, ruta), rep), filas=filas)
+        shutil.rmtree(destino)
+
+
+def bench_carga(resultados, cantidades, repeticiones, directorio):
+    import catalogo
+    import main
+    from reportes import escribir_columnar, leer_reporte, ruta_columnar
+
+    print("\n📂 Catálogo y carga del último reporte")
+    data_dir_original = main.DATA_DIR
+    try:
+        for reportes in cantidades:
+            arbol = os.path.join(directorio, f"arbol_{reportes}")
+            ultimo = generar_arbol(arbol, reportes)
+            main.DATA_DIR = arbol
+            main.set_cache(None)
+            ruta_catalogo = os.path.join(arbol, catalogo.ARCHIVO_CATALOGO)
+
+            def _en_frio():
+                catalogo._catalogos.clear()
+                if os.path.exists(ruta_catalogo):
+                    os.remove(ruta_catalogo)
+
+            tiempos = medir(lambda: main.buscar_todos_los_xlsx(arbol), 1 if reportes > 1000 else repeticiones,
+                            preparar=_en_frio)
+            resultados.agregar("buscar_todos_los_xlsx_frio", tiempos, reportes=reportes)
+            tiempos = medir(lambda: main.buscar_todos_los_xlsx(arbol), repeticiones, preparar=catalogo._catalogos.clear)
+            resultados.agregar("buscar_todos_los_xlsx_desde_json", tiempos, reportes=reportes)
+            tiempos = medir(lambda: main.buscar_todos_los_xlsx(arbol), repeticiones)
+            resultados.agregar("buscar_todos_los_xlsx_caliente", tiempos, reportes=reportes)
+
+            # Sin la cache de reportes: se mide la lectura del disco
+            sin_cache = main.cache_reportes.invalidar
+            tiempos = medir(main.cargar_ultimo_reporte, repeticiones, preparar=sin_cache)
+            resultados.agregar("cargar_ultimo_reporte_excel", tiempos, reportes=reportes, filas=FILAS_POR_REPORTE)
+            escribir_columnar(leer_reporte(ultimo), ultimo)
+            tiempos = medir(main.cargar_ultimo_reporte, repeticiones, preparar=sin_cache)
+            resultados.agregar("cargar_ultimo_reporte_columnar", tiempos, reportes=reportes, filas=FILAS_POR_REPORTE)
+            tiempos = medir(main.cargar_ultimo_reporte, repeticiones)
+            resultados.agregar("cargar_ultimo_reporte_cache", tiempos, reportes=reportes, filas=FILAS_POR_REPORTE)
+            os.remove(ruta_columnar(ultimo))
+            shutil.rmtree(arbol)
+            catalogo._catalogos.clear()
+    finally:
+        main.DATA_DIR = data_dir_original
+
+
+# ==========================================
+# RESULTADOS
+# ==========================================
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def guardar(resultados, salida=None):
+    commit = _commit()
+    if salida is None:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        nombre = f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'sin-commit'}.json"
+        salida = os.path.join(DIRECTORIO_RESULTADOS, nombre)
+    documento = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "casos": resultados.casos,
+    }
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(documento, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 Resultados guardados en {salida}")
+    return salida
+
+
+def _clave_caso(caso):
+    return (caso["caso"], caso.get("filas"), caso.get("reportes"))
+
+
+def comparar(anterior, actual):
+    """Tabla de cambios de tiempo mínimo entre dos corridas (>1 = más lento)"""
+    previos = {_clave_caso(c): c for c in anterior["casos"]}
+    filas = []
+    for caso in actual["casos"]:
+        previo = previos.get(_clave_caso(caso))
+        if previo and previo["min_s"] > 0:
+            filas.append((caso, previo["min_s"], caso["min_s"], caso["min_s"] / previo["min_s"]))
+    print(f"\n📊 Comparación con {anterior.get('commit')} ({anterior.get('fecha')})")
+    for caso, antes, ahora, razon in filas:
+        marca = "🔴" if razon > 1.10 else "🟢" if razon < 0.90 else "⚪"
+        parametros = ", ".join(f"{k}={caso[k]}" for k in ("filas", "reportes") if caso.get(k))
+        print(f"   {marca} {caso['caso']} ({parametros}): {antes * 1000:.1f} -> {ahora * 1000:.1f} ms (x{razon:.2f})")
+    return filas
+
+
+def _lista(valor):
+    return [int(v.replace("_", "")) for v in valor.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de análisis y carga de reportes")
+    parser.add_argument("--completo", action="store_true", help="incluye 1M filas y 10.000 reportes")
+    parser.add_argument("--filas", type=_lista, help="tamaños de corpus, p. ej. 1000,10000")
+    parser.add_argument("--reportes", type=_lista, help="cantidades de reportes, p. ej. 10,100")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--casos", default="normalizacion,analisis,escritura,carga")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    filas = args.filas or (FILAS_COMPLETO if args.completo else FILAS_RAPIDO)
+    reportes = args.reportes or (REPORTES_COMPLETO if args.completo else REPORTES_RAPIDO)
+    casos = set(args.casos.split(","))
+    resultados = Resultados()
+
+    directorio = tempfile.mkdtemp(prefix="benchmark_")
+    try:
+        if "normalizacion" in casos:
+            bench_normalizacion(resultados, filas, args.repeticiones)
+        if "analisis" in casos:
+            bench_analisis(resultados, filas, args.repeticiones, directorio)
+        if "escritura" in casos:
+            bench_escritura(resultados, filas, args.repeticiones, directorio)
+        if "carga" in casos:
+            bench_carga(resultados, reportes, args.repeticiones, directorio)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    salida = guardar(resultados, args.salida)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)
+        with open(salida, encoding="utf-8") as f:
+            comparar(anterior, json.load(f))
+    return salida
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,184 @@
+"""
+Búsqueda de texto completo
+==========================
+
+Índice SQLite FTS5 (busqueda.sqlite, junto al catálogo) sobre detalle,
+tipo_proceso, link y las columnas de clasificación de todos los reportes.
+Se actualiza al registrar cada reporte nuevo; los históricos que todavía no
+están indexados se leen una única vez, la primera vez que se busca.
+
+La consulta acepta la sintaxis de FTS5 (frases entre comillas, OR, NOT,
+prefijos con *). Si no es válida se busca cada palabra tal cual.
+Acentos y mayúsculas no cuentan (tokenizer unicode61 remove_diacritics 2).
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from catalogo import al_registrar, obtener_catalogo
+from reportes import MAPEO_COLUMNAS_HISTORICAS, leer_reporte, renombrar_columnas_historicas
+
+ARCHIVO_BUSQUEDA = "busqueda.sqlite"
+LIMITE_RESULTADOS = 20
+LIMITE_MAXIMO = 200
+
+# Columnas del reporte que se indexan (texto) y las que sólo se guardan para mostrar
+COLUMNAS_TEXTO = [
+    "detalle", "tipo_proceso", "link", "tipo_decision", "transferencia",
+    "nivel_riesgo_teorico", "categorias_detectadas", "palabras_clave_detectadas",
+]
+COLUMNAS_DATOS = ["nro_proceso", "indice_fenomeno_corruptivo"]
+COLUMNAS_BUSQUEDA = COLUMNAS_TEXTO + COLUMNAS_DATOS + list(MAPEO_COLUMNAS_HISTORICAS)
+
+_ESQUEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS filas USING fts5(
+    {", ".join(COLUMNAS_TEXTO)},
+    reporte UNINDEXED, fecha UNINDEXED, nro_proceso UNINDEXED, indice UNINDEXED,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+CREATE TABLE IF NOT EXISTS reportes (id TEXT PRIMARY KEY, mtime REAL, fecha TEXT, filas INTEGER);
+"""
+
+
+def _texto(valor):
+    if valor is None or (isinstance(valor, float) and valor != valor):
+        return ""
+    return str(valor)
+
+
+def _consulta_literal(consulta):
+    """Cada palabra como término literal (para consultas que no son sintaxis FTS5 válida)"""
+    return " ".join('"' + t.replace('"', '""') + '"' for t in consulta.split())
+
+
+class IndiceBusqueda:
+    def __init__(self, base_dir):
+        self.base_dir = os.path.abspath(base_dir)
+        self.ruta = os.path.join(self.base_dir, ARCHIVO_BUSQUEDA)
+        self._lock = threading.RLock()
+        self._creado = False
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        if not self._creado:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.executescript(_ESQUEMA)
+            self._creado = True
+        return conexion
+
+    def _agregar(self, conexion, entrada, df):
+        df = renombrar_columnas_historicas(df)
+        fecha = entrada["timestamp"][:10]
+        columnas = {c: df[c].tolist() if c in df.columns else [None] * len(df) for c in COLUMNAS_BUSQUEDA}
+        filas = [
+            tuple(_texto(columnas[c][i]) for c in COLUMNAS_TEXTO)
+            + (entrada["id"], fecha, _texto(columnas["nro_proceso"][i]), columnas["indice_fenomeno_corruptivo"][i])
+            for i in range(len(df))
+        ]
+        conexion.execute("DELETE FROM filas WHERE reporte = ?", (entrada["id"],))
+        conexion.executemany(
+            f"INSERT INTO filas ({', '.join(COLUMNAS_TEXTO)}, reporte, fecha, nro_proceso, indice) "
+            f"VALUES ({', '.join('?' * (len(COLUMNAS_TEXTO) + 4))})",
+            filas,
+        )
+        conexion.execute(
+            "INSERT OR REPLACE INTO reportes (id, mtime, fecha, filas) VALUES (?, ?, ?, ?)",
+            (entrada["id"], entrada["mtime"], fecha, len(filas)),
+        )
+
+    def registrar(self, entrada, df):
+        """Indexa un reporte recién guardado (df ya en memoria: no se relee)"""
+        with self._lock, closing(self._conectar()) as conexion, conexion:
+            self._agregar(conexion, entrada, df)
+
+    def sincronizar(self):
+        """Indexa los reportes del catálogo que faltan o cambiaron y quita los que ya no existen"""
+        with self._lock, closing(self._conectar()) as conexion:
+            indexados = dict(conexion.execute("SELECT id, mtime FROM reportes"))
+            entradas = {e["id"]: e for e in obtener_catalogo(self.base_dir).listar()}
+            cambios = 0
+            with conexion:
+                for id_reporte in indexados.keys() - entradas.keys():
+                    conexion.execute("DELETE FROM filas WHERE reporte = ?", (id_reporte,))
+                    conexion.execute("DELETE FROM reportes WHERE id = ?", (id_reporte,))
+                    cambios += 1
+            for id_reporte, entrada in entradas.items():
+                if indexados.get(id_reporte) == entrada["mtime"]:
+                    continue
+                try:
+                    df = leer_reporte(entrada["ruta"], COLUMNAS_BUSQUEDA)
+                    with conexion:
+                        self._agregar(conexion, entrada, df)
+                    cambios += 1
+                except Exception as e:
+                    print(f"⚠️ No se pudo indexar {entrada['archivo']}: {e}")
+            if cambios:
+                print(f"🔎 Índice de búsqueda actualizado: {cambios} reportes")
+
+    def buscar(self, consulta, desde=None, hasta=None, limite=LIMITE_RESULTADOS, offset=0):
+        """Filas que coinciden, de mayor a menor relevancia (bm25), con el fragmento resaltado"""
+        if not consulta or not consulta.strip():
+            raise ValueError("La consulta no puede estar vacía")
+        if not 1 <= limite <= LIMITE_MAXIMO:
+            raise ValueError(f"limite debe estar entre 1 y {LIMITE_MAXIMO}")
+        if offset < 0:
+            raise ValueError("offset no puede ser negativo")
+        self.sincronizar()
+
+        condiciones, parametros = ["filas MATCH ?"], []
+        if desde:
+            condiciones.append("fecha >= ?")
+            parametros.append(desde)
+        if hasta:
+            condiciones.append("fecha <= ?")
+            parametros.append(hasta)
+        donde = " AND ".join(condiciones)
+
+        with closing(self._conectar()) as conexion:
+            for expresion in (consulta, _consulta_literal(consulta)):
+                try:
+                    total = conexion.execute(
+                        f"SELECT count(*) FROM filas WHERE {donde}", [expresion] + parametros
+                    ).fetchone()[0]
+                    cursor = conexion.execute(
+                        f"""
+                        SELECT reporte, fecha, nro_proceso, detalle, tipo_decision, nivel_riesgo_teorico,
+                               indice, link,
+                               snippet(filas, -1, '<mark>', '</mark>', '…', 16) AS fragmento,
+                               bm25(filas) AS puntaje
+                        FROM filas WHERE {donde}
+                        ORDER BY rank LIMIT ? OFFSET ?
+                        """,
+                        [expresion] + parametros + [limite, offset],
+                    )
+                    break
+                except sqlite3.OperationalError:
+                    # Sintaxis FTS5 inválida (comillas sin cerrar, operadores sueltos...)
+                    continue
+            else:
+                raise ValueError("Consulta inválida")
+            columnas = [d[0] for d in cursor.description]
+            resultados = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+        for r in resultados:
+            r["puntaje"] = round(-r["puntaje"], 4)  # bm25 es negativo: más alto = más relevante
+        return {"consulta": consulta, "total": total, "resultados": resultados}
+
+
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def obtener_indice_busqueda(base_dir):
+    clave = os.path.realpath(base_dir)
+    with _indices_lock:
+        if clave not in _indices:
+            _indices[clave] = IndiceBusqueda(base_dir)
+        return _indices[clave]
+
+
+@al_registrar
+def actualizar_indice_busqueda(catalogo, entrada, df):
+    if df is not None:
+        obtener_indice_busqueda(catalogo.base_dir).registrar(entrada, df)
@@ -0,0 +1,124 @@
+"""
+Cache de reportes en memoria
+============================
+
+DataFrames de reportes ya cargados (y compactados), por id del catálogo.
+Cada entrada recuerda el mtime del archivo que la produjo: si el catálogo
+trae otro mtime (el reporte se reescribió) la entrada se descarta y se vuelve
+a leer. Cuando la suma de los tamaños supera CACHE_REPORTES_MB se desalojan
+los reportes usados hace más tiempo (LRU).
+
+- Las cargas simultáneas del mismo reporte se resuelven con una sola lectura.
+- Un reporte que por sí solo no entra en el presupuesto se devuelve sin guardarlo.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_REPORTES_MB = float(os.getenv("CACHE_REPORTES_MB", "256"))
+
+
+def tamano_en_memoria(df):
+    """Bytes que ocupa df (deep: incluye el contenido de los strings)"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class CacheReportes:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = int(CACHE_REPORTES_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self._entradas = OrderedDict()  # id -> (mtime, df, bytes), del menos al más reciente
+        self._locks = {}  # id -> [lock de carga, hilos que lo usan]
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.desalojos = 0
+
+    def buscar(self, entrada):
+        """DataFrame de la entrada del catálogo si está en cache con el mismo mtime; si no, None"""
+        with self._lock:
+            return self._buscar(entrada, contar=True)
+
+    def _buscar(self, entrada, contar):
+        # Con self._lock tomado
+        guardada = self._entradas.get(entrada["id"])
+        if guardada is not None and guardada[0] != entrada.get("mtime"):
+            self._quitar(entrada["id"])
+            self.invalidaciones += 1
+            guardada = None
+        if guardada is None:
+            if contar:
+                self.fallos += 1
+            return None
+        self._entradas.move_to_end(entrada["id"])
+        if contar:
+            self.aciertos += 1
+        return guardada[1]
+
+    def obtener(self, entrada, cargar):
+        """DataFrame de la entrada; cargar(entrada) sólo corre si no está o cambió el archivo"""
+        with self._lock:
+            df = self._buscar(entrada, contar=True)
+            if df is not None:
+                return df
+            # Lock de carga por id, con cuántos hilos lo esperan para poder descartarlo al final
+            carga = self._locks.setdefault(entrada["id"], [threading.Lock(), 0])
+            carga[1] += 1
+        try:
+            with carga[0]:
+                with self._lock:
+                    df = self._buscar(entrada, contar=False)  # otro hilo pudo cargarlo mientras se esperaba
+                if df is None:
+                    df = cargar(entrada)
+                    self.guardar(entrada, df)
+                return df
+        finally:
+            with self._lock:
+                carga[1] -= 1
+                if carga[1] == 0:
+                    del self._locks[entrada["id"]]
+
+    def guardar(self, entrada, df):
+        """Agrega (o reemplaza) el DataFrame de una entrada; desaloja lo necesario para respetar el presupuesto"""
+        tamano = tamano_en_memoria(df)
+        with self._lock:
+            self._quitar(entrada["id"])
+            if tamano > self.max_bytes:
+                return False
+            self._entradas[entrada["id"]] = (entrada.get("mtime"), df, tamano)
+            self.bytes += tamano
+            while self.bytes > self.max_bytes:
+                clave = next(iter(self._entradas))
+                self._quitar(clave)
+                self.desalojos += 1
+            return True
+
+    def _quitar(self, clave):
+        guardada = self._entradas.pop(clave, None)
+        if guardada is not None:
+            self.bytes -= guardada[2]
+
+    def invalidar(self, id_reporte=None):
+        """Descarta un reporte (o todos, sin id)"""
+        with self._lock:
+            claves = [id_reporte] if id_reporte is not None else list(self._entradas)
+            for clave in claves:
+                if clave in self._entradas:
+                    self._quitar(clave)
+                    self.invalidaciones += 1
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+            }
@@ -0,0 +1,96 @@
+"""
+Cache de respuestas HTTP
+========================
+
+Guarda en memoria el cuerpo ya renderizado de cada endpoint junto con la
+versión de los datos que lo produjeron (la misma que se publica como ETag).
+
+- Si la versión no cambió, se sirve el cuerpo guardado.
+- Si cambió y otro hilo ya está recalculando, se sirve la versión anterior
+  (stale-while-revalidate) en lugar de esperar; obtener() devuelve la versión
+  realmente servida para no publicar el cuerpo viejo con el ETag nuevo.
+- Los fallos simultáneos sobre la misma clave se resuelven con un único cálculo.
+"""
+
+import hashlib
+import threading
+
+CACHE_CONTROL = "public, max-age=0, stale-while-revalidate=60"
+
+
+def calcular_etag(*partes):
+    """ETag débil a partir de las partes que identifican la versión de los datos"""
+    huella = hashlib.sha1("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{huella}"'
+
+
+def etag_coincide(if_none_match, etag):
+    """Evalúa el header If-None-Match (lista separada por comas o '*')"""
+    if not if_none_match:
+        return False
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+    # La comparación débil ignora el prefijo W/
+    return "*" in candidatos or etag.removeprefix("W/") in [c.removeprefix("W/") for c in candidatos]
+
+
+def encabezados(etag, version_servida):
+    """Headers de una respuesta cacheada: una versión anterior sale sin ETag y sin cachear en el cliente"""
+    if version_servida != etag:
+        return {"Cache-Control": "no-store"}
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+class CacheRespuestas:
+    def __init__(self):
+        self._entradas = {}  # clave -> (version, cuerpo)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.obsoletos = 0
+
+    def _lock_de(self, clave):
+        with self._lock:
+            return self._locks.setdefault(clave, threading.Lock())
+
+    def _contar(self, resultado):
+        with self._lock:
+            setattr(self, resultado, getattr(self, resultado) + 1)
+
+    def obtener(self, clave, version, producir):
+        """(version, cuerpo) de la clave; producir() sólo corre en un hilo a la vez"""
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada[0] == version:
+            self._contar("aciertos")
+            return entrada
+
+        lock = self._lock_de(clave)
+        if entrada is not None:
+            if not lock.acquire(blocking=False):
+                # Recalculo en curso en otro hilo: servir la versión anterior
+                self._contar("obsoletos")
+                return entrada
+        else:
+            lock.acquire()
+        try:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] == version:
+                self._contar("aciertos")
+                return entrada
+            self._contar("fallos")
+            entrada = (version, producir())
+            self._entradas[clave] = entrada
+            return entrada
+        finally:
+            lock.release()
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos + self.obsoletos
+            return {
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "obsoletos": self.obsoletos,
+                "tasa_aciertos": round((self.aciertos + self.obsoletos) / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,463 @@
+"""
+Catálogo persistente de reportes
+================================
+
+Mantiene un índice de los reportes generados (ruta, mes, timestamp, filas,
+tamaño y versión de esquema) en memoria y en disco (catalogo_reportes.json
+dentro del directorio de datos). analisis.analizar_boletin registra cada
+reporte nuevo al guardarlo, de modo que listar reportes u obtener el último
+no requiere recorrer data/ en cada request.
+
+Los reportes copiados, movidos o borrados a mano también se detectan: el
+catálogo recuerda el mtime de cada carpeta de datos y sólo vuelve a listar
+las que cambiaron. ultimo() y obtener() verifican además que el archivo siga
+existiendo (y lo vuelven a leer si cambió su mtime). Las escrituras del
+catálogo se hacen con un lock de archivo (catalogo_reportes.json.lock) para
+que dos procesos no se pisen.
+
+USO:
+    python catalogo.py [directorio_datos]   # reconstruye el catálogo
+"""
+
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo el lock entre hilos
+    fcntl = None
+
+ARCHIVO_CATALOGO = "catalogo_reportes.json"
+# Un reporte puede escribirse en varios formatos con el mismo nombre base (y el
+# mismo id): se cataloga uno solo, el primero de esta lista que exista
+EXTENSIONES_REPORTE = (".xlsx", ".csv")
+
+# Versión del layout de columnas del reporte:
+#   1 -> reportes históricos (indice_total, nivel_riesgo, origen)
+#   2 -> reportes con indice_fenomeno_corruptivo / nivel_riesgo_teorico
+VERSION_ESQUEMA_REPORTE = 2
+
+_PATRON_FECHA = re.compile(r"(\d{8})(?:_(\d{6}))?")
+_PATRON_MES = re.compile(r"^\d{4}-\d{2}$")
+
+
+def timestamp_de_archivo(ruta):
+    """Obtiene la fecha del reporte desde su nombre (YYYYMMDD[_HHMMSS]) o, si no la tiene, desde su mtime"""
+    nombre = os.path.basename(ruta)
+    m = _PATRON_FECHA.search(nombre)
+    if m:
+        try:
+            return datetime.strptime(m.group(1) + (m.group(2) or "000000"), "%Y%m%d%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(ruta))
+
+
+def archivos_principales(nombres):
+    """Nombres de archivo -> los que representan a cada reporte (el .xlsx antes que el .csv del mismo nombre)"""
+    por_base = {}
+    for nombre in nombres:
+        base, extension = os.path.splitext(nombre)
+        if extension not in EXTENSIONES_REPORTE:
+            continue
+        actual = por_base.get(base)
+        if actual is None or EXTENSIONES_REPORTE.index(extension) < EXTENSIONES_REPORTE.index(os.path.splitext(actual)[1]):
+            por_base[base] = nombre
+    return list(por_base.values())
+
+
+def archivo_principal(ruta):
+    """Ruta del archivo que representa al reporte de ruta (p. ej. el .xlsx si junto al .csv hay uno)"""
+    carpeta, nombre = os.path.split(ruta)
+    base = os.path.splitext(nombre)[0]
+    existentes = [base + e for e in EXTENSIONES_REPORTE if os.path.exists(os.path.join(carpeta, base + e))]
+    return os.path.join(carpeta, archivos_principales(existentes)[0]) if existentes else ruta
+
+
+def contar_filas(ruta):
+    """Cuenta filas de datos sin cargar el reporte completo en memoria"""
+    try:
+        if ruta.endswith(".csv"):
+            with open(ruta, "rb") as f:
+                return max(sum(1 for _ in f) - 1, 0)
+        from openpyxl import load_workbook
+        wb = load_workbook(ruta, read_only=True)
+        try:
+            ws = wb["Sheet1"] if "Sheet1" in wb.sheetnames else wb.worksheets[0]
+            return max((ws.max_row or 1) - 1, 0)
+        finally:
+            wb.close()
+    except Exception as e:
+        print(f"⚠️ No se pudieron contar filas de {ruta}: {e}")
+        return None
+
+
+def detectar_esquema(columnas):
+    """Deduce la versión de esquema a partir de las columnas del reporte"""
+    if "indice_fenomeno_corruptivo" in columnas:
+        return VERSION_ESQUEMA_REPORTE
+    return 1
+
+
+class CatalogoReportes:
+    """Índice de reportes de un directorio de datos, ordenado por timestamp"""
+
+    def __init__(self, base_dir):
+        self.base_dir = os.path.realpath(base_dir)
+        self.ruta = os.path.join(self.base_dir, ARCHIVO_CATALOGO)
+        self._lock = threading.RLock()
+        self._entradas = {}
+        self._orden = []  # ids de menor a mayor timestamp
+        self._directorios = {}  # carpeta -> st_mtime_ns de la última revisión
+        self._mtime = None
+        self._bloqueos = 0
+
+    # ------------------------------------------
+    # Consultas
+    # ------------------------------------------
+    def listar(self):
+        """Entradas del catálogo, del reporte más reciente al más antiguo"""
+        with self._lock:
+            self._sincronizar()
+            return [self._entradas[i] for i in reversed(self._orden)]
+
+    def ultimo(self):
+        with self._lock:
+            self._sincronizar()
+            while self._orden:
+                entrada = self._verificar(self._orden[-1])
+                if entrada is not None:
+                    return entrada
+            return None
+
+    def obtener(self, id_reporte):
+        with self._lock:
+            self._sincronizar()
+            if id_reporte not in self._entradas:
+                return None
+            return self._verificar(id_reporte)
+
+    def total(self):
+        with self._lock:
+            self._sincronizar()
+            return len(self._orden)
+
+    # ------------------------------------------
+    # Altas
+    # ------------------------------------------
+    def registrar(self, ruta, filas=None, esquema=VERSION_ESQUEMA_REPORTE, **extra):
+        """Agrega (o actualiza) un reporte y persiste el catálogo"""
+        with self._lock, self._bloqueo_archivo():
+            self._sincronizar()
+            entrada = self._crear_entrada(archivo_principal(ruta), filas, esquema)
+            entrada.update(extra)
+            self._insertar(entrada)
+            self._guardar()
+            return entrada
+
+    def reconstruir(self):
+        """Recorre el directorio de datos completo y regenera el catálogo"""
+        with self._lock, self._bloqueo_archivo():
+            self._entradas = {}
+            self._orden = []
+            self._directorios = {}
+            self._agregar_arbol(self.base_dir)
+            self._guardar()
+            print(f"📚 Catálogo reconstruido: {len(self._orden)} reportes en {self.base_dir}")
+
+    # ------------------------------------------
+    # Internos
+    # ------------------------------------------
+    def _crear_entrada(self, ruta, filas, esquema):
+        ruta = os.path.abspath(ruta)
+        ts = timestamp_de_archivo(ruta)
+        carpeta = os.path.basename(os.path.dirname(ruta))
+        if esquema is None:
+            esquema = self._esquema_desde_archivo(ruta)
+        archivo = self._relativa(ruta)
+        return {
+            "id": self._id_reporte(archivo),
+            "archivo": archivo,
+            "ruta": ruta,
+            "mes": carpeta if _PATRON_MES.match(carpeta) else ts.strftime("%Y-%m"),
+            "timestamp": ts.isoformat(),
+            "filas": filas,
+            "bytes": os.path.getsize(ruta),
+            "mtime": os.path.getmtime(ruta),
+            "esquema": esquema,
+        }
+
+    def _esquema_desde_archivo(self, ruta):
+        try:
+            if ruta.endswith(".csv"):
+                with open(ruta, encoding="utf-8-sig") as f:
+                    columnas = f.readline().strip().split(",")
+            else:
+                from openpyxl import load_workbook
+                wb = load_workbook(ruta, read_only=True)
+                try:
+                    ws = wb["Sheet1"] if "Sheet1" in wb.sheetnames else wb.worksheets[0]
+                    columnas = [c.value for c in next(ws.iter_rows(max_row=1))]
+                finally:
+                    wb.close()
+            return detectar_esquema(columnas)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _id_reporte(archivo):
+        # data/2026-01/reporte_x.xlsx -> "2026-01_reporte_x": único aunque se repita el nombre
+        if os.path.isabs(archivo):
+            archivo = os.path.basename(archivo)
+        return os.path.splitext(archivo)[0].replace("/", "_")
+
+    def _relativa(self, ruta):
+        try:
+            if os.path.commonpath([ruta, self.base_dir]) == self.base_dir:
+                return os.path.relpath(ruta, self.base_dir).replace("\\", "/")
+        except ValueError:
+            pass
+        return ruta
+
+    def _clave(self, id_reporte):
+        return (self._entradas[id_reporte]["timestamp"], id_reporte)
+
+    def _insertar(self, entrada):
+        id_reporte = entrada["id"]
+        if id_reporte in self._entradas:
+            self._orden.remove(id_reporte)
+        self._entradas[id_reporte] = entrada
+        bisect.insort(self._orden, id_reporte, key=self._clave)
+
+    def _quitar(self, id_reporte):
+        del self._entradas[id_reporte]
+        self._orden.remove(id_reporte)
+
+    @contextmanager
+    def _bloqueo_archivo(self):
+        """Lock de archivo entre procesos (reentrante dentro del proceso, que ya tiene self._lock)"""
+        archivo = None
+        if fcntl is not None and self._bloqueos == 0:
+            try:
+                archivo = open(self.ruta + ".lock", "a")
+                fcntl.flock(archivo, fcntl.LOCK_EX)
+            except OSError:
+                if archivo is not None:
+                    archivo.close()
+                archivo = None
+        self._bloqueos += 1
+        try:
+            yield
+        finally:
+            self._bloqueos -= 1
+            if archivo is not None:
+                archivo.close()  # cerrar libera el flock
+
+    def _verificar(self, id_reporte):
+        """Entrada con su archivo en disco: sin archivo se quita; con otro mtime se vuelve a leer"""
+        entrada = self._entradas[id_reporte]
+        try:
+            mtime = os.path.getmtime(entrada["ruta"])
+        except OSError:
+            mtime = None
+        if mtime == entrada.get("mtime"):
+            return entrada
+        with self._bloqueo_archivo():
+            self._recargar()
+            entrada = self._entradas.get(id_reporte)
+            if entrada is not None:
+                if mtime is None:
+                    print(f"⚠️ {entrada['ruta']} ya no existe: se quita del catálogo")
+                    self._quitar(id_reporte)
+                    entrada = None
+                else:
+                    nueva = self._crear_entrada(entrada["ruta"], contar_filas(entrada["ruta"]), None)
+                    entrada = {**entrada, **nueva}
+                    self._insertar(entrada)
+                self._guardar()
+        return entrada
+
+    def _sincronizar(self):
+        """Recarga desde disco si otro proceso (p. ej. diario.py) modificó el catálogo y revisa las carpetas de datos"""
+        if not self._recargar() or not self._carpetas_modificadas():
+            return
+        with self._bloqueo_archivo():
+            self._recargar()
+            if self._revisar_carpetas(self._carpetas_modificadas()):
+                self._guardar()
+
+    def _recargar(self):
+        """Relee catalogo_reportes.json si cambió; False si no existía o estaba roto y se reconstruyó"""
+        try:
+            mtime = os.stat(self.ruta).st_mtime_ns
+        except OSError:
+            if self._mtime is None and not self._orden:
+                self.reconstruir()
+                return False
+            return True
+        if mtime == self._mtime:
+            return True
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Catálogo ilegible ({e}), reconstruyendo...")
+            self.reconstruir()
+            return False
+        self._entradas = {}
+        self._orden = []
+        for entrada in datos.get("reportes", []):
+            archivo = entrada["archivo"]
+            entrada["ruta"] = archivo if os.path.isabs(archivo) else os.path.join(self.base_dir, archivo)
+            self._insertar(entrada)
+        self._directorios = {
+            os.path.normpath(os.path.join(self.base_dir, carpeta)): mtime_carpeta
+            for carpeta, mtime_carpeta in datos.get("directorios", {}).items()
+        }
+        self._mtime = mtime
+        return True
+
+    def _carpetas_modificadas(self):
+        """Carpetas conocidas cuyo mtime cambió (crear, mover o borrar un archivo cambia el de su carpeta)"""
+        if self.base_dir not in self._directorios:
+            return [self.base_dir]
+        modificadas = []
+        for carpeta, mtime in self._directorios.items():
+            try:
+                actual = os.stat(carpeta).st_mtime_ns
+            except OSError:
+                actual = None
+            if actual != mtime:
+                modificadas.append(carpeta)
+        return modificadas
+
+    def _revisar_carpetas(self, carpetas):
+        """Vuelve a listar las carpetas dadas; True si cambiaron los reportes o las carpetas conocidas"""
+        cambio = False
+        rutas = {e["ruta"] for e in self._entradas.values()}
+        for carpeta in carpetas:
+            try:
+                self._directorios[carpeta] = os.stat(carpeta).st_mtime_ns
+                elementos = list(os.scandir(carpeta))
+            except OSError:
+                # La carpeta desapareció (o se movió): se olvida con todo lo que tenía adentro
+                adentro = carpeta + os.sep
+                for otra in [c for c in self._directorios if c == carpeta or c.startswith(adentro)]:
+                    del self._directorios[otra]
+                for id_reporte in [i for i, e in self._entradas.items() if e["ruta"].startswith(adentro)]:
+                    self._quitar(id_reporte)
+                cambio = True
+                continue
+            for elemento in elementos:
+                if elemento.is_dir() and elemento.path not in self._directorios:
+                    self._agregar_arbol(elemento.path, rutas)
+                    cambio = True
+            archivos = [e.name for e in elementos if not e.is_dir()]
+            presentes = {os.path.join(carpeta, nombre) for nombre in archivos_principales(archivos)}
+            for ruta in presentes - rutas:
+                self._insertar(self._crear_entrada(ruta, contar_filas(ruta), None))
+                cambio = True
+            for id_reporte, entrada in list(self._entradas.items()):
+                if os.path.dirname(entrada["ruta"]) == carpeta and entrada["ruta"] not in presentes:
+                    self._quitar(id_reporte)
+                    cambio = True
+        return cambio
+
+    def _agregar_arbol(self, carpeta, conocidas=()):
+        """Registra carpeta y sus subcarpetas con los reportes que no estén en conocidas"""
+        for root, dirs, files in os.walk(carpeta):
+            try:
+                self._directorios[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            for f in archivos_principales(files):
+                ruta = os.path.join(root, f)
+                if ruta not in conocidas:
+                    self._insertar(self._crear_entrada(ruta, contar_filas(ruta), None))
+
+    def _guardar(self):
+        datos = {
+            "version": 1,
+            "actualizado": datetime.now().isoformat(timespec="seconds"),
+            "reportes": [
+                {k: v for k, v in self._entradas[i].items() if k != "ruta"}
+                for i in self._orden
+            ],
+            "directorios": {
+                os.path.relpath(carpeta, self.base_dir).replace("\\", "/"): mtime
+                for carpeta, mtime in self._directorios.items()
+            },
+        }
+        tmp = f"{self.ruta}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(datos, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.ruta)
+            self._mtime = os.stat(self.ruta).st_mtime_ns
+            if self.base_dir in self._directorios:
+                # La propia escritura del catálogo cambia el mtime de la carpeta base
+                self._directorios[self.base_dir] = os.stat(self.base_dir).st_mtime_ns
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el catálogo en {self.ruta}: {e}")
+
+_catalogos = {}
+_catalogos_lock = threading.Lock()
+
+
+def obtener_catalogo(base_dir):
+    """Instancia compartida del catálogo para un directorio de datos"""
+    clave = os.path.realpath(base_dir)
+    with _catalogos_lock:
+        if clave not in _catalogos:
+            _catalogos[clave] = CatalogoReportes(base_dir)
+        return _catalogos[clave]
+
+
+# Funciones (catalogo, entrada, df) que se ejecutan cada vez que se registra un reporte nuevo
+_al_registrar = []
+
+
+def al_registrar(funcion):
+    """Decorador: suscribe funcion al alta de reportes (p. ej. para actualizar agregados)"""
+    _al_registrar.append(funcion)
+    return funcion
+
+
+def resolver_base(directorio, base_dir):
+    """base_dir si directorio está dentro de él; si no, el propio directorio (p. ej. un tmp de tests)"""
+    base = os.path.realpath(base_dir)
+    directorio = os.path.realpath(directorio)
+    try:
+        dentro = os.path.commonpath([directorio, base]) == base
+    except ValueError:
+        dentro = False
+    return base if dentro else directorio
+
+
+def registrar_reporte(ruta, base_dir, filas=None, df=None, **extra):
+    """Registra un reporte recién escrito en el catálogo del directorio que lo contiene"""
+    ruta_real = os.path.realpath(ruta)
+    base = resolver_base(os.path.dirname(ruta_real), base_dir)
+    try:
+        catalogo = obtener_catalogo(base)
+        entrada = catalogo.registrar(ruta_real, filas=filas, **extra)
+    except Exception as e:
+        print(f"⚠️ No se pudo registrar {ruta} en el catálogo: {e}")
+        return None
+    for funcion in _al_registrar:
+        try:
+            funcion(catalogo, entrada, df)
+        except Exception as e:
+            print(f"⚠️ {funcion.__name__} falló para {entrada['id']}: {e}")
+    return entrada
+
+
+if __name__ == "__main__":
+    directorio = sys.argv[1] if len(sys.argv) > 1 else "data"
+    obtener_catalogo(directorio).reconstruir()
@@ -0,0 +1,206 @@
+"""
+Cliente HTTP compartido
+=======================
+
+Una sola requests.Session con pool de conexiones keep-alive por host, más un
+cache en disco que guarda ETag / Last-Modified de cada URL y envía pedidos
+condicionales. Los feeds RSS y las páginas de CKAN que no cambiaron vuelven
+como 304 y se sirven desde el disco.
+
+El cache ocupa a lo sumo HTTP_CACHE_MAX_MB: al pasarse se borran las
+entradas usadas hace más tiempo (servir una copia renueva su mtime).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "http"))
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+CONEXIONES_POR_HOST = 8
+
+_sesion = None
+_sesion_lock = threading.Lock()
+
+
+def obtener_sesion():
+    """Sesión compartida entre hilos (las fuentes concurrentes de diario.py la reutilizan)"""
+    global _sesion
+    with _sesion_lock:
+        if _sesion is None:
+            sesion = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=CONEXIONES_POR_HOST, pool_maxsize=CONEXIONES_POR_HOST)
+            sesion.mount("https://", adaptador)
+            sesion.mount("http://", adaptador)
+            _sesion = sesion
+        return _sesion
+
+
+class CacheHTTP:
+    """Cuerpo + validadores (ETag / Last-Modified) por URL, en disco"""
+
+    def __init__(self, directorio=HTTP_CACHE_DIR, max_bytes=None):
+        self.directorio = directorio
+        self.max_bytes = int(HTTP_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self._bytes = None  # se mide en disco la primera vez que se guarda algo
+        self._lock = threading.Lock()
+
+    def contar(self, acierto):
+        with self._lock:
+            if acierto:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+
+    def _rutas(self, url):
+        clave = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directorio, clave[:2], clave)
+        return base + ".json", base + ".body"
+
+    def _meta(self, url):
+        ruta_meta, ruta_cuerpo = self._rutas(url)
+        if not os.path.exists(ruta_cuerpo):
+            return None
+        try:
+            with open(ruta_meta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def validadores(self, url):
+        """Headers condicionales para la URL, si hay una copia guardada"""
+        meta = self._meta(url)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def guardar(self, url, resp):
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        ruta_meta, ruta_cuerpo = self._rutas(url)
+        try:
+            os.makedirs(os.path.dirname(ruta_meta), exist_ok=True)
+            meta = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "encoding": resp.encoding,
+                "bytes": len(resp.content),
+                "headers": {k: v for k, v in resp.headers.items() if k.lower() in ("content-type", "etag", "last-modified")},
+            }
+            for ruta, modo, contenido in (
+                (ruta_cuerpo, "wb", resp.content),
+                (ruta_meta, "w", json.dumps(meta)),
+            ):
+                tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, modo) as f:
+                    f.write(contenido)
+                os.replace(tmp, ruta)
+        except OSError as e:
+            print(f"   ⚠️ No se pudo guardar en cache HTTP: {e}")
+            return
+        self._sumar(len(resp.content) + len(json.dumps(meta)))
+
+    def _archivos(self):
+        """(mtime, bytes, ruta del cuerpo) de cada entrada en disco"""
+        archivos = []
+        for root, dirs, files in os.walk(self.directorio):
+            for f in files:
+                if not f.endswith(".body"):
+                    continue
+                ruta = os.path.join(root, f)
+                try:
+                    estado = os.stat(ruta)
+                except OSError:
+                    continue
+                try:
+                    meta = os.path.getsize(ruta[:-len(".body")] + ".json")
+                except OSError:
+                    meta = 0
+                archivos.append((estado.st_mtime, estado.st_size + meta, ruta))
+        return archivos
+
+    def _sumar(self, tamano):
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(b for _, b, _ in self._archivos())
+            else:
+                self._bytes += tamano
+            if self._bytes <= self.max_bytes:
+                return
+            # Se recalcula desde el disco (otros procesos también escriben) y se
+            # borran las entradas más viejas hasta quedar en el 90 % del máximo
+            archivos = sorted(self._archivos())
+            total = sum(b for _, b, _ in archivos)
+            for _, tamano_entrada, ruta in archivos:
+                if total <= self.max_bytes * 0.9:
+                    break
+                for archivo in (ruta[:-len(".body")] + ".json", ruta):
+                    try:
+                        os.remove(archivo)
+                    except OSError:
+                        pass
+                total -= tamano_entrada
+                self.desalojos += 1
+            self._bytes = total
+
+    def respuesta_guardada(self, url, resp_304):
+        """Reconstruye una respuesta 200 con el cuerpo guardado; None si la copia no está completa"""
+        meta = self._meta(url)
+        if not meta:
+            return None
+        ruta_cuerpo = self._rutas(url)[1]
+        try:
+            with open(ruta_cuerpo, "rb") as f:
+                cuerpo = f.read()
+            os.utime(ruta_cuerpo)  # usada recién: la última en desalojarse
+        except OSError:
+            return None
+        if "bytes" in meta and meta["bytes"] != len(cuerpo):
+            return None  # cuerpo de otra versión (se cortó la escritura entre los dos archivos)
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = cuerpo
+        resp.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        resp.encoding = meta.get("encoding")
+        resp.url = url
+        resp.request = resp_304.request
+        resp.elapsed = resp_304.elapsed
+        resp.desde_cache = True
+        return resp
+
+
+cache_http = CacheHTTP()
+
+
+def get_condicional(url, headers=None, timeout=60, verify=True):
+    """GET con la sesión compartida; usa el cache en disco si el servidor responde 304"""
+    encabezados = dict(headers or {})
+    encabezados.update(cache_http.validadores(url))
+    resp = obtener_sesion().get(url, headers=encabezados, timeout=timeout, verify=verify)
+    if resp.status_code == 304:
+        guardada = cache_http.respuesta_guardada(url, resp)
+        if guardada is not None:
+            cache_http.contar(acierto=True)
+            return guardada
+        print("   ⚠️ Cache HTTP incompleto, pidiendo de nuevo...")
+        resp = obtener_sesion().get(url, headers=headers, timeout=timeout, verify=verify)
+    cache_http.contar(acierto=False)
+    if resp.ok:
+        cache_http.guardar(url, resp)
+    resp.desde_cache = False
+    return resp
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Conversión del Archivo Histórico a Formato Columnar
+===================================================
+
+Genera la copia .parquet de cada reporte .xlsx/.csv ya existente en data/
+(los reportes nuevos la crean automáticamente al guardarse). Los lectores
+del dashboard y de la API la usan en lugar de parsear el Excel.
+
+USO:
+    python convertir_a_parquet.py [directorio_datos] [--forzar]
+"""
+
+import os
+import sys
+import time
+from catalogo import obtener_catalogo
+from reportes import escribir_columnar, leer_reporte, ruta_columnar
+
+DATA_DIR = "data"
+
+
+def convertir_archivo(ruta, forzar=False):
+    """Convierte un reporte. Devuelve True si generó la copia columnar."""
+    destino = ruta_columnar(ruta)
+    if not forzar and os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(ruta):
+        return False
+    df = leer_reporte(ruta)
+    return escribir_columnar(df, ruta) is not None
+
+
+def convertir_historico(base_dir=DATA_DIR, forzar=False):
+    entradas = obtener_catalogo(base_dir).listar()
+    print(f"📁 {len(entradas)} reportes en el catálogo de {os.path.abspath(base_dir)}\n")
+
+    convertidos = omitidos = errores = 0
+    inicio = time.perf_counter()
+    for entrada in entradas:
+        try:
+            if convertir_archivo(entrada["ruta"], forzar):
+                print(f"✅ {entrada['archivo']} -> {os.path.basename(ruta_columnar(entrada['ruta']))}")
+                convertidos += 1
+            else:
+                omitidos += 1
+        except Exception as e:
+            print(f"❌ Error al convertir {entrada['archivo']}: {e}")
+            errores += 1
+
+    print(f"\n{'=' * 50}")
+    print("RESUMEN DE CONVERSIÓN")
+    print(f"{'=' * 50}")
+    print(f"✅ Convertidos: {convertidos}")
+    print(f"⏭️  Ya actualizados: {omitidos}")
+    print(f"❌ Errores: {errores}")
+    print(f"⏱️ Tiempo: {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    convertir_historico(args[0] if args else DATA_DIR, forzar="--forzar" in sys.argv)
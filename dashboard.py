@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 import os
 from datetime import datetime
+from reportes import MAPEO_COLUMNAS_HISTORICAS, leer_reporte, renombrar_columnas_historicas
 
 # ===============================
 # CONFIGURACIÓN Y ESTILO
@@ -69,20 +70,22 @@ def formatear_nombre_mes(mes_codigo):
 # ===============================
 # TRATAMIENTO DE DATOS (COMPATIBILIDAD SEGURA)
 # ===============================
-def cargar_y_limpiar(ruta):
-    df = pd.read_excel(ruta)
+# Columnas que usa el dashboard (incluye sus nombres históricos)
+COLUMNAS_DASHBOARD = [
+    "fecha",
+    "tipo_decision",
+    "transferencia",
+    "indice_fenomeno_corruptivo",
+    "nivel_riesgo_teorico",
+    "link",
+] + list(MAPEO_COLUMNAS_HISTORICAS)
 
-    # Mapeo de nombres antiguos a nuevos para compatibilidad histórica
-    mapeo = {
-        "indice_total": "indice_fenomeno_corruptivo",
-        "nivel_riesgo": "nivel_riesgo_teorico",
-        "origen": "transferencia",
-    }
 
-    # RENOMBRADO SEGURO
-    for viejo, nuevo in mapeo.items():
-        if viejo in df.columns and nuevo not in df.columns:
-            df = df.rename(columns={viejo: nuevo})
+def cargar_y_limpiar(ruta):
+    df = leer_reporte(ruta, COLUMNAS_DASHBOARD)
+
+    # RENOMBRADO SEGURO (nombres históricos -> actuales)
+    df = renombrar_columnas_historicas(df)
 
     # Eliminar duplicados
     df = df.loc[:, ~df.columns.duplicated()]
@@ -96,6 +99,159 @@ def cargar_y_limpiar(ruta):
     return df
 
 
+# ===============================
+# CACHE DE DATOS, AGREGADOS Y FIGURAS
+# ===============================
+# Streamlit re-ejecuta el script en cada interacción: cada reporte se lee una
+# vez por (ruta, mtime) y los agregados del mes y las figuras se arman con esos
+# DataFrames ya cacheados. Un reporte nuevo o reescrito en el mes sólo obliga a
+# leer ese archivo.
+MAX_REPORTES_EN_CACHE = 64
+MAX_MESES_EN_CACHE = 6
+MAX_VISTAS_EN_CACHE = 64
+COLORES_RIESGO = {"Alto": "#EF553B", "Medio": "#FECB52", "Bajo": "#636EFA"}
+
+
+def firma_mes(mes, archivos):
+    mes_dir = os.path.join(DATA_DIR, mes)
+    return tuple((f, os.path.getmtime(os.path.join(mes_dir, f))) for f in archivos)
+
+
+@st.cache_data(max_entries=MAX_REPORTES_EN_CACHE, show_spinner="Cargando reporte...")
+def cargar_reporte(ruta, mtime):
+    """Reporte ya limpio; mtime sólo forma parte de la clave (reescribir el archivo invalida la entrada)"""
+    return cargar_y_limpiar(ruta)
+
+
+@st.cache_data(max_entries=MAX_MESES_EN_CACHE, show_spinner="Cargando reportes del mes...")
+def cargar_mes(mes, firma):
+    """Resumen por día del mes (cambiar de día no vuelve a leer archivos)"""
+    mes_dir = os.path.join(DATA_DIR, mes)
+    filas = []
+    for archivo, mtime in firma:
+        df = cargar_reporte(os.path.join(mes_dir, archivo), mtime)
+        filas.append({
+            "reporte": archivo,
+            "normas": len(df),
+            "fenomenos": int((df["tipo_decision"] != "No identificado").sum()),
+        })
+    return pd.DataFrame(filas)
+
+
+@st.cache_data(max_entries=MAX_VISTAS_EN_CACHE, show_spinner=False)
+def preparar_vista(mes, archivo, mtime):
+    """Agregados y especificaciones de figuras de un reporte: se calculan una vez por reporte"""
+    df = cargar_reporte(os.path.join(DATA_DIR, mes, archivo), mtime)
+    df_detectados = df[df["tipo_decision"] != "No identificado"]
+    vista = {
+        "df": df,
+        "df_detectados": df_detectados,
+        "riesgo_maximo": df["indice_fenomeno_corruptivo"].max(),
+        "figuras": {},
+    }
+    if df_detectados.empty:
+        return vista
+
+    figuras = vista["figuras"]
+    figuras["bar"] = px.bar(
+        df_detectados,
+        x="indice_fenomeno_corruptivo",
+        y="tipo_decision",
+        color="nivel_riesgo_teorico",
+        orientation="h",
+        color_discrete_map=COLORES_RIESGO,
+        labels={
+            "indice_fenomeno_corruptivo": "Índice de Intensidad (0-10)",
+            "tipo_decision": "Escenario de la Teoría",
+        },
+    ).to_dict()
+    figuras["pie"] = px.pie(
+        df_detectados,
+        names="transferencia",
+        hole=0.4,
+        title="Distribución de Impacto Económico",
+    ).to_dict()
+
+    acumulacion = (
+        df_detectados.groupby("tipo_decision").size().reset_index(name="cantidad")
+    )
+    acumulacion = acumulacion.sort_values("cantidad", ascending=False)
+    figuras["acum"] = px.bar(
+        acumulacion,
+        x="cantidad",
+        y="tipo_decision",
+        orientation="h",
+        title="Frecuencia de Fenómenos por Escenario",
+        labels={"cantidad": "Cantidad de Casos", "tipo_decision": "Escenario"},
+        color="cantidad",
+        color_continuous_scale="Reds",
+    ).to_dict()
+
+    intensidad_prom = (
+        df_detectados.groupby("tipo_decision")["indice_fenomeno_corruptivo"]
+        .mean()
+        .reset_index()
+    )
+    intensidad_prom = intensidad_prom.sort_values(
+        "indice_fenomeno_corruptivo", ascending=False
+    )
+    figuras["int"] = px.bar(
+        intensidad_prom,
+        x="indice_fenomeno_corruptivo",
+        y="tipo_decision",
+        orientation="h",
+        title="Intensidad Promedio por Escenario",
+        labels={
+            "indice_fenomeno_corruptivo": "Intensidad Promedio",
+            "tipo_decision": "Escenario",
+        },
+        color="indice_fenomeno_corruptivo",
+        color_continuous_scale="Oranges",
+    ).to_dict()
+
+    fig_scatter = px.scatter(
+        df_detectados,
+        x="indice_fenomeno_corruptivo",
+        y="transferencia",
+        color="nivel_riesgo_teorico",
+        size="indice_fenomeno_corruptivo",
+        hover_data=["tipo_decision"],
+        color_discrete_map=COLORES_RIESGO,
+        title="Distribución de Fenómenos",
+        labels={
+            "indice_fenomeno_corruptivo": "Índice de Intensidad",
+            "transferencia": "Dirección de Transferencia",
+        },
+    )
+    fig_scatter.update_layout(height=500)
+    figuras["scatter"] = fig_scatter.to_dict()
+
+    por_transferencia = df_detectados.groupby("transferencia", sort=False)["indice_fenomeno_corruptivo"]
+    vista["stats_transferencia"] = [
+        (transferencia, int(n), float(prom))
+        for transferencia, n, prom in zip(
+            por_transferencia.size().index, por_transferencia.size(), por_transferencia.mean()
+        )
+    ]
+
+    riesgo_stats = (
+        df_detectados.groupby("nivel_riesgo_teorico")
+        .agg({"indice_fenomeno_corruptivo": ["count", "mean", "sum"]})
+        .reset_index()
+    )
+    riesgo_stats.columns = ["nivel_riesgo", "cantidad", "promedio", "total"]
+    vista["riesgo_stats"] = riesgo_stats
+
+    vista["top_riesgo"] = (
+        df_detectados.groupby("tipo_decision")["indice_fenomeno_corruptivo"]
+        .mean()
+        .sort_values(ascending=False)
+        .head(3)
+    )
+    vista["trans_dist"] = df_detectados["transferencia"].value_counts()
+    return vista
+
+
 # ===============================
 # SIDEBAR Y NAVEGACIÓN
 # ===============================
@@ -207,13 +363,17 @@ archivo_selec = st.sidebar.selectbox(
     format_func=lambda x: x.replace("reporte_fenomenos_", "").replace(".xlsx", ""),
 )
 
-ruta_completa = os.path.join(DATA_DIR, mes_seleccionado, archivo_selec)
-df = cargar_y_limpiar(ruta_completa)
+firma = firma_mes(mes_seleccionado, archivos_del_mes)
+resumen_mes = cargar_mes(mes_seleccionado, firma)
+vista = preparar_vista(mes_seleccionado, archivo_selec, dict(firma)[archivo_selec])
+df = vista["df"]
 
 st.sidebar.divider()
 st.sidebar.info(f"""
 **Período:** {formatear_nombre_mes(mes_seleccionado)}  
-**Total reportes:** {len(archivos_del_mes)} días
+**Total reportes:** {len(archivos_del_mes)} días  
+**Normas en el mes:** {int(resumen_mes["normas"].sum())}  
+**Fenómenos en el mes:** {int(resumen_mes["fenomenos"].sum())}
 """)
 
 # ===============================
@@ -222,12 +382,13 @@ st.sidebar.info(f"""
 st.title("⚖️ Monitor de Fenómenos Corruptivos Legales")
 st.markdown("### Implementación de la Teoría del **Ph.D. Vicente Humberto Monteverde**")
 
-df_detectados = df[df["tipo_decision"] != "No identificado"]
+df_detectados = vista["df_detectados"]
+figuras = vista["figuras"]
 
 m1, m2, m3, m4 = st.columns(4)
 m1.metric("Normas Analizadas", len(df))
 m2.metric("Fenómenos Detectados", len(df_detectados))
-m3.metric("Riesgo Máximo", f"{df['indice_fenomeno_corruptivo'].max()}/10")
+m3.metric("Riesgo Máximo", f"{vista['riesgo_maximo']}/10")
 fecha_label = archivo_selec.split("_")[-1].split(".")[0]
 m4.metric("Fecha del Reporte", fecha_label)
 
@@ -241,36 +402,14 @@ col_g1, col_g2 = st.columns(2)
 with col_g1:
     st.write("### 📊 Intensidad por Escenario Teórico")
     if not df_detectados.empty:
-        fig_bar = px.bar(
-            df_detectados,
-            x="indice_fenomeno_corruptivo",
-            y="tipo_decision",
-            color="nivel_riesgo_teorico",
-            orientation="h",
-            color_discrete_map={
-                "Alto": "#EF553B",
-                "Medio": "#FECB52",
-                "Bajo": "#636EFA",
-            },
-            labels={
-                "indice_fenomeno_corruptivo": "Índice de Intensidad (0-10)",
-                "tipo_decision": "Escenario de la Teoría",
-            },
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(figuras["bar"], use_container_width=True)
     else:
         st.info("No hay fenómenos detectados en este reporte.")
 
 with col_g2:
     st.write("### 💸 Sectores de Transferencia Regresiva")
     if not df_detectados.empty:
-        fig_pie = px.pie(
-            df_detectados,
-            names="transferencia",
-            hole=0.4,
-            title="Distribución de Impacto Económico",
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(figuras["pie"], use_container_width=True)
 
 # ===============================
 # TABLA DE AUDITORÍA
@@ -371,48 +510,11 @@ col_temp1, col_temp2 = st.columns(2)
 
 with col_temp1:
     if not df_detectados.empty:
-        acumulacion = (
-            df_detectados.groupby("tipo_decision").size().reset_index(name="cantidad")
-        )
-        acumulacion = acumulacion.sort_values("cantidad", ascending=False)
-
-        fig_acum = px.bar(
-            acumulacion,
-            x="cantidad",
-            y="tipo_decision",
-            orientation="h",
-            title="Frecuencia de Fenómenos por Escenario",
-            labels={"cantidad": "Cantidad de Casos", "tipo_decision": "Escenario"},
-            color="cantidad",
-            color_continuous_scale="Reds",
-        )
-        st.plotly_chart(fig_acum, use_container_width=True)
+        st.plotly_chart(figuras["acum"], use_container_width=True)
 
 with col_temp2:
     if not df_detectados.empty:
-        intensidad_prom = (
-            df_detectados.groupby("tipo_decision")["indice_fenomeno_corruptivo"]
-            .mean()
-            .reset_index()
-        )
-        intensidad_prom = intensidad_prom.sort_values(
-            "indice_fenomeno_corruptivo", ascending=False
-        )
-
-        fig_int = px.bar(
-            intensidad_prom,
-            x="indice_fenomeno_corruptivo",
-            y="tipo_decision",
-            orientation="h",
-            title="Intensidad Promedio por Escenario",
-            labels={
-                "indice_fenomeno_corruptivo": "Intensidad Promedio",
-                "tipo_decision": "Escenario",
-            },
-            color="indice_fenomeno_corruptivo",
-            color_continuous_scale="Oranges",
-        )
-        st.plotly_chart(fig_int, use_container_width=True)
+        st.plotly_chart(figuras["int"], use_container_width=True)
 
 # 2. MATRIZ DE RIESGO
 st.write("### 🎯 Matriz de Riesgo: Intensidad vs Transferencia")
@@ -421,36 +523,16 @@ if not df_detectados.empty:
     col_matriz1, col_matriz2 = st.columns([2, 1])
 
     with col_matriz1:
-        fig_scatter = px.scatter(
-            df_detectados,
-            x="indice_fenomeno_corruptivo",
-            y="transferencia",
-            color="nivel_riesgo_teorico",
-            size="indice_fenomeno_corruptivo",
-            hover_data=["tipo_decision"],
-            color_discrete_map={
-                "Alto": "#EF553B",
-                "Medio": "#FECB52",
-                "Bajo": "#636EFA",
-            },
-            title="Distribución de Fenómenos",
-            labels={
-                "indice_fenomeno_corruptivo": "Índice de Intensidad",
-                "transferencia": "Dirección de Transferencia",
-            },
-        )
-        fig_scatter.update_layout(height=500)
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        st.plotly_chart(figuras["scatter"], use_container_width=True)
 
     with col_matriz2:
         st.markdown("#### 📊 Estadísticas por Transferencia")
-        for transferencia in df_detectados["transferencia"].unique():
-            df_trans = df_detectados[df_detectados["transferencia"] == transferencia]
+        for transferencia, casos, promedio in vista["stats_transferencia"]:
             st.markdown(f"**{transferencia}:**")
-            st.metric("Casos", len(df_trans))
+            st.metric("Casos", casos)
             st.metric(
                 "Intensidad Promedio",
-                f"{df_trans['indice_fenomeno_corruptivo'].mean():.1f}/10",
+                f"{promedio:.1f}/10",
             )
             st.divider()
 
@@ -460,12 +542,7 @@ st.write("### 🔥 Concentración de Riesgo por Nivel")
 if not df_detectados.empty:
     col_conc1, col_conc2, col_conc3 = st.columns(3)
 
-    riesgo_stats = (
-        df_detectados.groupby("nivel_riesgo_teorico")
-        .agg({"indice_fenomeno_corruptivo": ["count", "mean", "sum"]})
-        .reset_index()
-    )
-    riesgo_stats.columns = ["nivel_riesgo", "cantidad", "promedio", "total"]
+    riesgo_stats = vista["riesgo_stats"]
 
     with col_conc1:
         if "Alto" in riesgo_stats["nivel_riesgo"].values:
@@ -508,19 +585,14 @@ if not df_detectados.empty:
 
     with col_rec1:
         st.markdown("#### 🎯 Escenarios de Mayor Riesgo")
-        top_riesgo = (
-            df_detectados.groupby("tipo_decision")["indice_fenomeno_corruptivo"]
-            .mean()
-            .sort_values(ascending=False)
-            .head(3)
-        )
+        top_riesgo = vista["top_riesgo"]
 
         for i, (escenario, intensidad) in enumerate(top_riesgo.items(), 1):
             st.markdown(f"{i}. **{escenario}**: {intensidad:.1f}/10")
 
     with col_rec2:
         st.markdown("#### 📊 Direcciones de Transferencia")
-        trans_dist = df_detectados["transferencia"].value_counts()
+        trans_dist = vista["trans_dist"]
 
         for transferencia, cantidad in trans_dist.items():
             porcentaje = (cantidad / len(df_detectados) * 100)
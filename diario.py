@@ -2,13 +2,22 @@ import os
 import re
 import time
 import shutil
+import asyncio
+import threading
+import contextvars
 import warnings
-import requests
 import urllib3
 import pandas as pd
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from analisis import analizar_boletin
+from cliente_http import get_condicional
+from procesos_vistos import hash_contenido
+from reportes import FILAS_POR_BLOQUE
+import metricas
+from scraper_comprar import NOMBRE_FUENTE as NOMBRE_FUENTE_COMPRAR, URL_COMPRAR, Cancelado, iterar_licitaciones
 
 # Suprimir warnings de SSL (portal gubernamental con certificado problemático)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -51,61 +60,130 @@ HEADERS = {
 # ==========================================
 # FUNCIÓN DE REQUEST CON REINTENTOS
 # ==========================================
+# Señal de cancelación de la fuente que corre en el hilo actual (modo concurrente)
+_cancelacion = contextvars.ContextVar("cancelacion", default=None)
+# Nombre de la fuente que corre en el contexto actual (etiqueta de las métricas)
+_fuente_actual = contextvars.ContextVar("fuente_actual", default=None)
+
+
+def _fuente():
+    return _fuente_actual.get() or "sin_fuente"
+
+
+class FuenteCancelada(Exception):
+    """La fuente dejó de ser necesaria: otra de mayor prioridad ya respondió o venció su plazo"""
+
+
 def get_con_reintentos(url, intentos=3, timeout=60, espera=10, verify_ssl=False):
     """
     GET con reintentos. verify_ssl=False necesario para comprar.gob.ar
     cuya cadena de certificados está rota desde ~feb 2026.
     """
+    cancelacion = _cancelacion.get()
+    fuente = _fuente()
     ultimo_error = None
     for i in range(1, intentos + 1):
+        if cancelacion is not None and cancelacion.is_set():
+            raise FuenteCancelada(url)
+        if i > 1:
+            metricas.REINTENTOS_FUENTE.inc(fuente=fuente)
+        inicio = time.perf_counter()
         try:
             print(f"   🔄 Intento {i}/{intentos}: {url[:65]}...")
-            resp = requests.get(url, headers=HEADERS, timeout=timeout, verify=verify_ssl)
+            resp = get_condicional(url, headers=HEADERS, timeout=timeout, verify=verify_ssl)
             resp.raise_for_status()
+            metricas.LATENCIA_FUENTE.observar(time.perf_counter() - inicio, fuente=fuente)
+            metricas.BYTES_FUENTE.inc(len(resp.content), fuente=fuente)
+            metricas.PETICIONES_FUENTE.inc(fuente=fuente, resultado="cache" if resp.desde_cache else "ok")
+            if resp.desde_cache:
+                print("   📦 Sin cambios desde la última descarga (304), usando copia local.")
             return resp
         except Exception as e:
+            metricas.LATENCIA_FUENTE.observar(time.perf_counter() - inicio, fuente=fuente)
+            metricas.PETICIONES_FUENTE.inc(fuente=fuente, resultado="error")
             ultimo_error = e
             print(f"   ⚠️ Intento {i} fallido: {type(e).__name__}: {str(e)[:100]}")
             if i < intentos:
                 print(f"   ⏳ Esperando {espera}s antes de reintentar...")
-                time.sleep(espera)
+                if cancelacion is None:
+                    time.sleep(espera)
+                elif cancelacion.wait(espera):
+                    raise FuenteCancelada(url)
     raise ultimo_error
 
 # ==========================================
 # FUENTE 1: SCRAPER COMPRAR.GOB.AR
 # ==========================================
-def extraer_licitaciones_scraper():
-    url = "https://comprar.gob.ar/Compras.aspx?qs=W1HXHGHtH10="
+# Recorre todas las páginas de la grilla; SCRAPER_PAGINADO=0 vuelve a leer sólo la primera
+SCRAPER_PAGINADO = os.getenv("SCRAPER_PAGINADO", "1") != "0"
+
+
+def extraer_licitaciones_scraper(paginado=None):
+    url = URL_COMPRAR
+    if paginado is None:
+        paginado = SCRAPER_PAGINADO
+    if paginado:
+        return extraer_licitaciones_paginado(url)
     try:
         response = get_con_reintentos(url, intentos=3, timeout=60, espera=15, verify_ssl=False)
-        soup = BeautifulSoup(response.text, "html.parser")
-        tabla = soup.find("table", {"id": "ctl00_CPH1_GridLicitaciones"})
-        if not tabla:
-            tabla = soup.find("table")
-        if not tabla:
-            print("   ❌ Tabla de licitaciones no encontrada en el HTML.")
-            return pd.DataFrame()
-        rows = tabla.find_all("tr")
-        datos = []
-        for row in rows[1:]:
-            cols = row.find_all("td")
-            if len(cols) > 4:
-                link_tag = cols[2].find("a")
-                datos.append({
-                    "fecha":          datetime.now().strftime("%Y-%m-%d"),
-                    "nro_proceso":    cols[1].text.strip(),
-                    "detalle":        cols[2].text.strip(),
-                    "tipo_proceso":   cols[3].text.strip(),
-                    "fecha_apertura": cols[4].text.strip(),
-                    "link":           "https://comprar.gob.ar" + link_tag["href"] if link_tag else url,
-                    "fuente":         "Scraper Comprar.gob.ar",
-                })
+        with metricas.PARSEO_FUENTE.cronometrar(fuente=_fuente()):
+            soup = BeautifulSoup(response.text, "html.parser")
+            tabla = soup.find("table", {"id": "ctl00_CPH1_GridLicitaciones"})
+            if not tabla:
+                tabla = soup.find("table")
+            if not tabla:
+                print("   ❌ Tabla de licitaciones no encontrada en el HTML.")
+                return pd.DataFrame()
+            rows = tabla.find_all("tr")
+            datos = []
+            for row in rows[1:]:
+                cols = row.find_all("td")
+                if len(cols) > 4:
+                    link_tag = cols[2].find("a")
+                    datos.append({
+                        "fecha":          datetime.now().strftime("%Y-%m-%d"),
+                        "nro_proceso":    cols[1].text.strip(),
+                        "detalle":        cols[2].text.strip(),
+                        "tipo_proceso":   cols[3].text.strip(),
+                        "fecha_apertura": cols[4].text.strip(),
+                        "link":           "https://comprar.gob.ar" + link_tag["href"] if link_tag else url,
+                        "fuente":         "Scraper Comprar.gob.ar",
+                    })
         print(f"   ✅ Scraper OK: {len(datos)} procesos extraídos.")
         return pd.DataFrame(datos)
     except Exception as e:
         print(f"❌ Scraper falló: {e}")
         return pd.DataFrame()
 
+def dataframe_por_bloques(registros, filas_por_bloque=None):
+    """
+    DataFrame de un iterable de dicts, armado de a FILAS_POR_BLOQUE filas:
+    nunca se juntan todos los dicts en memoria, sólo bloques ya columnares.
+    """
+    filas_por_bloque = filas_por_bloque or FILAS_POR_BLOQUE
+    registros = iter(registros)
+    bloques = []
+    while bloque := list(islice(registros, filas_por_bloque)):
+        bloques.append(pd.DataFrame(bloque))
+    if not bloques:
+        return pd.DataFrame()
+    return pd.concat(bloques, ignore_index=True) if len(bloques) > 1 else bloques[0]
+
+
+def extraer_licitaciones_paginado(url=URL_COMPRAR):
+    """Todas las páginas de la grilla, parseadas en streaming (ver scraper_comprar.py)"""
+    try:
+        df = dataframe_por_bloques(iterar_licitaciones(
+            url, headers=HEADERS, verify=False, detener=_cancelacion.get(),
+        ))
+    except Cancelado as e:
+        raise FuenteCancelada(url) from e
+    except Exception as e:
+        print(f"❌ Scraper paginado falló: {e}")
+        return pd.DataFrame()
+    print(f"   ✅ Scraper OK: {len(df)} procesos extraídos (todas las páginas).")
+    return df
+
 # ==========================================
 # FUENTE 2: API OFICIAL DATOS.GOB.AR (ONC)
 # ==========================================
@@ -119,7 +197,8 @@ def extraer_api_datos_gob():
     for url in endpoints:
         try:
             resp = get_con_reintentos(url, intentos=2, timeout=30, espera=5, verify_ssl=True)
-            records = resp.json().get("result", {}).get("records", [])
+            with metricas.PARSEO_FUENTE.cronometrar(fuente=_fuente()):
+                records = resp.json().get("result", {}).get("records", [])
             if records:
                 datos = [{
                     "fecha":          datetime.now().strftime("%Y-%m-%d"),
@@ -156,25 +235,26 @@ def extraer_boletin_oficial():
     for url in urls_rss:
         try:
             resp = get_con_reintentos(url, intentos=2, timeout=30, espera=5, verify_ssl=True)
-            items = re.findall(r"<item>(.*?)</item>", resp.text, re.DOTALL)
-            for item in items[:100]:
-                titulo_m = re.search(r"<title[^>]*>(.*?)</title>", item, re.DOTALL)
-                link_m   = re.search(r"<link>(.*?)</link>",         item, re.DOTALL)
-                desc_m   = re.search(r"<description[^>]*>(.*?)</description>", item, re.DOTALL)
-                titulo = re.sub(r"<[^>]+>|<!\[CDATA\[|\]\]>", "", titulo_m.group(1) if titulo_m else "").strip()
-                link   = (link_m.group(1) if link_m else "").strip()
-                desc   = re.sub(r"<[^>]+>|<!\[CDATA\[|\]\]>", "", desc_m.group(1) if desc_m else "").strip()
-                texto  = (titulo + " " + desc).lower()
-                if any(p in texto for p in palabras_clave) and titulo:
-                    datos.append({
-                        "fecha":          datetime.now().strftime("%Y-%m-%d"),
-                        "nro_proceso":    "BOL-" + datetime.now().strftime("%H%M%S"),
-                        "detalle":        titulo,
-                        "tipo_proceso":   "Boletín Oficial",
-                        "fecha_apertura": "n/a",
-                        "link":           link,
-                        "fuente":         "Boletín Oficial",
-                    })
+            with metricas.PARSEO_FUENTE.cronometrar(fuente=_fuente()):
+                items = re.findall(r"<item>(.*?)</item>", resp.text, re.DOTALL)
+                for item in items[:100]:
+                    titulo_m = re.search(r"<title[^>]*>(.*?)</title>", item, re.DOTALL)
+                    link_m   = re.search(r"<link>(.*?)</link>",         item, re.DOTALL)
+                    desc_m   = re.search(r"<description[^>]*>(.*?)</description>", item, re.DOTALL)
+                    titulo = re.sub(r"<[^>]+>|<!\[CDATA\[|\]\]>", "", titulo_m.group(1) if titulo_m else "").strip()
+                    link   = (link_m.group(1) if link_m else "").strip()
+                    desc   = re.sub(r"<[^>]+>|<!\[CDATA\[|\]\]>", "", desc_m.group(1) if desc_m else "").strip()
+                    texto  = (titulo + " " + desc).lower()
+                    if any(p in texto for p in palabras_clave) and titulo:
+                        datos.append({
+                            "fecha":          datetime.now().strftime("%Y-%m-%d"),
+                            "nro_proceso":    "BOL-" + hash_contenido(titulo, link)[:12],
+                            "detalle":        titulo,
+                            "tipo_proceso":   "Boletín Oficial",
+                            "fecha_apertura": "n/a",
+                            "link":           link,
+                            "fuente":         "Boletín Oficial",
+                        })
         except Exception as e:
             print(f"   ⚠️ RSS {url[-20:]}: {e}")
     if datos:
@@ -191,22 +271,23 @@ def extraer_argentinacompra():
     url = "https://www.argentinacompra.gov.ar/"
     try:
         resp = get_con_reintentos(url, intentos=2, timeout=30, espera=5, verify_ssl=False)
-        soup = BeautifulSoup(resp.text, "html.parser")
-        datos = []
-        for tabla in soup.find_all("table")[:3]:
-            for row in tabla.find_all("tr")[1:20]:
-                cols = row.find_all("td")
-                if len(cols) >= 2:
-                    link_tag = row.find("a")
-                    datos.append({
-                        "fecha":          datetime.now().strftime("%Y-%m-%d"),
-                        "nro_proceso":    cols[0].text.strip() if cols else "n/a",
-                        "detalle":        cols[1].text.strip() if len(cols) > 1 else "n/a",
-                        "tipo_proceso":   cols[2].text.strip() if len(cols) > 2 else "n/a",
-                        "fecha_apertura": cols[3].text.strip() if len(cols) > 3 else "n/a",
-                        "link":           link_tag["href"] if link_tag else url,
-                        "fuente":         "ArgentinaCompra",
-                    })
+        with metricas.PARSEO_FUENTE.cronometrar(fuente=_fuente()):
+            soup = BeautifulSoup(resp.text, "html.parser")
+            datos = []
+            for tabla in soup.find_all("table")[:3]:
+                for row in tabla.find_all("tr")[1:20]:
+                    cols = row.find_all("td")
+                    if len(cols) >= 2:
+                        link_tag = row.find("a")
+                        datos.append({
+                            "fecha":          datetime.now().strftime("%Y-%m-%d"),
+                            "nro_proceso":    cols[0].text.strip() if cols else "n/a",
+                            "detalle":        cols[1].text.strip() if len(cols) > 1 else "n/a",
+                            "tipo_proceso":   cols[2].text.strip() if len(cols) > 2 else "n/a",
+                            "fecha_apertura": cols[3].text.strip() if len(cols) > 3 else "n/a",
+                            "link":           link_tag["href"] if link_tag else url,
+                            "fuente":         "ArgentinaCompra",
+                        })
         if datos:
             print(f"   ✅ ArgentinaCompra: {len(datos)} registros.")
         else:
@@ -219,18 +300,89 @@ def extraer_argentinacompra():
 # ==========================================
 # ORQUESTADOR: CASCADA DE 4 FUENTES
 # ==========================================
-def extraer_licitaciones():
+# (nombre, función, plazo máximo en segundos) en orden de prioridad.
+# Recorrer todas las páginas del scraper lleva más que leer sólo la primera.
+FUENTES = [
+    (NOMBRE_FUENTE_COMPRAR,      extraer_licitaciones_scraper, 300 if SCRAPER_PAGINADO else 120),
+    ("API datos.gob.ar",         extraer_api_datos_gob,         90),
+    ("Boletín Oficial",          extraer_boletin_oficial,       90),
+    ("ArgentinaCompra",          extraer_argentinacompra,       60),
+]
+
+# Modo concurrente por defecto; EXTRACCION_CONCURRENTE=0 vuelve a la cascada serie
+EXTRACCION_CONCURRENTE = os.getenv("EXTRACCION_CONCURRENTE", "1") != "0"
+
+
+async def extraer_licitaciones_async(fuentes=None):
+    """
+    Lanza todas las fuentes a la vez, cada una con su plazo.
+    Se respeta la prioridad: gana la primera fuente (en orden) que devuelve datos,
+    y en ese momento se cancelan las restantes. El peor caso queda acotado por
+    el plazo más largo, no por la suma de todas las fuentes.
+    """
+    fuentes = fuentes or FUENTES
+    loop = asyncio.get_running_loop()
+    # Executor propio: al terminar no se espera a los hilos de fuentes descartadas
+    executor = ThreadPoolExecutor(max_workers=len(fuentes), thread_name_prefix="fuente")
+    eventos, tareas = [], []
+    for nombre, funcion, plazo in fuentes:
+        evento = threading.Event()
+        ctx = contextvars.copy_context()
+        ctx.run(_cancelacion.set, evento)
+        ctx.run(_fuente_actual.set, nombre)
+        futuro = loop.run_in_executor(executor, ctx.run, funcion)
+        tareas.append(asyncio.ensure_future(asyncio.wait_for(futuro, plazo)))
+        eventos.append(evento)
+
+    try:
+        for (nombre, _, plazo), tarea, evento in zip(fuentes, tareas, eventos):
+            try:
+                df = await tarea
+            except asyncio.TimeoutError:
+                evento.set()
+                print(f"   ⏱️ {nombre}: sin respuesta en {plazo}s, probando siguiente fuente...")
+                continue
+            except Exception as e:
+                print(f"   ⚠️ {nombre} falló: {e}")
+                continue
+            if df is not None and not df.empty:
+                print(f"✅ Fuente activa: {nombre} ({len(df)} registros)")
+                metricas.REGISTROS_FUENTE.inc(len(df), fuente=nombre)
+                return df
+            print(f"   → {nombre}: sin datos, probando siguiente fuente...")
+        print("❌ Todas las fuentes fallaron.")
+        return pd.DataFrame()
+    finally:
+        for tarea, evento in zip(tareas, eventos):
+            evento.set()
+            if tarea.done():
+                if not tarea.cancelled():
+                    tarea.exception()  # marcar como leída
+            else:
+                tarea.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def extraer_licitaciones(concurrente=None):
     print("🔍 Conectando con Comprar.gob.ar...")
-    fuentes = [
-        ("Comprar.gob.ar (scraper)", extraer_licitaciones_scraper),
-        ("API datos.gob.ar",         extraer_api_datos_gob),
-        ("Boletín Oficial",          extraer_boletin_oficial),
-        ("ArgentinaCompra",          extraer_argentinacompra),
-    ]
-    for nombre, funcion in fuentes:
-        df = funcion()
+    if concurrente is None:
+        concurrente = EXTRACCION_CONCURRENTE
+    if concurrente:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(extraer_licitaciones_async())
+        print("   ⚠️ Ya hay un event loop activo: usando la cascada serie.")
+
+    for nombre, funcion, _ in FUENTES:
+        token = _fuente_actual.set(nombre)
+        try:
+            df = funcion()
+        finally:
+            _fuente_actual.reset(token)
         if not df.empty:
             print(f"✅ Fuente activa: {nombre} ({len(df)} registros)")
+            metricas.REGISTROS_FUENTE.inc(len(df), fuente=nombre)
             return df
         print(f"   → {nombre}: sin datos, probando siguiente fuente...")
     print("❌ Todas las fuentes fallaron.")
@@ -239,6 +391,11 @@ def extraer_licitaciones():
 # ==========================================
 # PROCESO PRINCIPAL
 # ==========================================
+# Una línea JSON por corrida con la duración y las métricas por etapa.
+# Vive en data/ para que el workflow diario la versione junto con los reportes.
+METRICAS_ROBOT = os.getenv("METRICAS_ROBOT", os.path.join(DATA_DIR, "metricas_robot.jsonl"))
+
+
 def ejecutar_robot():
     start_time = datetime.now()
     print(f"\n--- INICIO PROCESO DIARIO: {start_time.strftime('%Y-%m-%d %H:%M')} ---")
@@ -285,8 +442,17 @@ def ejecutar_robot():
     else:
         print("❌ Error crítico: El reporte no pudo ser generado.")
 
-    elapsed = (datetime.now() - start_time).seconds
-    print(f"\n⏱️ Tiempo total: {elapsed} segundos.")
+    elapsed = (datetime.now() - start_time).total_seconds()
+    print(f"\n⏱️ Tiempo total: {elapsed:.1f} segundos.")
+    metricas.DURACION_ROBOT.set(round(elapsed, 3))
+    metricas.escribir_linea_json(METRICAS_ROBOT, {
+        "inicio":    start_time.isoformat(timespec="seconds"),
+        "duracion_s": round(elapsed, 3),
+        "fuente":    df_portal["fuente"].iloc[0] if "fuente" in df_portal.columns else None,
+        "registros": len(df_portal),
+        "reporte":   path_excel if path_excel and os.path.exists(path_excel) else None,
+        "metricas":  metricas.REGISTRO.instantanea(),
+    })
     print("--- FIN DEL PROCESO ---")
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+"""
+Consulta de filas de un reporte
+===============================
+
+Filtros, orden y paginación (offset o keyset) sobre las filas de un reporte,
+más exportación en streaming (NDJSON / CSV). El reporte se recorre por
+bloques (reportes.iterar_reporte, o el DataFrame ya cargado si se pasa df):
+una página sólo retiene los candidatos a entrar en ella, y la exportación
+escribe cada bloque apenas se filtra.
+
+El cursor de keyset es opaco: codifica el valor de la columna de orden y la
+posición de la última fila entregada, que desempata filas con igual valor.
+"""
+
+import base64
+import json
+from arranque import modulo_perezoso
+from reportes import FILAS_POR_BLOQUE, MAPEO_COLUMNAS_HISTORICAS, iterar_reporte, renombrar_columnas_historicas
+
+pd = modulo_perezoso("pandas")
+
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+COLUMNAS_ORDENABLES = [
+    "fecha", "nro_proceso", "tipo_decision", "transferencia",
+    "indice_fenomeno_corruptivo", "nivel_riesgo_teorico", "fuente",
+]
+COLUMNAS_NUMERICAS = {"indice_fenomeno_corruptivo"}
+FORMATOS = ("json", "ndjson", "csv")
+
+# Columna auxiliar con la posición original de la fila (desempate del orden y del cursor)
+_FILA = "_fila"
+_CLAVE = "_clave"
+
+# filtro -> columna que necesita leer
+_COLUMNAS_FILTRO = {
+    "categoria": "tipo_decision",
+    "nivel": "nivel_riesgo_teorico",
+    "indice_min": "indice_fenomeno_corruptivo",
+    "indice_max": "indice_fenomeno_corruptivo",
+    "fuente": "fuente",
+    "texto": "detalle",
+}
+
+
+def _texto_normalizado(valor):
+    from analisis import limpiar_texto_curado
+    return limpiar_texto_curado(valor)
+
+
+def filtrar(df, categoria=None, nivel=None, indice_min=None, indice_max=None, fuente=None, texto=None):
+    """Filas que cumplen todos los filtros indicados (texto: sin acentos ni mayúsculas, sobre detalle)"""
+    mascara = pd.Series(True, index=df.index)
+
+    def _igual(columna, valor):
+        if columna not in df.columns:
+            return pd.Series(False, index=df.index)
+        return df[columna].astype(str) == valor
+
+    if categoria is not None:
+        mascara &= _igual("tipo_decision", categoria)
+    if nivel is not None:
+        mascara &= _igual("nivel_riesgo_teorico", nivel)
+    if fuente is not None:
+        mascara &= _igual("fuente", fuente)
+    if indice_min is not None or indice_max is not None:
+        if "indice_fenomeno_corruptivo" in df.columns:
+            indice = pd.to_numeric(df["indice_fenomeno_corruptivo"], errors="coerce")
+        else:
+            indice = pd.Series(float("nan"), index=df.index)
+        if indice_min is not None:
+            mascara &= indice >= indice_min
+        if indice_max is not None:
+            mascara &= indice <= indice_max
+    if texto:
+        if "detalle" in df.columns:
+            from analisis import normalizar_textos
+            mascara &= normalizar_textos(df["detalle"]).str.contains(_texto_normalizado(texto), regex=False)
+        else:
+            mascara &= False
+    return df[mascara]
+
+
+def interpretar_orden(orden):
+    """'indice_fenomeno_corruptivo' o '-indice_fenomeno_corruptivo' -> (columna, descendente)"""
+    if not orden:
+        return None, False
+    descendente = orden.startswith("-")
+    columna = orden.lstrip("-+")
+    if columna not in COLUMNAS_ORDENABLES:
+        raise ValueError(f"orden debe ser una de: {', '.join(COLUMNAS_ORDENABLES)} (prefijo '-' para descendente)")
+    return columna, descendente
+
+
+def codificar_cursor(valor, fila):
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    crudo = json.dumps([valor, int(fila)]).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valor, fila = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return valor, int(fila)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor 'despues' inválido")
+
+
+def _clave(serie, columna):
+    """Valores comparables para ordenar (sin NaN, que romperían el keyset)"""
+    if columna in COLUMNAS_NUMERICAS:
+        return pd.to_numeric(serie, errors="coerce").fillna(float("-inf")).astype(float)
+    return serie.astype(object).where(serie.notna(), "").astype(str)
+
+
+def _columnas_lectura(columnas, columna_orden, filtros):
+    """Columnas a leer del archivo (con sus nombres históricos); None = todas"""
+    if columnas is None:
+        return None
+    necesarias = set(columnas)
+    necesarias.update(_COLUMNAS_FILTRO[f] for f, v in filtros.items() if v is not None)
+    if columna_orden:
+        necesarias.add(columna_orden)
+    historicas = {viejo for viejo, nuevo in MAPEO_COLUMNAS_HISTORICAS.items() if nuevo in necesarias}
+    return sorted(necesarias | historicas)
+
+
+def _en_bloques(df, columnas):
+    """Como iterar_reporte, pero sobre un reporte ya cargado en memoria"""
+    if columnas is not None:
+        df = df[[c for c in columnas if c in df.columns]]
+    if df.empty:
+        yield df
+    for inicio in range(0, len(df), FILAS_POR_BLOQUE):
+        yield df.iloc[inicio:inicio + FILAS_POR_BLOQUE]
+
+
+def _bloques(ruta, filtros, columna_orden=None, columnas=None, df=None):
+    """Bloques filtrados, con la posición original (_fila) y la clave de orden (_clave)"""
+    posicion = 0
+    lectura = _columnas_lectura(columnas, columna_orden, filtros)
+    fuente = iterar_reporte(ruta, lectura) if df is None else _en_bloques(df, lectura)
+    for bloque in fuente:
+        bloque = renombrar_columnas_historicas(bloque)
+        bloque = bloque.assign(**{_FILA: range(posicion, posicion + len(bloque))})
+        posicion += len(bloque)
+        bloque = filtrar(bloque, **filtros)
+        if columna_orden:
+            if columna_orden in bloque.columns:
+                bloque = bloque.assign(**{_CLAVE: _clave(bloque[columna_orden], columna_orden)})
+            else:
+                bloque = bloque.assign(**{_CLAVE: ""})
+        else:
+            bloque = bloque.assign(**{_CLAVE: bloque[_FILA]})
+        yield bloque
+
+
+def _salida(df, columnas):
+    df = df.drop(columns=[_FILA, _CLAVE], errors="ignore")
+    if columnas is not None:
+        df = df[[c for c in columnas if c in df.columns]]
+    return df
+
+
+def consultar_filas(ruta, filtros=None, orden=None, limite=LIMITE_POR_DEFECTO, offset=0,
+                    despues=None, columnas=None, df=None):
+    """
+    Página de filas. Devuelve {total, filas (DataFrame), siguiente}:
+    total = filas que cumplen los filtros; siguiente = cursor para la página
+    siguiente (None si no hay más). Con despues se pagina por keyset y offset
+    se cuenta a partir del cursor. df: el reporte ya cargado (no se lee ruta).
+    """
+    filtros = filtros or {}
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ValueError(f"limite debe estar entre 1 y {LIMITE_MAXIMO}")
+    if offset < 0:
+        raise ValueError("offset no puede ser negativo")
+    columna_orden, descendente = interpretar_orden(orden)
+    cursor = decodificar_cursor(despues) if despues else None
+
+    total = 0
+    restantes = 0
+    candidatos = None
+    hasta = offset + limite
+    for bloque in _bloques(ruta, filtros, columna_orden, columnas, df):
+        total += len(bloque)
+        if cursor is not None:
+            valor, fila = cursor
+            clave = bloque[_CLAVE]
+            try:
+                posterior = clave < valor if descendente else clave > valor
+                empate = (clave == valor) & (bloque[_FILA] > fila)
+            except TypeError:
+                raise ValueError("Cursor 'despues' no corresponde al orden pedido")
+            bloque = bloque[posterior | empate]
+        restantes += len(bloque)
+        # Sólo se conservan las filas que todavía pueden caer en la página
+        candidatos = bloque if candidatos is None else pd.concat([candidatos, bloque])
+        candidatos = candidatos.sort_values(
+            [_CLAVE, _FILA], ascending=[not descendente, True], kind="stable"
+        ).head(hasta)
+
+    if candidatos is None:
+        return {"total": 0, "filas": pd.DataFrame(), "siguiente": None}
+    pagina = candidatos.iloc[offset:hasta]
+    siguiente = None
+    if len(pagina) and restantes > hasta:
+        ultima = pagina.iloc[-1]
+        siguiente = codificar_cursor(ultima[_CLAVE], ultima[_FILA])
+    return {"total": total, "filas": _salida(pagina, columnas), "siguiente": siguiente}
+
+
+def iterar_filas(ruta, filtros=None, orden=None, columnas=None, df=None):
+    """Todas las filas filtradas, por bloques. Sin orden no se materializa el reporte."""
+    filtros = filtros or {}
+    columna_orden, descendente = interpretar_orden(orden)
+    bloques = _bloques(ruta, filtros, columna_orden, columnas, df)
+    if columna_orden is None:
+        for bloque in bloques:
+            yield _salida(bloque, columnas)
+        return
+    # Ordenar exige ver todas las filas filtradas antes de escribir la primera
+    filtradas = [b for b in bloques if len(b)]
+    if not filtradas:
+        return
+    df = pd.concat(filtradas).sort_values([_CLAVE, _FILA], ascending=[not descendente, True], kind="stable")
+    del filtradas
+    for inicio in range(0, len(df), LIMITE_MAXIMO):
+        yield _salida(df.iloc[inicio:inicio + LIMITE_MAXIMO], columnas)
+
+
+def a_ndjson(bloques):
+    for bloque in bloques:
+        if len(bloque):
+            lineas = bloque.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+            yield lineas if lineas.endswith("\n") else lineas + "\n"
+
+
+def a_csv(bloques):
+    encabezado = True
+    for bloque in bloques:
+        if len(bloque) or encabezado:
+            yield bloque.to_csv(index=False, header=encabezado)
+            encabezado = False
+
+
+def filas_a_registros(df):
+    """DataFrame -> lista de dicts JSON-compatibles (NaN -> null)"""
+    if df.empty:
+        return []
+    return json.loads(df.to_json(orient="records", force_ascii=False, date_format="iso"))
@@ -1,10 +1,30 @@
+import time
+_INICIO = time.perf_counter()  # antes de importar FastAPI: mide el arranque en frío
+
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+import json
 import os
+import threading
+from datetime import datetime
+import arranque
+from catalogo import obtener_catalogo
+from filas_reporte import (
+    FORMATOS, LIMITE_POR_DEFECTO, a_csv, a_ndjson, consultar_filas,
+    filas_a_registros, interpretar_orden, iterar_filas,
+)
+from reportes import calcular_resumen, compactar, leer_reporte, leer_resumen, renombrar_columnas_historicas
+from trabajos import GestorTrabajos
+from cache_reportes import CacheReportes
+from cache_respuestas import CacheRespuestas, calcular_etag, encabezados, etag_coincide
+import metricas
+
+# pandas se importa en el primer uso (o en el precalentamiento), no al arrancar
+pd = arranque.modulo_perezoso("pandas")
+tiempos_arranque = arranque.Arranque(_INICIO)
 
 app = FastAPI(
     title="Monitor XAI - Ph.D. Monteverde",
@@ -20,6 +40,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def medir_peticiones(request: Request, call_next):
+    """Histograma de latencia por ruta (la plantilla de la ruta, no la URL concreta)"""
+    inicio = time.perf_counter()
+    estado = 500
+    try:
+        response = await call_next(request)
+        estado = response.status_code
+        return response
+    finally:
+        ruta = getattr(request.scope.get("route"), "path", "sin_ruta")
+        metricas.LATENCIA_HTTP.observar(
+            time.perf_counter() - inicio,
+            metodo=request.method,
+            ruta=ruta,
+            estado=estado,
+        )
+        tiempos_arranque.primera_respuesta(inicio, ruta)
+
+
 # Ruta de datos compatible con Railway y local
 DATA_DIR = "/app/data" if os.path.exists("/app") else "data"
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -27,18 +67,32 @@ os.makedirs(DATA_DIR, exist_ok=True)
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Cache en memoria para Railway (persiste mientras el contenedor esté vivo)
-_df_cache = None
+# Resultado del último análisis en vivo: (ruta de su reporte, momento, df, resumen).
+# Vale hasta que su reporte aparece en el catálogo o llega uno más nuevo.
+_vivo = (None, None, None, None)
+
+# Reportes ya cargados (por id y mtime del catálogo), con presupuesto de memoria
+cache_reportes = CacheReportes()
+
+# Resumen del último reporte en disco: ((ruta, mtime), resumen)
+_resumen_disco = (None, None)
+
+_metricas_lock = threading.Lock()
+
+# Se incrementa con cada análisis en vivo: forma parte del ETag
+_generacion_cache = 0
+
+cache_respuestas = CacheRespuestas()
+
+# Un reporte se carga a la cache si su archivo ocupa a lo sumo esta fracción del
+# presupuesto (en memoria ocupa varias veces lo que el .xlsx/.parquet); los más
+# grandes se siguen leyendo por bloques
+FACTOR_EXPANSION = 4
 
 
 def buscar_todos_los_xlsx(base_dir):
-    archivos = []
-    for root, dirs, files in os.walk(base_dir):
-        for f in files:
-            if f.endswith(".xlsx") or f.endswith(".csv"):
-                archivos.append(os.path.join(root, f))
-    archivos.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-    return archivos
+    # El catálogo se actualiza al guardar cada reporte: no hace falta recorrer data/
+    return [e["ruta"] for e in obtener_catalogo(base_dir).listar()]
 
 
 def etiqueta_archivo(ruta):
@@ -48,84 +102,166 @@ def etiqueta_archivo(ruta):
     return partes[-1]
 
 
-def cargar_ultimo_reporte():
-    global _df_cache
-
-    # Prioridad 1: cache en memoria (resultado del último análisis ejecutado)
-    if _df_cache is not None and not _df_cache.empty:
-        return _df_cache
-
-    # Prioridad 2: archivos en disco
-    archivos = buscar_todos_los_xlsx(DATA_DIR)
-    if not archivos:
-        return pd.DataFrame()
-
-    ruta = archivos[0]
+def _valores_fijos():
+    from matriz import vigente
+    return vigente().valores_columnas
+
+
+def _leer_compacto(entrada):
+    return compactar(renombrar_columnas_historicas(leer_reporte(entrada["ruta"])), _valores_fijos())
+
+
+def cargar_reporte(entrada):
+    """Reporte completo de una entrada del catálogo, desde la cache de reportes o del disco"""
+    return cache_reportes.obtener(entrada, _leer_compacto)
+
+
+def reporte_en_cache(entrada):
+    """El reporte si es chico para la cache (se carga si falta) o si ya está en ella; None = leerlo por bloques"""
+    if (entrada.get("bytes") or 0) * FACTOR_EXPANSION <= cache_reportes.max_bytes:
+        return cargar_reporte(entrada)
+    return cache_reportes.buscar(entrada)
+
+
+def _analisis_vivo(ultimo):
+    """df del análisis en vivo si sigue siendo lo más reciente; si su reporte ya está en el catálogo pasa a la cache"""
+    global _vivo
+    ruta, momento, df, _ = _vivo
+    if df is None:
+        return None
+    if ultimo is None:
+        return df
+    if ultimo["ruta"] != ruta and datetime.fromisoformat(ultimo["timestamp"]) <= momento:
+        return df
+    if ultimo["ruta"] == ruta:
+        cache_reportes.guardar(ultimo, df)
+    _vivo = (None, None, None, None)
+    return None
+
+
+def cargar_ultimo_reporte(columnas=None):
+    ultimo = obtener_catalogo(DATA_DIR).ultimo()
+
+    # Prioridad 1: resultado del último análisis en vivo (si no hay uno más nuevo en disco)
+    df = _analisis_vivo(ultimo)
+
+    # Prioridad 2: último reporte del catálogo (cache de reportes o disco)
+    if df is None:
+        if ultimo is None:
+            return pd.DataFrame()
+        try:
+            df = cargar_reporte(ultimo)
+        except Exception as e:
+            print(f"Error cargando reporte: {e}")
+            return pd.DataFrame()
+
+    if columnas is not None:
+        return df[[c for c in columnas if c in df.columns]]
+    return df
+
+
+def asociar_reporte(vivo, ruta):
+    """El reporte del análisis en vivo vivo ya está en disco: se lo reconoce por su ruta real en el catálogo"""
+    global _vivo
+    if _vivo is vivo:
+        _vivo = (os.path.realpath(ruta), *vivo[1:])
+
+
+def set_cache(df, ruta=None):
+    """Publica el resultado de un análisis en vivo (ruta: la del reporte que se está guardando)"""
+    global _vivo, _generacion_cache
+    _generacion_cache += 1
+    if df is None or df.empty:
+        _vivo = (None, None, None, None)
+        return
+    df = compactar(df, _valores_fijos())
+    _vivo = (os.path.realpath(ruta) if ruta else None, datetime.now(), df, calcular_resumen(df))
+
+
+def obtener_resumen(entrada=None):
+    """
+    Resumen precalculado (KPIs + primeras filas) del reporte pedido o del vigente.
+    Sin entrada: prioriza el análisis en vivo en memoria y luego el último del catálogo.
+    """
+    global _resumen_disco
+
+    if entrada is None:
+        entrada = obtener_catalogo(DATA_DIR).ultimo()
+        resumen_vivo = _vivo[3]
+        if resumen_vivo is not None and _analisis_vivo(entrada) is not None:
+            return resumen_vivo
+        if entrada is None:
+            return calcular_resumen(pd.DataFrame())
+
+    clave = (entrada["ruta"], entrada.get("mtime"))
+    if _resumen_disco[0] == clave:
+        return _resumen_disco[1]
     try:
-        if ruta.endswith(".csv"):
-            return pd.read_csv(ruta)
-        xl = pd.ExcelFile(ruta)
-        hoja = "Sheet1" if "Sheet1" in xl.sheet_names else xl.sheet_names[0]
-        return xl.parse(hoja)
+        resumen = leer_resumen(entrada["ruta"])
     except Exception as e:
-        print(f"Error cargando reporte: {e}")
-        return pd.DataFrame()
+        print(f"Error cargando resumen: {e}")
+        return calcular_resumen(pd.DataFrame())
+    _resumen_disco = (clave, resumen)
+    return resumen
+
+
+# ==========================================
+# CACHE HTTP (ETag + respuestas renderizadas)
+# ==========================================
+def etag_datos(*extra):
+    """ETag de lo que muestran las vistas: último reporte, matriz y análisis en vivo"""
+    from matriz import vigente
+    catalogo = obtener_catalogo(DATA_DIR)
+    ultimo = catalogo.ultimo()
+    return calcular_etag(
+        ultimo["id"] if ultimo else "sin-reportes",
+        ultimo["mtime"] if ultimo else 0,
+        catalogo.total(),
+        _generacion_cache,
+        vigente().version,
+        *extra,
+    )
 
 
-def set_cache(df):
-    global _df_cache
-    _df_cache = df
+def respuesta_cacheada(request, clave, etag, producir, media_type="application/json"):
+    """304 si el cliente ya tiene esta versión; si no, el cuerpo cacheado (o recién generado)"""
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=encabezados(etag, etag))
+    version, cuerpo = cache_respuestas.obtener(clave, etag, producir)
+    return Response(content=cuerpo, media_type=media_type, headers=encabezados(etag, version))
 
 
-@app.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request):
-    archivos = buscar_todos_los_xlsx(DATA_DIR)
-    df = cargar_ultimo_reporte()
-
-    total = len(df) if not df.empty else 0
-    indice_prom = (
-        round(df["indice_fenomeno_corruptivo"].mean(), 2)
-        if not df.empty and "indice_fenomeno_corruptivo" in df.columns
-        else 0
-    )
-    alto_riesgo = (
-        len(df[df["nivel_riesgo_teorico"] == "Alto"])
-        if not df.empty and "nivel_riesgo_teorico" in df.columns
-        else 0
-    )
-    tipo_counts = (
-        df["tipo_decision"].value_counts().to_dict()
-        if not df.empty and "tipo_decision" in df.columns
-        else {}
-    )
-    riesgo_counts = (
-        df["nivel_riesgo_teorico"].value_counts().to_dict()
-        if not df.empty and "nivel_riesgo_teorico" in df.columns
-        else {}
-    )
+def _json(datos):
+    return json.dumps(datos, ensure_ascii=False, default=str).encode("utf-8")
 
-    tabla = []
-    if not df.empty:
-        cols = ["nro_proceso", "detalle", "tipo_decision", "indice_fenomeno_corruptivo", "nivel_riesgo_teorico"]
-        cols_existentes = [c for c in cols if c in df.columns]
-        tabla = df[cols_existentes].head(50).fillna("n/a").to_dict(orient="records")
 
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
-        "total": total,
-        "indice_prom": indice_prom,
-        "alto_riesgo": alto_riesgo,
-        "total_reportes": len(archivos),
-        "tipo_counts": tipo_counts,
-        "riesgo_counts": riesgo_counts,
-        "tabla": tabla,
-        "sin_datos": df.empty,
+def _renderizar_dashboard():
+    catalogo = obtener_catalogo(DATA_DIR)
+    ultimo = catalogo.ultimo()
+    resumen = obtener_resumen()
+
+    return templates.get_template("dashboard.html").render({
+        "total": resumen["total"],
+        "indice_prom": resumen["indice_prom"],
+        "alto_riesgo": resumen["alto_riesgo"],
+        "total_reportes": catalogo.total(),
+        "tipo_counts": resumen["tipo_counts"],
+        "riesgo_counts": resumen["riesgo_counts"],
+        "tabla": resumen["tabla"],
+        "sin_datos": resumen["total"] == 0,
         "ultimo_reporte": (
-            etiqueta_archivo(archivos[0])
-            if archivos
+            etiqueta_archivo(ultimo["ruta"])
+            if ultimo
             else "Sin reportes — ejecute Análisis en Vivo"
         ),
-    })
+    }).encode("utf-8")
+
+
+@app.get("/", response_class=HTMLResponse)
+def dashboard(request: Request):
+    return respuesta_cacheada(
+        request, "dashboard", etag_datos(), _renderizar_dashboard, "text/html; charset=utf-8"
+    )
 
 
 @app.get("/analisis-vivo", response_class=HTMLResponse)
@@ -135,10 +271,10 @@ async def analisis_vivo(request: Request):
 
 @app.get("/documentacion", response_class=HTMLResponse)
 async def documentacion(request: Request):
-    from analisis import MATRIZ_TEORICA
+    from matriz import vigente
     escenarios = [
         {"nombre": k, "transferencia": v["transferencia"], "peso": v["peso"]}
-        for k, v in MATRIZ_TEORICA.items()
+        for k, v in vigente().categorias.items()
     ]
     return templates.TemplateResponse("documentacion.html", {
         "request": request,
@@ -147,72 +283,281 @@ async def documentacion(request: Request):
 
 
 @app.get("/api/status")
-def status():
-    archivos = buscar_todos_los_xlsx(DATA_DIR)
-    return {
-        "status": "activo",
-        "version": "1.0.0",
-        "data_dir": DATA_DIR,
-        "reportes_en_disco": len(archivos),
-        "cache_activo": _df_cache is not None and not _df_cache.empty,
-    }
+def status(request: Request):
+    en_curso = gestor_analisis.en_curso()
+    cache_activo = _analisis_vivo(obtener_catalogo(DATA_DIR).ultimo()) is not None
+
+    def producir():
+        return _json({
+            "status": "activo",
+            "version": "1.0.0",
+            "data_dir": DATA_DIR,
+            "reportes_en_disco": obtener_catalogo(DATA_DIR).total(),
+            "cache_activo": cache_activo,
+            "analisis_en_curso": en_curso.id if en_curso else None,
+        })
+
+    etag = etag_datos(en_curso.id if en_curso else "", cache_activo)
+    return respuesta_cacheada(request, "status", etag, producir)
 
 
 @app.get("/api/reportes")
-def listar_reportes():
-    archivos = buscar_todos_los_xlsx(DATA_DIR)
-    return {
-        "total": len(archivos),
-        "reportes": [etiqueta_archivo(r) for r in archivos],
+def listar_reportes(request: Request):
+    def producir():
+        entradas = obtener_catalogo(DATA_DIR).listar()
+        return _json({
+            "total": len(entradas),
+            "reportes": [etiqueta_archivo(e["ruta"]) for e in entradas],
+            "detalle": [
+                {k: e[k] for k in ("id", "mes", "timestamp", "filas", "bytes", "esquema")}
+                for e in entradas
+            ],
+        })
+
+    return respuesta_cacheada(request, "reportes", etag_datos(), producir)
+
+
+@app.get("/api/reportes/{reporte_id}/filas")
+def filas_de_reporte(
+    reporte_id: str,
+    categoria: str = None,
+    nivel: str = None,
+    indice_min: float = None,
+    indice_max: float = None,
+    fuente: str = None,
+    texto: str = None,
+    orden: str = None,
+    limite: int = LIMITE_POR_DEFECTO,
+    offset: int = 0,
+    despues: str = None,
+    columnas: str = None,
+    formato: str = "json",
+):
+    """
+    Filas de un reporte (id del catálogo o 'ultimo') con filtros, orden y paginación
+    por offset o por cursor (despues). formato=ndjson|csv exporta en streaming
+    todas las filas filtradas, sin paginar.
+    """
+    catalogo = obtener_catalogo(DATA_DIR)
+    entrada = catalogo.ultimo() if reporte_id == "ultimo" else catalogo.obtener(reporte_id)
+    if entrada is None:
+        raise HTTPException(status_code=404, detail=f"Reporte '{reporte_id}' no encontrado")
+    if formato not in FORMATOS:
+        raise HTTPException(status_code=422, detail=f"formato debe ser uno de: {', '.join(FORMATOS)}")
+
+    filtros = {
+        "categoria": categoria, "nivel": nivel, "indice_min": indice_min,
+        "indice_max": indice_max, "fuente": fuente, "texto": texto,
     }
+    columnas = [c.strip() for c in columnas.split(",") if c.strip()] if columnas else None
 
+    try:
+        df = reporte_en_cache(entrada)
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar {entrada['id']} en la cache ({e}); se lee por bloques")
+        df = None
 
-@app.post("/api/analisis")
-def ejecutar_analisis():
     try:
-        import diario
-        from analisis import analizar_boletin
+        if formato != "json":
+            interpretar_orden(orden)  # validar antes de empezar a escribir la respuesta
+            bloques = iterar_filas(entrada["ruta"], filtros, orden, columnas, df)
+            if formato == "ndjson":
+                return StreamingResponse(a_ndjson(bloques), media_type="application/x-ndjson")
+            return StreamingResponse(
+                a_csv(bloques),
+                media_type="text/csv; charset=utf-8",
+                headers={"Content-Disposition": f'attachment; filename="{entrada["id"]}.csv"'},
+            )
+        pagina = consultar_filas(entrada["ruta"], filtros, orden, limite, offset, despues, columnas, df)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-        df_nuevo = diario.extraer_licitaciones()
+    return {
+        "reporte": entrada["id"],
+        "total": pagina["total"],
+        "limite": limite,
+        "offset": offset,
+        "filas": filas_a_registros(pagina["filas"]),
+        "siguiente": pagina["siguiente"],
+    }
 
-        if df_nuevo is None or df_nuevo.empty:
-            raise HTTPException(
-                status_code=404,
-                detail="No se pudieron obtener datos del portal. El sitio comprar.gob.ar puede no estar accesible desde este entorno.",
-            )
 
-        df_res, path_excel, _ = analizar_boletin(df_nuevo)
+# Un solo análisis en vuelo: los pedidos concurrentes se adjuntan al mismo trabajo
+gestor_analisis = GestorTrabajos()
 
-        # Guardar en cache para que el dashboard lo muestre en esta sesión
-        set_cache(df_res)
 
-        return {
-            "status": "ok",
-            "reporte": os.path.basename(path_excel) if path_excel else "guardado_en_memoria",
-            "total_procesos": len(df_res),
-            "indice_promedio": (
-                round(df_res["indice_fenomeno_corruptivo"].mean(), 2)
-                if not df_res.empty
-                else 0
-            ),
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def _ciclo_analisis():
+    import diario
+    from analisis import analizar_boletin
 
+    df_nuevo = diario.extraer_licitaciones()
 
-@app.get("/api/marco-teorico")
-def marco_teorico():
-    from analisis import MATRIZ_TEORICA
+    if df_nuevo is None or df_nuevo.empty:
+        raise HTTPException(
+            status_code=404,
+            detail="No se pudieron obtener datos del portal. El sitio comprar.gob.ar puede no estar accesible desde este entorno.",
+        )
+
+    # El reporte se escribe en segundo plano: la respuesta sale con el resultado en memoria
+    df_res, guardado, _ = analizar_boletin(df_nuevo, en_segundo_plano=True)
+
+    # Guardar en cache para que el dashboard lo muestre en esta sesión
+    set_cache(df_res)
+    vivo = _vivo
+
+    resultado = {
+        "status": "ok",
+        "reporte": None,
+        "persistencia": "pendiente",
+        "total_procesos": len(df_res),
+        "indice_promedio": (
+            round(df_res["indice_fenomeno_corruptivo"].mean(), 2)
+            if not df_res.empty
+            else 0
+        ),
+    }
+
+    def _guardado(futuro):
+        # El resultado del trabajo es este mismo dict: /api/analisis/{id} ve la ruta real o el error
+        error = futuro.exception()
+        ruta = futuro.result() if error is None else None
+        if ruta is None:
+            resultado["persistencia"] = "error"
+            resultado["error_persistencia"] = str(error) if error else "no se pudo escribir el reporte"
+            return
+        resultado["reporte"] = os.path.basename(ruta)
+        resultado["persistencia"] = "ok"
+        asociar_reporte(vivo, ruta)
+
+    guardado.add_done_callback(_guardado)
+    return resultado
+
+
+@app.post("/api/analisis", status_code=202)
+def ejecutar_analisis():
+    trabajo, nuevo = gestor_analisis.enviar(_ciclo_analisis)
     return {
-        "escenarios": [
-            {"escenario": k, "transferencia": v.get("transferencia")}
-            for k, v in MATRIZ_TEORICA.items()
-        ]
+        "job_id": trabajo.id,
+        "estado": trabajo.estado,
+        "nuevo": nuevo,
+        "url_estado": f"/api/analisis/{trabajo.id}",
     }
 
 
+@app.get("/api/analisis/{job_id}")
+def estado_analisis(job_id: str):
+    trabajo = gestor_analisis.obtener(job_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo de análisis inexistente o expirado")
+    return trabajo.a_dict()
+
+
+@app.get("/api/resumen")
+def resumen_reporte(reporte: str = None):
+    """KPIs y primeras filas del reporte indicado (id del catálogo) o del vigente"""
+    entrada = None
+    if reporte:
+        entrada = obtener_catalogo(DATA_DIR).obtener(reporte)
+        if entrada is None:
+            raise HTTPException(status_code=404, detail=f"Reporte '{reporte}' no encontrado")
+    return obtener_resumen(entrada)
+
+
+@app.get("/api/series")
+def series_historicas(desde: str = None, hasta: str = None, dimension: str = None):
+    """Serie diaria de cantidades e índice promedio por tipo_decision, transferencia y nivel de riesgo"""
+    from series import DIMENSIONES, obtener_series, validar_fecha
+
+    try:
+        desde, hasta = validar_fecha(desde), validar_fecha(hasta)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Las fechas deben tener formato YYYY-MM-DD")
+    dimensiones = DIMENSIONES
+    if dimension:
+        if dimension not in DIMENSIONES:
+            raise HTTPException(status_code=422, detail=f"dimension debe ser una de: {', '.join(DIMENSIONES)}")
+        dimensiones = [dimension]
+
+    serie = obtener_series(DATA_DIR).consultar(desde, hasta, dimensiones)
+    return {"desde": desde, "hasta": hasta, "dimensiones": dimensiones, "dias": len(serie), "serie": serie}
+
+
+@app.get("/api/buscar")
+def buscar(q: str, desde: str = None, hasta: str = None, limite: int = 20, offset: int = 0):
+    """Búsqueda de texto completo en todos los reportes, ordenada por relevancia (bm25)"""
+    from busqueda import obtener_indice_busqueda
+    from series import validar_fecha
+
+    try:
+        desde, hasta = validar_fecha(desde), validar_fecha(hasta)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Las fechas deben tener formato YYYY-MM-DD")
+    try:
+        resultado = obtener_indice_busqueda(DATA_DIR).buscar(q, desde, hasta, limite, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"desde": desde, "hasta": hasta, "limite": limite, "offset": offset, **resultado}
+
+
+@app.get("/api/marco-teorico")
+def marco_teorico(request: Request):
+    from matriz import vigente
+    actual = vigente()
+
+    def producir():
+        return _json({
+            "version": actual.version,
+            "etiqueta": actual.etiqueta,
+            "escenarios": [
+                {"escenario": k, "transferencia": v.get("transferencia")}
+                for k, v in actual.categorias.items()
+            ]
+        })
+
+    return respuesta_cacheada(request, "marco-teorico", calcular_etag(actual.version), producir)
+
+
+@app.post("/api/matriz/recargar")
+def recargar_matriz():
+    """Relee matriz_teorica.json ya (sin esperar al próximo análisis)"""
+    import matriz
+    from analisis import matriz_vigente
+    matriz.recargar()
+    actual = matriz_vigente()
+    return {"version": actual.version, "etiqueta": actual.etiqueta, "categorias": len(actual.categorias)}
+
+
+@app.get("/metrics")
+def exponer_metricas():
+    """Métricas en formato Prometheus (fuentes, etapas del análisis, latencias y caches)"""
+    from analisis import _normalizar
+    from cliente_http import cache_http
+    from memo_clasificacion import estadisticas_globales
+
+    # Serializado: dos scrapes intercalados harían creer a seguir() que una cache se reinició
+    with _metricas_lock:
+        respuestas = cache_respuestas.estadisticas()
+        normalizacion = _normalizar.cache_info()
+        caches = {
+            "respuestas": (respuestas["aciertos"] + respuestas["obsoletos"], respuestas["fallos"]),
+            "http_condicional": (cache_http.aciertos, cache_http.fallos),
+            "normalizacion": (normalizacion.hits, normalizacion.misses),
+        }
+        reportes = cache_reportes.estadisticas()
+        caches["reportes"] = (reportes["aciertos"], reportes["fallos"])
+        for medida in ("entradas", "bytes", "max_bytes", "invalidaciones", "desalojos"):
+            metricas.CACHE_TAMANO.set(reportes[medida], cache="reportes", medida=medida)
+        memo = estadisticas_globales()
+        caches["memo_clasificacion"] = (memo["aciertos_memoria"] + memo["aciertos_disco"], memo["fallos"])
+        metricas.CACHE_ACIERTOS_NIVEL.seguir(memo["aciertos_memoria"], cache="memo_clasificacion", nivel="memoria")
+        metricas.CACHE_ACIERTOS_NIVEL.seguir(memo["aciertos_disco"], cache="memo_clasificacion", nivel="disco")
+        for cache, (aciertos, fallos) in caches.items():
+            metricas.CACHE_ACIERTOS.set(metricas.tasa(aciertos, fallos), cache=cache)
+            metricas.CACHE_CONSULTAS.seguir(aciertos, cache=cache, resultado="acierto")
+            metricas.CACHE_CONSULTAS.seguir(fallos, cache=cache, resultado="fallo")
+    return Response(metricas.REGISTRO.exponer(), media_type=metricas.CONTENT_TYPE_PROMETHEUS)
+
+
 @app.get("/api/descargar-articulo")
 def descargar_articulo():
     from fastapi.responses import FileResponse
@@ -223,4 +568,40 @@ def descargar_articulo():
         path=ruta,
         filename="articulo_monteverde_español.docx",
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    )
\ No newline at end of file
+    )
+
+# ==========================================
+# ARRANQUE EN FRÍO
+# ==========================================
+PLANTILLAS = ("dashboard.html", "analisis.html", "documentacion.html")
+
+
+def restaurar_instantanea():
+    """Resumen del último reporte desde la instantánea de arranque (sin pandas); la entrada o None"""
+    global _resumen_disco
+    ultimo = obtener_catalogo(DATA_DIR).ultimo()
+    datos = arranque.leer_instantanea(DATA_DIR, ultimo)
+    if datos is None:
+        return None
+    _resumen_disco = ((ultimo["ruta"], ultimo.get("mtime")), datos["resumen"])
+    print(f"⚡ Instantánea de arranque restaurada: {ultimo['id']} ({datos.get('filas')} filas)")
+    return ultimo
+
+
+def _mapear_instantanea(entrada):
+    cache_reportes.guardar(entrada, compactar(arranque.leer_tabla(DATA_DIR), _valores_fijos()))
+
+
+def iniciar():
+    """Restaura el resumen en el acto; pandas, las filas y las plantillas se cargan en otro hilo"""
+    try:
+        entrada = restaurar_instantanea()
+    except Exception as e:
+        print(f"⚠️ No se pudo restaurar la instantánea de arranque: {e}")
+        entrada = None
+    cargar = (lambda: _mapear_instantanea(entrada)) if entrada else None
+    return arranque.precalentar(cargar, templates, PLANTILLAS)
+
+
+iniciar()
+tiempos_arranque.importado()
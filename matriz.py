@@ -0,0 +1,182 @@
+"""
+Matriz Teórica versionada
+=========================
+
+La matriz (categoría -> keywords, transferencia, peso) se lee de
+matriz_teorica.json y se compila una sola vez en un AutomataPalabrasClave.
+vigente() la vuelve a cargar si el archivo cambió, sin reiniciar el
+servidor; si la versión nueva es inválida se sigue usando la anterior.
+
+La versión de una matriz es la huella de sus categorías: cambia con
+cualquier keyword, peso, transferencia u orden. Cada reporte lleva la
+versión que lo produjo (columna version_matriz) y, al escribirlo, la versión
+se archiva en <datos del reporte>/matrices/<version>.json, así la recalificación puede
+comparar keywords entre versiones y tocar sólo las filas afectadas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from motor_clasificacion import AutomataPalabrasClave, normalizar
+
+ARCHIVO_MATRIZ = os.getenv(
+    "MATRIZ_TEORICA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "matriz_teorica.json")
+)
+DIRECTORIO_HISTORIAL = "matrices"
+SIN_CATEGORIA = "No identificado"
+NIVELES_RIESGO = ("Bajo", "Medio", "Alto")
+
+
+def huella(categorias):
+    # Lista de pares y no dict: el orden de las categorías decide la principal y tiene que contar
+    crudo = json.dumps([[c, d] for c, d in categorias.items()], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(crudo.encode("utf-8")).hexdigest()[:12]
+
+
+def validar(categorias):
+    if not isinstance(categorias, dict) or not categorias:
+        raise ValueError("la matriz no tiene categorías")
+    for categoria, datos in categorias.items():
+        keywords = datos.get("keywords") if isinstance(datos, dict) else None
+        if not keywords or not all(isinstance(k, str) and k.strip() for k in keywords):
+            raise ValueError(f"{categoria}: 'keywords' debe ser una lista de textos no vacíos")
+        for keyword in keywords:
+            # El autómata (y filas_afectadas) buscan sobre texto normalizado: otra forma nunca coincidiría
+            if normalizar(keyword) != keyword:
+                raise ValueError(
+                    f"{categoria}: la keyword {keyword!r} debe ir en minúsculas y sin acentos ({normalizar(keyword)!r})"
+                )
+        if not isinstance(datos.get("transferencia"), str):
+            raise ValueError(f"{categoria}: falta 'transferencia'")
+        if not isinstance(datos.get("peso"), (int, float)) or isinstance(datos.get("peso"), bool):
+            raise ValueError(f"{categoria}: 'peso' debe ser numérico")
+
+
+class Matriz:
+    """Una versión de la matriz, ya compilada (no se modifica: recargar crea otra)"""
+
+    def __init__(self, categorias, etiqueta=None):
+        validar(categorias)
+        self.categorias = categorias
+        self.etiqueta = etiqueta  # "version" declarada en el archivo, para humanos
+        self.version = huella(categorias)
+        self.automata = AutomataPalabrasClave(categorias)
+        self.reglas = {categoria: datos["keywords"] for categoria, datos in categorias.items()}
+        # Valores posibles de las columnas del reporte que salen de la matriz (dtypes categóricos)
+        transferencias = list(dict.fromkeys(datos["transferencia"] for datos in categorias.values()))
+        self.valores_columnas = {
+            "tipo_decision": [*categorias, SIN_CATEGORIA],
+            "transferencia": [*transferencias, SIN_CATEGORIA],
+            "nivel_riesgo_teorico": list(NIVELES_RIESGO),
+        }
+
+
+def cargar(ruta=None):
+    with open(ruta or ARCHIVO_MATRIZ, encoding="utf-8") as f:
+        datos = json.load(f)
+    return Matriz(datos["categorias"], datos.get("version"))
+
+
+_actual = None
+_mtime = None
+_lock = threading.Lock()
+
+
+def vigente():
+    """Matriz actual; se recarga si el archivo cambió desde la última lectura"""
+    global _actual, _mtime
+    try:
+        mtime = os.path.getmtime(ARCHIVO_MATRIZ)
+    except OSError:
+        mtime = None
+    if _actual is not None and mtime == _mtime:
+        return _actual
+    with _lock:
+        if _actual is None or mtime != _mtime:
+            try:
+                nueva = cargar()
+            except (OSError, ValueError, KeyError) as e:
+                if _actual is None:
+                    raise
+                print(f"⚠️ Matriz inválida en {ARCHIVO_MATRIZ} ({e}); se mantiene la versión {_actual.version}")
+            else:
+                if _actual is not None and nueva.version != _actual.version:
+                    print(f"🔄 Matriz recargada: {_actual.version} -> {nueva.version} ({nueva.etiqueta})")
+                _actual = nueva
+            _mtime = mtime
+        return _actual
+
+
+def recargar():
+    """Fuerza la relectura del archivo (p.ej. si se reemplazó con el mismo mtime)"""
+    global _mtime
+    with _lock:
+        _mtime = None
+    return vigente()
+
+
+def archivar(matriz, base_dir):
+    """Guarda la versión en <base_dir>/matrices/<version>.json (una vez por versión)"""
+    destino = os.path.join(base_dir, DIRECTORIO_HISTORIAL, f"{matriz.version}.json")
+    if os.path.exists(destino):
+        return destino
+    try:
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        tmp = destino + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": matriz.etiqueta, "categorias": matriz.categorias}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, destino)
+        return destino
+    except OSError as e:
+        print(f"⚠️ No se pudo archivar la matriz {matriz.version}: {e}")
+        return None
+
+
+def leer_historial(version, *directorios):
+    """Categorías de una versión archivada en alguno de los directorios de datos, o None"""
+    for base_dir in directorios:
+        try:
+            with open(os.path.join(base_dir, DIRECTORIO_HISTORIAL, f"{version}.json"), encoding="utf-8") as f:
+                return json.load(f)["categorias"]
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
+
+
+def diferencia(anteriores, actuales):
+    """
+    Qué cambió entre dos versiones (dicts de categorías):
+    keywords: palabras agregadas, quitadas o movidas de categoría (las filas
+    cuyo texto contiene alguna pueden cambiar de clasificación);
+    orden: si cambió el orden relativo de las categorías (decide la principal
+    cuando coinciden varias); ponderacion: categorías con otro peso o transferencia.
+    """
+    pares_antes = {(c, k) for c, d in anteriores.items() for k in d["keywords"]}
+    pares_ahora = {(c, k) for c, d in actuales.items() for k in d["keywords"]}
+    comunes_antes = [c for c in anteriores if c in actuales]
+    comunes_ahora = [c for c in actuales if c in anteriores]
+    return {
+        "keywords": sorted({k for _, k in pares_antes ^ pares_ahora}),
+        "orden": comunes_antes != comunes_ahora,
+        "ponderacion": sorted(
+            c for c in comunes_ahora
+            if (anteriores[c]["peso"], anteriores[c]["transferencia"]) != (actuales[c]["peso"], actuales[c]["transferencia"])
+        ),
+    }
+
+
+def filas_afectadas(textos, categorias_detectadas, dif):
+    """
+    Máscara de filas a reclasificar según la diferencia: texto (normalizado)
+    con alguna keyword cambiada o, si cambió el orden, con más de una categoría.
+    El autómata busca subcadenas, así que 'contiene' es exactamente 'puede cambiar'.
+    """
+    keywords = dif["keywords"]
+    afectadas = []
+    for texto, detectadas in zip(textos, categorias_detectadas):
+        afectada = any(k in texto for k in keywords)
+        if not afectada and dif["orden"]:
+            afectada = isinstance(detectadas, str) and ";" in detectadas
+        afectadas.append(afectada)
+    return afectadas
@@ -0,0 +1,193 @@
+"""
+Memo de clasificaciones
+=======================
+
+Las descripciones de compras y los títulos del Boletín se repiten mucho de un
+día a otro. El memo guarda el resultado del autómata (categoría, categorías,
+palabras, conteo y evidencia; transferencia, índice y nivel salen de la
+categoría) por hash del texto normalizado + versión de la matriz, en dos
+niveles:
+
+- memoria: LRU de a lo sumo MEMO_MAX_MEMORIA textos;
+- disco: memo_clasificacion.sqlite junto al catálogo, con a lo sumo
+  MEMO_MAX_DISCO filas (se descartan primero las de otras versiones de la
+  matriz y después las usadas hace más tiempo).
+
+Aciertos y fallos de cada nivel se exponen en /metrics.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+ARCHIVO_MEMO = "memo_clasificacion.sqlite"
+MAX_EN_MEMORIA = int(os.getenv("MEMO_MAX_MEMORIA", "20000"))
+MAX_EN_DISCO = int(os.getenv("MEMO_MAX_DISCO", "500000"))
+LOTE_CONSULTA = 500  # claves por SELECT ... IN (...)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    clave TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    usado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memo_usado ON memo (usado);
+"""
+
+
+def clave_texto(texto, version):
+    return f"{version}:{hashlib.sha1(texto.encode('utf-8')).hexdigest()[:20]}"
+
+
+class MemoClasificacion:
+    def __init__(self, base_dir, max_memoria=None, max_disco=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.ruta = os.path.join(self.base_dir, ARCHIVO_MEMO)
+        self.max_memoria = MAX_EN_MEMORIA if max_memoria is None else max_memoria
+        self.max_disco = MAX_EN_DISCO if max_disco is None else max_disco
+        self._lru = OrderedDict()
+        self._lock = threading.RLock()
+        self._creado = False
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        if not self._creado:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.executescript(_ESQUEMA)
+            self._creado = True
+        return conexion
+
+    def _recordar(self, clave, resultado):
+        self._lru[clave] = resultado
+        self._lru.move_to_end(clave)
+        while len(self._lru) > self.max_memoria:
+            self._lru.popitem(last=False)
+
+    def obtener(self, textos, version):
+        """{texto: resultado} de los textos que ya están en el memo (primero memoria, después disco)"""
+        encontrados = {}
+        faltan = {}
+        with self._lock:
+            for texto in textos:
+                clave = clave_texto(texto, version)
+                resultado = self._lru.get(clave)
+                if resultado is not None:
+                    self._lru.move_to_end(clave)
+                    encontrados[texto] = resultado
+                else:
+                    faltan[clave] = texto
+            self.aciertos_memoria += len(encontrados)
+            en_disco = self._leer_disco(faltan) if faltan and self.max_disco else {}
+            for clave, resultado in en_disco.items():
+                self._recordar(clave, resultado)
+                encontrados[faltan[clave]] = resultado
+            self.aciertos_disco += len(en_disco)
+            self.fallos += len(faltan) - len(en_disco)
+        return encontrados
+
+    def _leer_disco(self, faltan):
+        claves = list(faltan)
+        encontrados = {}
+        try:
+            with closing(self._conectar()) as conexion, conexion:
+                for inicio in range(0, len(claves), LOTE_CONSULTA):
+                    lote = claves[inicio:inicio + LOTE_CONSULTA]
+                    filas = conexion.execute(
+                        f"SELECT clave, resultado FROM memo WHERE clave IN ({', '.join('?' * len(lote))})", lote
+                    ).fetchall()
+                    encontrados.update((clave, json.loads(resultado)) for clave, resultado in filas)
+                ahora = time.time()
+                conexion.executemany("UPDATE memo SET usado = ? WHERE clave = ?", [(ahora, c) for c in encontrados])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ Memo de clasificaciones ilegible ({e}); se clasifica sin él")
+            return {}
+        return encontrados
+
+    def guardar(self, resultados, version):
+        """Agrega {texto: resultado} recién clasificados a los dos niveles"""
+        if not resultados:
+            return
+        filas = []
+        ahora = time.time()
+        with self._lock:
+            for texto, resultado in resultados.items():
+                clave = clave_texto(texto, version)
+                self._recordar(clave, resultado)
+                filas.append((clave, version, json.dumps(resultado, ensure_ascii=False), ahora))
+            if not self.max_disco:
+                return
+            try:
+                with closing(self._conectar()) as conexion, conexion:
+                    conexion.executemany(
+                        "INSERT OR REPLACE INTO memo (clave, version, resultado, usado) VALUES (?, ?, ?, ?)", filas
+                    )
+                    self._recortar(conexion, version)
+            except sqlite3.Error as e:
+                print(f"⚠️ No se pudo guardar el memo de clasificaciones: {e}")
+
+    def _recortar(self, conexion, version):
+        total = conexion.execute("SELECT count(*) FROM memo").fetchone()[0]
+        if total <= self.max_disco:
+            return
+        # Se deja margen (90 %) para no recortar en cada corrida
+        sobrantes = total - int(self.max_disco * 0.9)
+        borradas = conexion.execute(
+            "DELETE FROM memo WHERE clave IN (SELECT clave FROM memo WHERE version != ? ORDER BY usado LIMIT ?)",
+            (version, sobrantes),
+        ).rowcount
+        if borradas < sobrantes:
+            conexion.execute(
+                "DELETE FROM memo WHERE clave IN (SELECT clave FROM memo ORDER BY usado LIMIT ?)",
+                (sobrantes - borradas,),
+            )
+
+    def total_en_disco(self):
+        try:
+            with closing(self._conectar()) as conexion:
+                return conexion.execute("SELECT count(*) FROM memo").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def estadisticas(self):
+        consultas = self.aciertos_memoria + self.aciertos_disco + self.fallos
+        return {
+            "en_memoria": len(self._lru),
+            "max_memoria": self.max_memoria,
+            "max_disco": self.max_disco,
+            "aciertos_memoria": self.aciertos_memoria,
+            "aciertos_disco": self.aciertos_disco,
+            "fallos": self.fallos,
+            "tasa_aciertos": round((self.aciertos_memoria + self.aciertos_disco) / consultas, 4) if consultas else 0.0,
+        }
+
+
+_memos = {}
+_memos_lock = threading.Lock()
+
+
+def obtener_memo(base_dir):
+    clave = os.path.realpath(base_dir)
+    with _memos_lock:
+        if clave not in _memos:
+            _memos[clave] = MemoClasificacion(base_dir)
+        return _memos[clave]
+
+
+def estadisticas_globales():
+    """Suma de aciertos y fallos de todos los memos abiertos en este proceso"""
+    totales = {"aciertos_memoria": 0, "aciertos_disco": 0, "fallos": 0}
+    with _memos_lock:
+        memos = list(_memos.values())
+    for memo in memos:
+        for campo in totales:
+            totales[campo] += getattr(memo, campo)
+    return totales
@@ -0,0 +1,274 @@
+"""
+Métricas
+========
+
+Registro mínimo de métricas (contadores, medidores e histogramas con
+etiquetas) que se expone en formato de texto de Prometheus desde /metrics y
+se vuelca como una línea JSON por corrida del robot diario.
+
+Uso:
+    with metricas.ETAPA_ANALISIS.cronometrar(etapa="clasificacion"):
+        ...
+    metricas.BYTES_FUENTE.inc(len(resp.content), fuente="Boletín Oficial")
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Límites (segundos) por defecto de los histogramas de latencia
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas_texto(nombres, valores, extra=None):
+    pares = list(zip(nombres, valores)) + (extra or [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _numero(valor):
+    if valor == math.inf:
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas):
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera las etiquetas {self.etiquetas}, recibió {tuple(etiquetas)}")
+        return tuple(str(etiquetas[e]) for e in self.etiquetas)
+
+    def reiniciar(self):
+        with self._lock:
+            self._valores.clear()
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._fuentes = {}  # último acumulado visto por seguir()
+
+    def inc(self, valor=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def seguir(self, acumulado, **etiquetas):
+        """
+        Avanza el contador hasta el acumulado de otra fuente (p. ej. las
+        estadísticas de una cache). Si la fuente se reinició (su acumulado
+        bajó) se suma el acumulado nuevo: el contador nunca retrocede.
+        """
+        clave = self._clave(etiquetas)
+        with self._lock:
+            previo = self._fuentes.get(clave, 0)
+            self._valores[clave] = self._valores.get(clave, 0) + (acumulado - previo if acumulado >= previo else acumulado)
+            self._fuentes[clave] = acumulado
+
+    def reiniciar(self):
+        with self._lock:
+            self._valores.clear()
+            self._fuentes.clear()
+
+    def valor(self, **etiquetas):
+        return self._valores.get(self._clave(etiquetas), 0)
+
+    def _muestras(self):
+        for clave, valor in sorted(self._valores.items()):
+            yield f"{self.nombre}{_etiquetas_texto(self.etiquetas, clave)} {_numero(valor)}"
+
+    def _instantanea(self):
+        return [{**dict(zip(self.etiquetas, clave)), "valor": valor} for clave, valor in sorted(self._valores.items())]
+
+
+class Medidor(Contador):
+    tipo = "gauge"
+
+    def set(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.limites = tuple(sorted(limites)) + (math.inf,)
+
+    def observar(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            cubetas, suma, cuenta = self._valores.get(clave) or ([0] * len(self.limites), 0.0, 0)
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    cubetas[i] += 1
+            self._valores[clave] = (cubetas, suma + valor, cuenta + 1)
+
+    @contextmanager
+    def cronometrar(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def resumen(self, **etiquetas):
+        """(cuenta, suma) de las observaciones con esas etiquetas"""
+        _, suma, cuenta = self._valores.get(self._clave(etiquetas)) or (None, 0.0, 0)
+        return cuenta, suma
+
+    def _muestras(self):
+        for clave, (cubetas, suma, cuenta) in sorted(self._valores.items()):
+            for limite, acumulado in zip(self.limites, cubetas):
+                le = [("le", _numero(limite))]
+                yield f"{self.nombre}_bucket{_etiquetas_texto(self.etiquetas, clave, le)} {acumulado}"
+            yield f"{self.nombre}_sum{_etiquetas_texto(self.etiquetas, clave)} {_numero(suma)}"
+            yield f"{self.nombre}_count{_etiquetas_texto(self.etiquetas, clave)} {cuenta}"
+
+    def _instantanea(self):
+        return [
+            {**dict(zip(self.etiquetas, clave)), "cuenta": cuenta, "suma": round(suma, 6)}
+            for clave, (_, suma, cuenta) in sorted(self._valores.items())
+        ]
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _alta(self, clase, nombre, ayuda, etiquetas=(), **opciones):
+        with self._lock:
+            if nombre not in self._metricas:
+                self._metricas[nombre] = clase(nombre, ayuda, etiquetas, **opciones)
+            return self._metricas[nombre]
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._alta(Contador, nombre, ayuda, etiquetas)
+
+    def medidor(self, nombre, ayuda, etiquetas=()):
+        return self._alta(Medidor, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre, ayuda, etiquetas=(), limites=LIMITES_SEGUNDOS):
+        return self._alta(Histograma, nombre, ayuda, etiquetas, limites=limites)
+
+    def exponer(self):
+        """Formato de texto de Prometheus (text/plain; version=0.0.4)"""
+        lineas = []
+        for metrica in list(self._metricas.values()):
+            with metrica._lock:
+                muestras = list(metrica._muestras())
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            lineas.extend(muestras)
+        return "\n".join(lineas) + "\n"
+
+    def instantanea(self):
+        """Valores actuales como dict (para la línea JSON de cada corrida)"""
+        datos = {}
+        for metrica in list(self._metricas.values()):
+            with metrica._lock:
+                valores = metrica._instantanea()
+            if valores:
+                datos[metrica.nombre] = valores
+        return datos
+
+    def reiniciar(self):
+        for metrica in list(self._metricas.values()):
+            metrica.reiniciar()
+
+
+REGISTRO = Registro()
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+# ==========================================
+# MÉTRICAS DEL SISTEMA
+# ==========================================
+# Fuentes (diario.py / scraper_comprar.py)
+LATENCIA_FUENTE = REGISTRO.histograma(
+    "monitor_fuente_peticion_segundos", "Latencia de cada pedido HTTP a una fuente", ("fuente",))
+PETICIONES_FUENTE = REGISTRO.contador(
+    "monitor_fuente_peticiones_total", "Pedidos HTTP a fuentes por resultado (ok, cache, error)", ("fuente", "resultado"))
+REINTENTOS_FUENTE = REGISTRO.contador(
+    "monitor_fuente_reintentos_total", "Reintentos de pedidos HTTP a fuentes", ("fuente",))
+BYTES_FUENTE = REGISTRO.contador(
+    "monitor_fuente_bytes_total", "Bytes descargados de cada fuente", ("fuente",))
+PARSEO_FUENTE = REGISTRO.histograma(
+    "monitor_fuente_parseo_segundos", "Tiempo de parseo de las respuestas de cada fuente", ("fuente",))
+REGISTROS_FUENTE = REGISTRO.contador(
+    "monitor_fuente_registros_total", "Registros extraídos de cada fuente", ("fuente",))
+
+# Análisis (analisis.py)
+ETAPA_ANALISIS = REGISTRO.histograma(
+    "monitor_analisis_etapa_segundos", "Duración de cada etapa de analizar_boletin", ("etapa",))
+FILAS_ANALIZADAS = REGISTRO.contador(
+    "monitor_analisis_filas_total", "Filas procesadas por analizar_boletin")
+TEXTOS_CLASIFICADOS = REGISTRO.contador(
+    "monitor_analisis_textos_total", "Textos distintos por origen de la clasificación (automata, reutilizado, memo)", ("origen",))
+
+# API (main.py)
+LATENCIA_HTTP = REGISTRO.histograma(
+    "monitor_http_peticion_segundos", "Latencia de las peticiones HTTP a la API", ("metodo", "ruta", "estado"))
+CACHE_ACIERTOS = REGISTRO.medidor(
+    "monitor_cache_tasa_aciertos", "Proporción de aciertos de cada cache", ("cache",))
+CACHE_CONSULTAS = REGISTRO.contador(
+    "monitor_cache_consultas_total", "Consultas a cada cache por resultado (acierto, fallo)", ("cache", "resultado"))
+CACHE_ACIERTOS_NIVEL = REGISTRO.contador(
+    "monitor_cache_aciertos_por_nivel_total",
+    "Aciertos de las caches de varios niveles, por nivel (ya contados en monitor_cache_consultas_total)",
+    ("cache", "nivel"))
+CACHE_TAMANO = REGISTRO.medidor(
+    "monitor_cache_tamano", "Tamaño de cada cache (entradas, bytes, max_bytes) y descartes (invalidaciones, desalojos)",
+    ("cache", "medida"))
+
+# Arranque (arranque.py)
+ARRANQUE_IMPORTACION = REGISTRO.medidor(
+    "monitor_arranque_importacion_segundos", "Tiempo de importación de la aplicación (main)")
+ARRANQUE_PRIMER_BYTE = REGISTRO.medidor(
+    "monitor_arranque_primer_byte_segundos", "Tiempo desde el arranque hasta la primera respuesta")
+ARRANQUE_PRIMERA_PETICION = REGISTRO.medidor(
+    "monitor_arranque_primera_peticion_segundos", "Latencia de la primera petición atendida")
+ARRANQUE_PRECALENTAMIENTO = REGISTRO.medidor(
+    "monitor_arranque_precalentamiento_segundos", "Duración del precalentamiento (pandas, instantánea, plantillas)")
+
+# Robot diario
+DURACION_ROBOT = REGISTRO.medidor(
+    "monitor_robot_duracion_segundos", "Duración de la última corrida del robot diario")
+
+
+def tasa(aciertos, fallos):
+    total = aciertos + fallos
+    return round(aciertos / total, 4) if total else 0.0
+
+
+def escribir_linea_json(ruta, datos):
+    """Agrega una línea JSON al archivo (una por corrida); no interrumpe la corrida si falla"""
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with open(ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(datos, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"⚠️ No se pudieron guardar las métricas en {ruta}: {e}")
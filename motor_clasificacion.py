@@ -0,0 +1,132 @@
+"""
+Motor de coincidencias de la Matriz Teórica
+===========================================
+
+Autómata Aho-Corasick construido una sola vez a partir de MATRIZ_TEORICA.
+Recorre cada texto una única vez y devuelve todas las palabras clave
+encontradas (con su categoría y posición), en lugar de correr una expresión
+regular por categoría. El costo depende del largo del texto y no de la
+cantidad de palabras clave × categorías.
+"""
+
+import re
+import unicodedata
+from collections import deque, namedtuple
+from functools import lru_cache
+
+Coincidencia = namedtuple("Coincidencia", ["inicio", "fin", "palabra", "categoria"])
+
+
+def _quitar_acentos_nfd(texto):
+    """Descomposición NFD completa: sólo se usa para caracteres fuera de la tabla latina"""
+    return "".join(
+        c for c in unicodedata.normalize("NFD", texto)
+        if unicodedata.category(c) != "Mn"
+    )
+
+
+def _construir_tabla_latina():
+    # Latin-1 + Latin Extended-A/B (U+0080–U+024F): ninguno es una marca combinante,
+    # así que quitar acentos carácter por carácter da el mismo resultado que NFD sobre el texto entero
+    tabla = {}
+    for cp in range(0x80, 0x250):
+        base = _quitar_acentos_nfd(chr(cp))
+        if base != chr(cp):
+            tabla[cp] = base
+    return str.maketrans(tabla)
+
+
+_TABLA_ACENTOS = _construir_tabla_latina()
+_FUERA_DE_TABLA = re.compile("[^\x00-\u024f]")
+TAMANO_CACHE_NORMALIZACION = 65536
+
+
+@lru_cache(maxsize=TAMANO_CACHE_NORMALIZACION)
+def normalizar(texto):
+    """Minúsculas y sin acentos: la forma en que el autómata compara textos y keywords"""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    if _FUERA_DE_TABLA.search(texto) is None:
+        return texto.translate(_TABLA_ACENTOS)
+    return _quitar_acentos_nfd(texto)
+
+
+class AutomataPalabrasClave:
+    """Autómata de búsqueda múltiple sobre texto ya normalizado (minúsculas, sin acentos)"""
+
+    def __init__(self, matriz):
+        self.categorias = list(matriz)
+        self._transiciones = [{}]
+        self._fallo = [0]
+        self._salidas = [()]
+        for categoria, info in matriz.items():
+            for palabra in info["keywords"]:
+                self._agregar(palabra, categoria)
+        self._construir_fallos()
+
+    def _agregar(self, palabra, categoria):
+        estado = 0
+        for c in palabra:
+            siguiente = self._transiciones[estado].get(c)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append(())
+                self._transiciones[estado][c] = siguiente
+            estado = siguiente
+        self._salidas[estado] += ((palabra, categoria),)
+
+    def _construir_fallos(self):
+        # Recorrido BFS: el enlace de fallo de cada estado apunta al sufijo propio más largo del trie
+        cola = deque(self._transiciones[0].values())
+        while cola:
+            estado = cola.popleft()
+            for c, siguiente in self._transiciones[estado].items():
+                cola.append(siguiente)
+                f = self._fallo[estado]
+                while f and c not in self._transiciones[f]:
+                    f = self._fallo[f]
+                self._fallo[siguiente] = self._transiciones[f].get(c, 0)
+                self._salidas[siguiente] += self._salidas[self._fallo[siguiente]]
+
+    def buscar(self, texto):
+        """Todas las coincidencias (superpuestas incluidas) en orden de aparición"""
+        transiciones, fallo, salidas = self._transiciones, self._fallo, self._salidas
+        encontradas = []
+        estado = 0
+        for i, c in enumerate(texto):
+            while estado and c not in transiciones[estado]:
+                estado = fallo[estado]
+            estado = transiciones[estado].get(c, 0)
+            for palabra, categoria in salidas[estado]:
+                encontradas.append(Coincidencia(i + 1 - len(palabra), i + 1, palabra, categoria))
+        return encontradas
+
+    def clasificar(self, texto):
+        """
+        Resume las coincidencias de un texto.
+        La categoría principal es la última de la matriz que coincide (mismo criterio
+        que la aplicación secuencial por categoría usada hasta ahora).
+        """
+        coincidencias = self.buscar(texto) if texto else []
+        conteo = {}
+        palabras = []
+        for m in coincidencias:
+            conteo[m.categoria] = conteo.get(m.categoria, 0) + 1
+            if m.palabra not in palabras:
+                palabras.append(m.palabra)
+        categorias = [c for c in self.categorias if c in conteo]
+        return {
+            "categoria": categorias[-1] if categorias else None,
+            "categorias": categorias,
+            "palabras": palabras,
+            "conteo": conteo,
+            "coincidencias": coincidencias,
+        }
+
+
+def formatear_evidencia(coincidencias):
+    """licitacion[10:20]; iva[35:38] — posiciones sobre el texto normalizado"""
+    return "; ".join(f"{m.palabra}[{m.inicio}:{m.fin}]" for m in coincidencias)
@@ -0,0 +1,142 @@
+"""
+Índice de procesos vistos
+=========================
+
+El robot diario vuelve a traer casi las mismas licitaciones abiertas todos
+los días. Este índice guarda, por nro_proceso + hash del detalle, la
+clasificación ya calculada, para que analizar_boletin sólo clasifique lo
+nuevo o lo que cambió. Se persiste en procesos_vistos.json junto al catálogo.
+
+Cada fila del reporte queda marcada como:
+- nuevo:      el proceso no se había visto nunca
+- modificado: el proceso ya existía pero cambió su detalle
+- arrastrado: mismo proceso y mismo detalle que en una corrida anterior
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+ARCHIVO_INDICE = "procesos_vistos.json"
+DIAS_RETENCION = 180
+
+NUEVO = "nuevo"
+MODIFICADO = "modificado"
+ARRASTRADO = "arrastrado"
+
+_SIN_NUMERO = {"", "n/a", "nan", "none"}
+
+
+def hash_contenido(*partes):
+    """Hash estable del contenido (espacios y mayúsculas no cuentan)"""
+    texto = " ".join(" ".join(str(p or "").split()).lower() for p in partes)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def clave_proceso(nro_proceso, hash_detalle):
+    """nro_proceso si es utilizable; si no, el propio hash del detalle"""
+    nro = str(nro_proceso).strip() if nro_proceso is not None else ""
+    if nro.lower() in _SIN_NUMERO:
+        return f"#{hash_detalle}"
+    return nro
+
+
+class IndiceProcesos:
+    def __init__(self, base_dir, dias_retencion=DIAS_RETENCION):
+        self.base_dir = os.path.abspath(base_dir)
+        self.ruta = os.path.join(self.base_dir, ARCHIVO_INDICE)
+        self.dias_retencion = dias_retencion
+        self._lock = threading.RLock()
+        self._procesos = None  # clave -> {hash, version_matriz, clasificacion, primera_vez, ultima_vez}
+
+    def _cargar(self):
+        if self._procesos is not None:
+            return
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                self._procesos = json.load(f).get("procesos", {})
+        except (OSError, ValueError):
+            self._procesos = {}
+
+    def _guardar(self):
+        tmp = f"{self.ruta}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "procesos": self._procesos}, f, ensure_ascii=False)
+            os.replace(tmp, self.ruta)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el índice de procesos en {self.ruta}: {e}")
+
+    def total(self):
+        with self._lock:
+            self._cargar()
+            return len(self._procesos)
+
+    def revisar(self, claves, hashes, version_matriz):
+        """
+        Estado de cada fila y la clasificación guardada reutilizable
+        (None si hay que clasificar: proceso nuevo, modificado o matriz distinta).
+        """
+        estados, previas = [], []
+        with self._lock:
+            self._cargar()
+            for clave, hash_detalle in zip(claves, hashes):
+                previo = self._procesos.get(clave)
+                if previo is None:
+                    estados.append(NUEVO)
+                    previas.append(None)
+                elif previo["hash"] != hash_detalle:
+                    estados.append(MODIFICADO)
+                    previas.append(None)
+                else:
+                    estados.append(ARRASTRADO)
+                    vigente = previo.get("version_matriz") == version_matriz
+                    previas.append(previo["clasificacion"] if vigente else None)
+        return estados, previas
+
+    def actualizar(self, claves, hashes, clasificaciones, version_matriz, fecha=None, guardar=True):
+        """
+        Registra las filas de una corrida y descarta lo no visto en dias_retencion.
+        Con guardar=False sólo cambia la copia en memoria (ver guardar / descartar_cambios).
+        """
+        fecha = fecha or datetime.now().strftime("%Y-%m-%d")
+        limite = (datetime.strptime(fecha, "%Y-%m-%d") - timedelta(days=self.dias_retencion)).strftime("%Y-%m-%d")
+        with self._lock:
+            self._cargar()
+            for clave, hash_detalle, clasificacion in zip(claves, hashes, clasificaciones):
+                previo = self._procesos.get(clave)
+                self._procesos[clave] = {
+                    "hash": hash_detalle,
+                    "version_matriz": version_matriz,
+                    "clasificacion": clasificacion,
+                    "primera_vez": previo["primera_vez"] if previo else fecha,
+                    "ultima_vez": fecha,
+                }
+            for clave in [c for c, p in self._procesos.items() if p["ultima_vez"] < limite]:
+                del self._procesos[clave]
+            if guardar:
+                self._guardar()
+
+    def guardar(self):
+        with self._lock:
+            if self._procesos is not None:
+                self._guardar()
+
+    def descartar_cambios(self):
+        """Olvida lo no guardado: la próxima lectura vuelve al archivo"""
+        with self._lock:
+            self._procesos = None
+
+
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def obtener_indice(base_dir):
+    clave = os.path.realpath(base_dir)
+    with _indices_lock:
+        if clave not in _indices:
+            _indices[clave] = IndiceProcesos(base_dir)
+        return _indices[clave]
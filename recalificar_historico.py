@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Recalificación del Archivo Histórico
+====================================
+
+Vuelve a aplicar la MATRIZ_TEORICA vigente a todos los reportes del catálogo
+(por ejemplo después de cambiar palabras clave o pesos), repartiendo los
+archivos en un pool de procesos. Cada reporte se reescribe por bloques en
+el directorio de salida con la misma ruta relativa, y al final se arma un
+resultado combinado (recalificado_completo) con la columna "reporte".
+
+Los reportes que indican la versión de la matriz que los produjo (columna
+version_matriz, archivada en <datos>/matrices) se recalifican en forma
+dirigida: sólo pasan por el autómata las filas cuyo texto contiene alguna
+keyword agregada o quitada (ver matriz.diferencia); el resto conserva su
+clasificación y se le recalculan peso y transferencia.
+
+Es reanudable: recalificacion.json registra los archivos terminados con la
+versión de la matriz; al volver a correrlo se saltean los que ya están hechos
+con la misma versión y el original no cambió.
+
+USO:
+    python recalificar_historico.py [directorio_datos] [--salida DIR] [--procesos N]
+                                    [--patron "2026-*"] [--formatos csv,parquet] [--forzar] [--completo]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatch
+import pandas as pd
+from catalogo import obtener_catalogo
+from reportes import EscritorReporte, formatos_configurados, iterar_reporte, renombrar_columnas_historicas
+
+DATA_DIR = "data"
+SALIDA = "resultados_recalificacion"
+ARCHIVO_MANIFIESTO = "recalificacion.json"
+NOMBRE_COMBINADO = "recalificado_completo"
+INDICE = "indice_fenomeno_corruptivo"
+
+
+def _columnas_salida():
+    from analisis import COLUMNAS_REPORTE
+    return COLUMNAS_REPORTE + ["tipo_decision_anterior"]
+
+
+# Columnas que produce la clasificación (las que se reemplazan en una fila reclasificada)
+COLUMNAS_CLASIFICACION = [
+    "tipo_decision", "transferencia", INDICE, "nivel_riesgo_teorico",
+    "categorias_detectadas", "palabras_clave_detectadas", "evidencia_xai",
+]
+
+
+def _filas_a_reclasificar(bloque, actual, directorios, historial):
+    """
+    Máscara de filas a reclasificar según la diferencia de keywords con la
+    versión que produjo el bloque; None si no se puede saber (reporte sin
+    version_matriz, versiones mezcladas o versión no archivada): todas.
+    """
+    import matriz
+    from analisis import normalizar_textos
+
+    if "version_matriz" not in bloque.columns:
+        return None
+    versiones = bloque["version_matriz"].dropna().unique()
+    if len(versiones) != 1 or bloque["version_matriz"].isna().any():
+        return None
+    version = str(versiones[0])
+    if version == actual.version:
+        return [False] * len(bloque)
+    if version not in historial:
+        historial[version] = matriz.leer_historial(version, *directorios)
+    if historial[version] is None:
+        return None
+    dif = matriz.diferencia(historial[version], actual.categorias)
+    detectadas = bloque["categorias_detectadas"] if "categorias_detectadas" in bloque.columns else [None] * len(bloque)
+    return matriz.filas_afectadas(normalizar_textos(bloque["detalle"]), detectadas, dif)
+
+
+def _reponderar(bloque, categorias):
+    """transferencia, índice y nivel a partir de tipo_decision (por si cambiaron pesos o transferencias)"""
+    from analisis import evaluar_riesgo
+
+    tipo = bloque["tipo_decision"].astype(object)
+    bloque["transferencia"] = tipo.map(lambda c: categorias[c]["transferencia"] if c in categorias else "No identificado")
+    bloque[INDICE] = tipo.map(lambda c: float(categorias[c]["peso"]) if c in categorias else 0.0).astype(float)
+    bloque["nivel_riesgo_teorico"] = bloque[INDICE].apply(evaluar_riesgo)
+
+
+def recalificar_archivo(ruta, ruta_base, formatos=None, directorios=(), dirigido=True):
+    """
+    Reclasifica un reporte bloque a bloque y lo escribe en ruta_base.<formato>.
+    Con dirigido=True y un reporte que indica su version_matriz archivada (en
+    directorios/matrices), sólo se pasan por el autómata las filas cuyo texto
+    contiene alguna keyword agregada o quitada; al resto se le recalculan peso
+    y transferencia. Corre en los procesos del pool.
+    Devuelve {salida, filas, reclasificadas, cambios, segundos}.
+    """
+    from analisis import clasificar_filas, matriz_vigente
+
+    inicio = time.perf_counter()
+    actual = matriz_vigente()
+    historial = {}
+    os.makedirs(os.path.dirname(ruta_base), exist_ok=True)
+    columnas = _columnas_salida()
+    reclasificadas = cambios = 0
+    with EscritorReporte(ruta_base, formatos) as escritor:
+        for bloque in iterar_reporte(ruta):
+            if bloque.empty:
+                continue
+            bloque = renombrar_columnas_historicas(bloque)
+            if "detalle" not in bloque.columns:
+                raise ValueError("el reporte no tiene columna 'detalle'")
+            anterior = bloque["tipo_decision"] if "tipo_decision" in bloque.columns else None
+            estado = bloque["estado_proceso"] if "estado_proceso" in bloque.columns else None
+
+            afectadas = _filas_a_reclasificar(bloque, actual, directorios, historial) if dirigido else None
+            if afectadas is None:
+                clasificar_filas(bloque, None, actual)
+                reclasificadas += len(bloque)
+            else:
+                mascara = pd.Series(afectadas, index=bloque.index, dtype=bool)
+                if mascara.any():
+                    parte = bloque[mascara].copy()
+                    clasificar_filas(parte, None, actual)
+                    for col in COLUMNAS_CLASIFICACION:
+                        if col != INDICE:
+                            bloque[col] = bloque[col].astype(object) if col in bloque.columns else None
+                        bloque.loc[mascara, col] = parte[col].values
+                    reclasificadas += int(mascara.sum())
+                _reponderar(bloque, actual.categorias)
+                bloque["version_matriz"] = actual.version
+            # estado_proceso es de la corrida original: no se pisa con "nuevo"
+            if estado is not None:
+                bloque["estado_proceso"] = estado
+            if anterior is not None:
+                bloque["tipo_decision_anterior"] = anterior
+                cambios += int((bloque["tipo_decision"] != anterior.astype(object).fillna("")).sum())
+            else:
+                bloque["tipo_decision_anterior"] = None
+                cambios += len(bloque)
+            escritor.agregar(bloque[[c for c in columnas if c in bloque.columns]])
+        salida = escritor.cerrar()
+    return {
+        "salida": salida,
+        "filas": escritor.filas,
+        "reclasificadas": reclasificadas,
+        "cambios": cambios,
+        "segundos": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def _ruta_salida(salida, entrada):
+    """data/2026-01/reporte_x.xlsx -> <salida>/2026-01/reporte_x (sin extensión)"""
+    relativa = entrada["id"] if os.path.isabs(entrada["archivo"]) else os.path.splitext(entrada["archivo"])[0]
+    return os.path.join(salida, relativa)
+
+
+def _leer_manifiesto(salida, version_matriz):
+    try:
+        with open(os.path.join(salida, ARCHIVO_MANIFIESTO), encoding="utf-8") as f:
+            manifiesto = json.load(f)
+        if manifiesto.get("version_matriz") == version_matriz:
+            return manifiesto
+        print("🔄 La matriz cambió desde la última corrida: se recalifica todo")
+    except (OSError, ValueError):
+        pass
+    return {"version_matriz": version_matriz, "archivos": {}}
+
+
+def _guardar_manifiesto(salida, manifiesto):
+    destino = os.path.join(salida, ARCHIVO_MANIFIESTO)
+    tmp = destino + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, destino)
+
+
+def _normalizar_bloque(bloque, columnas, id_reporte):
+    """Mismas columnas y tipos en todos los bloques (los reportes viejos no tienen todas)"""
+    bloque = bloque.reindex(columns=columnas)
+    for col in columnas:
+        if col == INDICE:
+            bloque[col] = pd.to_numeric(bloque[col], errors="coerce").astype(float)
+        else:
+            bloque[col] = bloque[col].astype("string")
+    bloque.insert(0, "reporte", id_reporte)
+    bloque["reporte"] = bloque["reporte"].astype("string")
+    return bloque
+
+
+def combinar(salida, terminados, formatos=None):
+    """Une los reportes recalificados (en orden de id) en salida/recalificado_completo"""
+    columnas = _columnas_salida()
+    with EscritorReporte(os.path.join(salida, NOMBRE_COMBINADO), formatos) as escritor:
+        for id_reporte, datos in sorted(terminados.items()):
+            if not datos.get("salida"):
+                continue
+            for bloque in iterar_reporte(datos["salida"]):
+                escritor.agregar(_normalizar_bloque(bloque, columnas, id_reporte))
+        return escritor.cerrar(), escritor.filas
+
+
+def recalificar_historico(base_dir=DATA_DIR, salida=SALIDA, procesos=None, patron="*", formatos=None, forzar=False,
+                          dirigido=True):
+    import analisis
+    VERSION_MATRIZ = analisis.matriz_vigente().version
+    directorios = (base_dir, analisis.DATA_DIR)
+
+    formatos = formatos_configurados(formatos)
+    procesos = procesos or os.cpu_count() or 1
+    os.makedirs(salida, exist_ok=True)
+    salida_abs = os.path.abspath(salida)
+
+    entradas = [
+        e for e in obtener_catalogo(base_dir).listar()
+        if fnmatch(e["id"], patron) and not os.path.abspath(e["ruta"]).startswith(salida_abs + os.sep)
+    ]
+    manifiesto = {"version_matriz": VERSION_MATRIZ, "archivos": {}} if forzar else _leer_manifiesto(salida, VERSION_MATRIZ)
+    hechos = manifiesto["archivos"]
+    pendientes = [e for e in entradas if hechos.get(e["id"], {}).get("mtime") != e["mtime"]]
+    # Los más grandes primero: el último archivo en terminar no es uno enorme
+    pendientes.sort(key=lambda e: -e.get("bytes", 0))
+    procesos = max(1, min(procesos, len(pendientes)))
+
+    print(f"📁 {len(entradas)} reportes en {os.path.abspath(base_dir)} (patrón {patron!r})")
+    print(f"⏭️  Ya recalificados con esta matriz: {len(entradas) - len(pendientes)}")
+    print(f"⚙️  Pendientes: {len(pendientes)} con {procesos} procesos\n")
+
+    filas = reclasificadas = cambios = errores = 0
+    inicio = time.perf_counter()
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = {
+                pool.submit(recalificar_archivo, e["ruta"], _ruta_salida(salida, e), formatos, directorios, dirigido): e
+                for e in pendientes
+            }
+            for n, futuro in enumerate(as_completed(futuros), start=1):
+                entrada = futuros[futuro]
+                transcurrido = time.perf_counter() - inicio
+                restante = transcurrido / n * (len(pendientes) - n)
+                progreso = f"[{n}/{len(pendientes)} {n * 100 // len(pendientes)}% ~{restante:.0f}s]"
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    print(f"{progreso} ❌ {entrada['archivo']}: {e}")
+                    errores += 1
+                    continue
+                hechos[entrada["id"]] = {**resultado, "mtime": entrada["mtime"]}
+                _guardar_manifiesto(salida, manifiesto)
+                filas += resultado["filas"]
+                reclasificadas += resultado["reclasificadas"]
+                cambios += resultado["cambios"]
+                print(f"{progreso} ✅ {entrada['archivo']}: {resultado['filas']} filas, "
+                      f"{resultado['reclasificadas']} reclasificadas, "
+                      f"{resultado['cambios']} cambios de categoría ({resultado['segundos']} s)")
+
+    vigentes = {e["id"] for e in entradas}
+    terminados = {i: d for i, d in hechos.items() if i in vigentes}
+    combinado, total = combinar(salida, terminados, formatos)
+
+    print(f"\n{'=' * 50}")
+    print("RESUMEN DE RECALIFICACIÓN")
+    print(f"{'=' * 50}")
+    print(f"✅ Recalificados ahora: {len(pendientes) - errores} ({filas} filas, {reclasificadas} reclasificadas, "
+          f"{cambios} cambios de categoría)")
+    print(f"❌ Errores: {errores}")
+    print(f"📦 Combinado: {combinado} ({total} filas de {len(terminados)} reportes)")
+    print(f"⏱️ Tiempo: {time.perf_counter() - inicio:.1f} s")
+    return combinado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalifica el archivo histórico con la matriz vigente")
+    parser.add_argument("directorio", nargs="?", default=DATA_DIR)
+    parser.add_argument("--salida", default=SALIDA, help="directorio de los reportes recalificados")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument("--patron", default="*", help="id de reporte a incluir, p.ej. '2026-*'")
+    parser.add_argument("--formatos", default=None, help="formatos de salida (por defecto FORMATOS_REPORTE)")
+    parser.add_argument("--forzar", action="store_true", help="ignora lo ya recalificado")
+    parser.add_argument("--completo", action="store_true",
+                        help="pasa todas las filas por el autómata aunque se conozca la versión anterior de la matriz")
+    args = parser.parse_args()
+    recalificar_historico(args.directorio, args.salida, args.procesos, args.patron, args.formatos, args.forzar,
+                          dirigido=not args.completo)
@@ -0,0 +1,587 @@
+"""
+Lectura y escritura de reportes
+===============================
+
+Cada reporte .xlsx/.csv se acompaña de una copia columnar .parquet con el
+mismo nombre base. Los lectores la prefieren (es mucho más rápida que
+parsear el Excel con openpyxl) y sólo cargan las columnas pedidas.
+También se guarda un .resumen.json con los KPIs que muestra el dashboard.
+
+EscritorReporte escribe por bloques y con memoria acotada en los formatos de
+FORMATOS_REPORTE; todo archivo se escribe en un .tmp y se renombra al final.
+"""
+
+import json
+import os
+from arranque import modulo_perezoso
+
+pd = modulo_perezoso("pandas")  # main no paga la importación hasta el primer uso
+
+EXTENSION_COLUMNAR = ".parquet"
+
+# Mapeo de nombres antiguos a nuevos para compatibilidad histórica (esquema 1)
+MAPEO_COLUMNAS_HISTORICAS = {
+    "indice_total": "indice_fenomeno_corruptivo",
+    "nivel_riesgo": "nivel_riesgo_teorico",
+    "origen": "transferencia",
+}
+
+# Columnas numéricas del reporte (con sus nombres históricos); el resto es texto
+COLUMNAS_NUMERICAS = ("indice_fenomeno_corruptivo", "indice_total")
+
+
+def ruta_columnar(ruta):
+    """reporte_fenomenos_X.xlsx -> reporte_fenomenos_X.parquet"""
+    return os.path.splitext(ruta)[0] + EXTENSION_COLUMNAR
+
+
+def _pyarrow_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _preparar_para_arrow(df):
+    # Las columnas object pueden mezclar int/str (nro_proceso, fecha): Arrow exige un tipo único
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def escribir_columnar(df, ruta_reporte):
+    """Guarda la copia .parquet de un reporte. Devuelve la ruta o None si no se pudo."""
+    if not _pyarrow_disponible():
+        return None
+    destino = ruta_columnar(ruta_reporte)
+    tmp = destino + ".tmp"
+    try:
+        _preparar_para_arrow(df).to_parquet(tmp, index=False, engine="pyarrow")
+        os.replace(tmp, destino)
+        return destino
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar la copia columnar {destino}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+
+
+def _columnar_vigente(ruta):
+    """La copia .parquet sólo sirve si existe y no es más vieja que el original"""
+    if ruta.endswith(EXTENSION_COLUMNAR):
+        return ruta
+    destino = ruta_columnar(ruta)
+    try:
+        if os.path.getmtime(destino) >= os.path.getmtime(ruta):
+            return destino
+    except OSError:
+        pass
+    return None
+
+
+def _hoja(xl):
+    return "Sheet1" if "Sheet1" in xl.sheet_names else xl.sheet_names[0]
+
+
+def tipos_uniformes(df):
+    """
+    Los mismos dtypes sin importar de qué formato se leyó el reporte: float64
+    en COLUMNAS_NUMERICAS y str en el resto, con las celdas vacías como
+    faltantes (CSV y Excel no distinguen "" de una celda vacía).
+    """
+    cambios = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in COLUMNAS_NUMERICAS:
+            if serie.dtype != "float64":
+                cambios[col] = pd.to_numeric(serie, errors="coerce").astype("float64")
+            continue
+        texto = serie if serie.dtype == "str" else serie.astype("str")
+        vacias = texto == ""
+        if vacias.any():
+            texto = texto.mask(vacias)
+        if texto is not serie:
+            cambios[col] = texto
+    return df.assign(**cambios) if cambios else df
+
+
+# Texto tal cual (sin inferir números ni fechas); sólo las celdas vacías son faltantes
+_OPCIONES_TEXTO = {"dtype": str, "keep_default_na": False, "na_values": [""]}
+
+
+def renombrar_columnas_historicas(df):
+    """Lleva un reporte de esquema 1 a los nombres de columna actuales"""
+    for viejo, nuevo in MAPEO_COLUMNAS_HISTORICAS.items():
+        if viejo in df.columns and nuevo not in df.columns:
+            df = df.rename(columns={viejo: nuevo})
+    return df
+
+
+def leer_reporte(ruta, columnas=None):
+    """
+    Carga un reporte priorizando la copia columnar.
+    columnas: lista de columnas a leer; las que no existan en el archivo se ignoran.
+    """
+    columnar = _columnar_vigente(ruta) if _pyarrow_disponible() else None
+    if columnar:
+        try:
+            if columnas is not None:
+                import pyarrow.parquet as pq
+                existentes = set(pq.read_schema(columnar).names)
+                columnas = [c for c in columnas if c in existentes]
+            return tipos_uniformes(pd.read_parquet(columnar, columns=columnas, engine="pyarrow"))
+        except Exception as e:
+            print(f"⚠️ Copia columnar ilegible ({e}), leyendo {os.path.basename(ruta)}...")
+
+    usecols = None
+    if columnas is not None:
+        pedidas = set(columnas)
+        usecols = lambda c: c in pedidas  # noqa: E731
+
+    if ruta.endswith(".csv"):
+        return tipos_uniformes(pd.read_csv(ruta, usecols=usecols, **_OPCIONES_TEXTO))
+    xl = pd.ExcelFile(ruta)
+    return tipos_uniformes(xl.parse(_hoja(xl), usecols=usecols, **_OPCIONES_TEXTO))
+
+
+FILAS_POR_BLOQUE = 5000
+
+
+def iterar_reporte(ruta, columnas=None, filas_por_bloque=None):
+    """
+    Como leer_reporte pero por bloques de filas, para recorrer reportes grandes
+    sin tenerlos enteros en memoria (la copia columnar se lee por row groups,
+    el CSV con chunksize; el Excel no se puede leer por partes).
+    """
+    filas_por_bloque = filas_por_bloque or FILAS_POR_BLOQUE
+    columnar = _columnar_vigente(ruta) if _pyarrow_disponible() else None
+    if columnar:
+        entregados = False
+        try:
+            import pyarrow.parquet as pq
+            archivo = pq.ParquetFile(columnar)
+            if columnas is not None:
+                existentes = set(archivo.schema_arrow.names)
+                columnas = [c for c in columnas if c in existentes]
+            for lote in archivo.iter_batches(batch_size=filas_por_bloque, columns=columnas):
+                entregados = True
+                yield tipos_uniformes(lote.to_pandas())
+            if not entregados:
+                yield tipos_uniformes(archivo.schema_arrow.empty_table().to_pandas())
+            return
+        except Exception as e:
+            if entregados:
+                raise
+            print(f"⚠️ Copia columnar ilegible ({e}), leyendo {os.path.basename(ruta)}...")
+
+    if ruta.endswith(".csv"):
+        usecols = None
+        if columnas is not None:
+            pedidas = set(columnas)
+            usecols = lambda c: c in pedidas  # noqa: E731
+        for bloque in pd.read_csv(ruta, usecols=usecols, chunksize=filas_por_bloque, **_OPCIONES_TEXTO):
+            yield tipos_uniformes(bloque)
+        return
+    df = leer_reporte(ruta, columnas)
+    if df.empty:
+        yield df
+    for inicio in range(0, len(df), filas_por_bloque):
+        yield df.iloc[inicio:inicio + filas_por_bloque]
+
+
+# ==========================================
+# REPRESENTACIÓN EN MEMORIA
+# ==========================================
+# Columnas de pocos valores repetidos: categóricas (un código por fila). Las
+# que dependen de la matriz usan un conjunto fijo de categorías (Matriz.valores_columnas)
+# para que todos los reportes en memoria compartan la misma codificación.
+COLUMNAS_CATEGORICAS = (
+    "tipo_decision", "transferencia", "nivel_riesgo_teorico", "fuente", "tipo_proceso",
+    "estado_proceso", "version_matriz",
+)
+# Auxiliares del análisis que no forman parte del reporte
+COLUMNAS_TRANSITORIAS = ("texto_clean",)
+
+
+def compactar(df, valores_fijos=None):
+    """
+    Copia de df lista para quedar en memoria: sin columnas transitorias,
+    categóricas en COLUMNAS_CATEGORICAS (categorías fijas primero, después las
+    que aparezcan) y el resto del texto libre como strings respaldados por Arrow.
+    """
+    valores_fijos = valores_fijos or {}
+    df = df.drop(columns=[c for c in COLUMNAS_TRANSITORIAS if c in df.columns])
+    compactas = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        if col in COLUMNAS_CATEGORICAS:
+            fijos = list(valores_fijos.get(col, ()))
+            conocidos = set(fijos)
+            categorias = fijos + [v for v in serie.dropna().unique() if v not in conocidos]
+            compactas[col] = pd.Categorical(serie, categories=categorias)
+        elif serie.dtype == object:
+            compactas[col] = serie.astype("str")  # pandas 3: respaldado por Arrow si está pyarrow
+    if not compactas:
+        return df
+    return df.assign(**compactas)
+
+
+# ==========================================
+# ESCRITURA EN STREAMING
+# ==========================================
+# El Excel se escribe fila a fila (xlsxwriter constant_memory u openpyxl
+# write_only), el CSV agregando al final y el Parquet por row groups: la
+# memoria no depende del tamaño del reporte. Cada formato va a un .tmp que se
+# renombra al cerrar, así ningún lector ve un archivo a medio escribir.
+FORMATOS_SOPORTADOS = ("xlsx", "csv", "parquet")
+FORMATOS_REPORTE = os.getenv("FORMATOS_REPORTE", "xlsx,parquet")
+MAX_FILAS_EXCEL = 1048575  # filas de datos de una hoja (1.048.576 menos el encabezado)
+
+
+def formatos_configurados(valor=None):
+    """'xlsx,parquet' -> ('xlsx', 'parquet'). Hace falta xlsx o csv: es el archivo que se cataloga."""
+    valor = FORMATOS_REPORTE if valor is None else valor
+    if isinstance(valor, str):
+        valor = valor.split(",")
+    formatos = tuple(dict.fromkeys(f.strip().lower().lstrip(".") for f in valor if f.strip()))
+    invalidos = [f for f in formatos if f not in FORMATOS_SOPORTADOS]
+    if invalidos:
+        raise ValueError(f"Formatos no soportados: {', '.join(invalidos)} (válidos: {', '.join(FORMATOS_SOPORTADOS)})")
+    if "xlsx" not in formatos and "csv" not in formatos:
+        raise ValueError("Los formatos del reporte deben incluir xlsx o csv")
+    return formatos
+
+
+def _xlsxwriter_disponible():
+    try:
+        import xlsxwriter  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _valores_celda(bloque):
+    """Filas del bloque como listas de valores de Python, con None en lugar de NaN"""
+    bloque = bloque.astype(object)
+    return bloque.where(bloque.notna(), None).values.tolist()
+
+
+class _SalidaXlsx:
+    def __init__(self, tmp, columnas):
+        self.tmp = tmp
+        if _xlsxwriter_disponible():
+            import xlsxwriter
+            self._libro = xlsxwriter.Workbook(tmp, {
+                "constant_memory": True,
+                "strings_to_urls": False,
+                "strings_to_formulas": False,
+                "strings_to_numbers": False,
+            })
+            self._hoja = self._libro.add_worksheet("Sheet1")
+            self._hoja.write_row(0, 0, columnas)
+        else:
+            from openpyxl import Workbook
+            self._libro = Workbook(write_only=True)
+            self._hoja = self._libro.create_sheet("Sheet1")
+            self._hoja.append(columnas)
+        self._fila = 1
+
+    def escribir(self, bloque):
+        if self._fila - 1 + len(bloque) > MAX_FILAS_EXCEL:
+            raise ValueError(f"el reporte supera las {MAX_FILAS_EXCEL} filas de una hoja de Excel")
+        for inicio in range(0, len(bloque), FILAS_POR_BLOQUE):
+            for valores in _valores_celda(bloque.iloc[inicio:inicio + FILAS_POR_BLOQUE]):
+                if hasattr(self._hoja, "write_row"):
+                    self._hoja.write_row(self._fila, 0, valores)
+                else:
+                    self._hoja.append(valores)
+                self._fila += 1
+
+    def cerrar(self):
+        if hasattr(self._libro, "close"):
+            self._libro.close()
+        else:
+            self._libro.save(self.tmp)
+
+
+class _SalidaCsv:
+    def __init__(self, tmp, columnas):
+        self.tmp = tmp
+        self._archivo = open(tmp, "w", encoding="utf-8", newline="")
+        pd.DataFrame(columns=columnas).to_csv(self._archivo, index=False)
+
+    def escribir(self, bloque):
+        bloque.to_csv(self._archivo, index=False, header=False)
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class _SalidaParquet:
+    def __init__(self, tmp, columnas):
+        self.tmp = tmp
+        self._escritor = None
+
+    def escribir(self, bloque):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        tabla = pa.Table.from_pandas(_preparar_para_arrow(bloque), preserve_index=False)
+        if self._escritor is None:
+            self._escritor = pq.ParquetWriter(self.tmp, tabla.schema)
+        else:
+            # Un bloque con una columna toda vacía no debe cambiar el tipo de la columna
+            tabla = tabla.cast(self._escritor.schema)
+        self._escritor.write_table(tabla)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+_SALIDAS = {"xlsx": _SalidaXlsx, "csv": _SalidaCsv, "parquet": _SalidaParquet}
+
+
+def _borrar(ruta):
+    try:
+        os.remove(ruta)
+    except OSError:
+        pass
+
+
+class EscritorReporte:
+    """
+    Escribe un reporte por bloques (agregar) en varios formatos a la vez.
+    ruta_base va sin extensión; cerrar() renombra los .tmp y devuelve la ruta
+    del reporte principal (xlsx, si no csv) o None. Si un formato falla se
+    descarta y siguen los demás; si falla el xlsx y no se pidió csv, el CSV se
+    arma desde la copia columnar.
+    """
+
+    def __init__(self, ruta_base, formatos=None):
+        self.ruta_base = ruta_base
+        self.formatos = formatos_configurados(formatos)
+        self.filas = 0
+        self.rutas = {}
+        self._salidas = {}
+        self._columnas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is not None:
+            self.descartar()
+
+    def _abrir(self, columnas):
+        for formato in self.formatos:
+            if formato == "parquet" and not _pyarrow_disponible():
+                continue
+            destino = f"{self.ruta_base}.{formato}"
+            try:
+                self._salidas[formato] = (_SALIDAS[formato](destino + ".tmp", columnas), destino)
+            except Exception as e:
+                print(f"❌ No se pudo crear {os.path.basename(destino)}: {e}")
+                _borrar(destino + ".tmp")
+
+    def _descartar(self, formato, error):
+        salida, destino = self._salidas.pop(formato)
+        print(f"❌ No se pudo guardar {os.path.basename(destino)}: {error}")
+        try:
+            salida.cerrar()
+        except Exception:
+            pass
+        _borrar(salida.tmp)
+
+    def agregar(self, bloque):
+        if self._columnas is None:
+            self._columnas = list(bloque.columns)
+            self._abrir(self._columnas)
+        bloque = bloque.reindex(columns=self._columnas)
+        for formato, (salida, _) in list(self._salidas.items()):
+            try:
+                salida.escribir(bloque)
+            except Exception as e:
+                self._descartar(formato, e)
+        self.filas += len(bloque)
+
+    def cerrar(self):
+        # El principal antes que la copia columnar: la copia no puede quedar más vieja que el original
+        for formato in ("xlsx", "csv", "parquet"):
+            if formato not in self._salidas:
+                continue
+            salida, destino = self._salidas.pop(formato)
+            try:
+                salida.cerrar()
+                os.replace(salida.tmp, destino)
+                self.rutas[formato] = destino
+            except Exception as e:
+                print(f"❌ No se pudo guardar {os.path.basename(destino)}: {e}")
+                _borrar(salida.tmp)
+        principal = self.rutas.get("xlsx") or self.rutas.get("csv")
+        if principal is None and "parquet" in self.rutas:
+            principal = self._csv_desde_columnar()
+        return principal
+
+    def descartar(self):
+        """Abandona la escritura sin dejar archivos"""
+        for formato in list(self._salidas):
+            salida, _ = self._salidas.pop(formato)
+            try:
+                salida.cerrar()
+            except Exception:
+                pass
+            _borrar(salida.tmp)
+
+    def _csv_desde_columnar(self):
+        columnar = self.rutas["parquet"]
+        destino = f"{self.ruta_base}.csv"
+        print(f"⚠️ Armando {os.path.basename(destino)} desde la copia columnar...")
+        salida = None
+        try:
+            import pyarrow.parquet as pq
+            for lote in pq.ParquetFile(columnar).iter_batches(batch_size=FILAS_POR_BLOQUE):
+                bloque = lote.to_pandas()
+                salida = salida or _SalidaCsv(destino + ".tmp", list(bloque.columns))
+                salida.escribir(bloque)
+            salida = salida or _SalidaCsv(destino + ".tmp", self._columnas)
+            salida.cerrar()
+            os.replace(salida.tmp, destino)
+        except Exception as e:
+            print(f"❌ No se pudo guardar {os.path.basename(destino)}: {e}")
+            if salida is not None:
+                _borrar(salida.tmp)
+            return None
+        os.utime(columnar)  # que la copia siga vigente (no más vieja que el CSV)
+        self.rutas["csv"] = destino
+        return destino
+
+
+def guardar_reporte(df, ruta_base, formatos=None):
+    """
+    Escribe un reporte completo en los formatos pedidos (FORMATOS_REPORTE por
+    defecto) y su resumen. Devuelve la ruta del reporte principal o None.
+    """
+    escritor = EscritorReporte(ruta_base, formatos)
+    escritor.agregar(df)
+    ruta = escritor.cerrar()
+    if ruta is None and "csv" not in escritor.formatos:
+        print("❌ Error al guardar Excel. Intentando CSV...")
+        escritor = EscritorReporte(ruta_base, ("csv",))
+        escritor.agregar(df)
+        ruta = escritor.cerrar()
+    if ruta is None:
+        return None
+    print(f"✅ Reporte generado: {ruta}")
+    escribir_resumen(df, ruta)
+    return ruta
+
+
+# ==========================================
+# RESUMEN PRECALCULADO DE CADA REPORTE
+# ==========================================
+# KPIs y primeras filas que muestra el dashboard: se calculan al guardar el
+# reporte y la vista los sirve tal cual, sin trabajo de pandas por request.
+FILAS_RESUMEN = 50
+COLUMNAS_TABLA_RESUMEN = [
+    "nro_proceso", "detalle", "tipo_decision",
+    "indice_fenomeno_corruptivo", "nivel_riesgo_teorico",
+]
+COLUMNAS_RESUMEN = COLUMNAS_TABLA_RESUMEN + ["transferencia"]
+
+
+def ruta_resumen(ruta):
+    """reporte_fenomenos_X.xlsx -> reporte_fenomenos_X.resumen.json"""
+    return os.path.splitext(ruta)[0] + ".resumen.json"
+
+
+def _conteo(df, columna):
+    if df.empty or columna not in df.columns:
+        return {}
+    # Las categóricas cuentan también las categorías sin filas
+    return {str(k): int(v) for k, v in df[columna].value_counts().items() if v}
+
+
+def calcular_resumen(df, filas_tabla=FILAS_RESUMEN):
+    indice = "indice_fenomeno_corruptivo"
+    tabla = []
+    if not df.empty:
+        cols = [c for c in COLUMNAS_TABLA_RESUMEN if c in df.columns]
+        tabla = df[cols].head(filas_tabla).astype(object).fillna("n/a").to_dict(orient="records")
+    return {
+        "total": len(df),
+        "indice_prom": round(float(df[indice].mean()), 2) if not df.empty and indice in df.columns else 0,
+        "alto_riesgo": _conteo(df, "nivel_riesgo_teorico").get("Alto", 0),
+        "tipo_counts": _conteo(df, "tipo_decision"),
+        "riesgo_counts": _conteo(df, "nivel_riesgo_teorico"),
+        "transferencia_counts": _conteo(df, "transferencia"),
+        "tabla": tabla,
+    }
+
+
+class ResumenParcial:
+    """calcular_resumen acumulado bloque a bloque, para reportes que se escriben por partes"""
+
+    def __init__(self, filas_tabla=FILAS_RESUMEN):
+        self.filas_tabla = filas_tabla
+        self.total = 0
+        self._suma_indice = 0.0
+        self._con_indice = 0
+        self._conteos = {"tipo_counts": {}, "riesgo_counts": {}, "transferencia_counts": {}}
+        self._tabla = []
+
+    def agregar(self, df):
+        parcial = calcular_resumen(df, self.filas_tabla - len(self._tabla))
+        self.total += parcial["total"]
+        if "indice_fenomeno_corruptivo" in df.columns:
+            indice = pd.to_numeric(df["indice_fenomeno_corruptivo"], errors="coerce")
+            self._suma_indice += float(indice.sum())
+            self._con_indice += int(indice.count())
+        for clave, acumulado in self._conteos.items():
+            for valor, cantidad in parcial[clave].items():
+                acumulado[valor] = acumulado.get(valor, 0) + cantidad
+        self._tabla.extend(parcial["tabla"])
+
+    def resultado(self):
+        conteos = {
+            clave: dict(sorted(acumulado.items(), key=lambda par: -par[1]))
+            for clave, acumulado in self._conteos.items()
+        }
+        return {
+            "total": self.total,
+            "indice_prom": round(self._suma_indice / self._con_indice, 2) if self._con_indice else 0,
+            "alto_riesgo": conteos["riesgo_counts"].get("Alto", 0),
+            **conteos,
+            "tabla": self._tabla,
+        }
+
+
+def escribir_resumen(df, ruta_reporte, filas_tabla=FILAS_RESUMEN):
+    """Guarda el resumen junto al reporte. Devuelve el resumen calculado."""
+    return guardar_resumen(calcular_resumen(df, filas_tabla), ruta_reporte)
+
+
+def guardar_resumen(resumen, ruta_reporte):
+    destino = ruta_resumen(ruta_reporte)
+    tmp = destino + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, ensure_ascii=False, default=str)
+        os.replace(tmp, destino)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el resumen {destino}: {e}")
+    return resumen
+
+
+def leer_resumen(ruta_reporte):
+    """Resumen guardado del reporte; si no existe (reportes viejos) se calcula y se guarda"""
+    try:
+        with open(ruta_resumen(ruta_reporte), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    return escribir_resumen(leer_reporte(ruta_reporte, COLUMNAS_RESUMEN), ruta_reporte)
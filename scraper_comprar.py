@@ -0,0 +1,229 @@
+"""
+Scraper paginado de comprar.gob.ar
+==================================
+
+La grilla ctl00_CPH1_GridLicitaciones es un GridView de ASP.NET: cada página
+se pide con un postback (__EVENTTARGET = la grilla, __EVENTARGUMENT = Page$N)
+que reenvía los campos ocultos (__VIEWSTATE, __EVENTVALIDATION, ...) de la
+página cuyo paginador ofrece ese número.
+
+- Cada respuesta se parsea en streaming con lxml.etree.HTMLPullParser: las
+  filas se emiten a medida que llegan los bytes y se descartan del árbol.
+- Las páginas se piden con concurrencia acotada (MAX_PAGINAS_EN_VUELO) y los
+  registros se entregan con un generador, así la memoria no crece con el
+  tamaño del listado.
+"""
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from lxml import etree
+from cliente_http import obtener_sesion
+import metricas
+
+URL_COMPRAR = "https://comprar.gob.ar/Compras.aspx?qs=W1HXHGHtH10="
+NOMBRE_FUENTE = "Comprar.gob.ar (scraper)"
+GRID_ID = "ctl00_CPH1_GridLicitaciones"
+MAX_PAGINAS_EN_VUELO = 4
+MAX_PAGINAS = 500
+TAMANO_BLOQUE = 64 * 1024
+
+_POSTBACK_PAGINA = re.compile(r"__doPostBack\('([^']+)','Page\$(\d+)'\)")
+
+
+class Cancelado(Exception):
+    """Se pidió detener la descarga (detener.set())"""
+
+
+class ParserGrilla:
+    """Parser incremental: feed(bytes) -> registros completos hasta ese punto"""
+
+    def __init__(self, url_base, encoding=None):
+        self.url_base = url_base
+        self.campos = {}        # campos ocultos del formulario (para el próximo postback)
+        self.paginas = set()    # números de página que ofrece el paginador
+        self.destino = None     # __EVENTTARGET de la grilla
+        self._parser = etree.HTMLPullParser(events=("end",), encoding=encoding)
+
+    def feed(self, datos):
+        self._parser.feed(datos)
+        return list(self._procesar())
+
+    def close(self):
+        self._parser.close()
+        return list(self._procesar())
+
+    def _procesar(self):
+        for _, elem in self._parser.read_events():
+            if elem.tag == "input" and (elem.get("type") or "").lower() == "hidden" and elem.get("name"):
+                self.campos[elem.get("name")] = elem.get("value", "")
+            elif elem.tag == "a":
+                m = _POSTBACK_PAGINA.search(elem.get("href") or "")
+                if m:
+                    self.destino = m.group(1)
+                    self.paginas.add(int(m.group(2)))
+            elif elem.tag == "tr" and _tabla_de(elem) == GRID_ID:
+                registro = self._registro(elem)
+                # Fila ya usada: se libera junto con las anteriores
+                elem.clear()
+                padre = elem.getparent()
+                if padre is not None:
+                    while elem.getprevious() is not None:
+                        del padre[0]
+                if registro:
+                    yield registro
+
+    def _registro(self, tr):
+        cols = tr.findall("td")
+        if len(cols) <= 4:
+            return None
+        link_tag = cols[2].find(".//a[@href]")
+        href = link_tag.get("href") if link_tag is not None else None
+        if href and href.startswith("javascript:"):
+            href = None
+        return {
+            "fecha":          datetime.now().strftime("%Y-%m-%d"),
+            "nro_proceso":    _texto(cols[1]),
+            "detalle":        _texto(cols[2]),
+            "tipo_proceso":   _texto(cols[3]),
+            "fecha_apertura": _texto(cols[4]),
+            "link":           "https://comprar.gob.ar" + href if href else self.url_base,
+            "fuente":         "Scraper Comprar.gob.ar",
+        }
+
+
+def _tabla_de(elem):
+    """id de la tabla más cercana (las tablas anidadas del paginador no son la grilla)"""
+    for tabla in elem.iterancestors("table"):
+        return tabla.get("id")
+    return None
+
+
+def _texto(elem):
+    return "".join(elem.itertext()).strip()
+
+
+def _pedir(url, campos=None, headers=None, timeout=60, verify=True, intentos=2, espera=5, detener=None):
+    """GET (campos=None) o postback de una página, con reintentos; el cuerpo queda sin leer (stream)"""
+    ultimo_error = None
+    for i in range(1, intentos + 1):
+        if detener is not None and detener.is_set():
+            raise Cancelado(url)
+        if i > 1:
+            metricas.REINTENTOS_FUENTE.inc(fuente=NOMBRE_FUENTE)
+        inicio = time.perf_counter()
+        try:
+            sesion = obtener_sesion()
+            if campos is None:
+                resp = sesion.get(url, headers=headers, timeout=timeout, verify=verify, stream=True)
+            else:
+                resp = sesion.post(url, data=campos, headers=headers, timeout=timeout, verify=verify, stream=True)
+            resp.raise_for_status()
+            # Hasta los encabezados: el cuerpo se mide al leerlo (bytes y parseo)
+            metricas.LATENCIA_FUENTE.observar(time.perf_counter() - inicio, fuente=NOMBRE_FUENTE)
+            metricas.PETICIONES_FUENTE.inc(fuente=NOMBRE_FUENTE, resultado="ok")
+            return resp
+        except Exception as e:
+            metricas.LATENCIA_FUENTE.observar(time.perf_counter() - inicio, fuente=NOMBRE_FUENTE)
+            metricas.PETICIONES_FUENTE.inc(fuente=NOMBRE_FUENTE, resultado="error")
+            ultimo_error = e
+            pagina = campos.get("__EVENTARGUMENT") if campos else "Page$1"
+            print(f"   ⚠️ {pagina}, intento {i} fallido: {type(e).__name__}: {str(e)[:100]}")
+            if i < intentos:
+                if detener is None:
+                    time.sleep(espera)
+                elif detener.wait(espera):
+                    raise Cancelado(url)
+    raise ultimo_error
+
+
+def _filas(resp, parser, detener=None):
+    """Registros de la respuesta a medida que llegan los bloques"""
+    parseo = 0.0
+    with resp:
+        for bloque in resp.iter_content(chunk_size=TAMANO_BLOQUE):
+            if detener is not None and detener.is_set():
+                raise Cancelado(resp.url)
+            metricas.BYTES_FUENTE.inc(len(bloque), fuente=NOMBRE_FUENTE)
+            inicio = time.perf_counter()
+            registros = parser.feed(bloque)
+            parseo += time.perf_counter() - inicio
+            yield from registros
+        inicio = time.perf_counter()
+        registros = parser.close()
+        parseo += time.perf_counter() - inicio
+        metricas.PARSEO_FUENTE.observar(parseo, fuente=NOMBRE_FUENTE)
+        yield from registros
+
+
+def _descargar_pagina(url, campos, detener=None, **opciones):
+    resp = _pedir(url, campos, detener=detener, **opciones)
+    parser = ParserGrilla(url, encoding=resp.encoding)
+    parser.registros = list(_filas(resp, parser, detener))
+    return parser
+
+
+def iterar_licitaciones(url=URL_COMPRAR, headers=None, verify=True, timeout=60,
+                        max_en_vuelo=MAX_PAGINAS_EN_VUELO, max_paginas=MAX_PAGINAS, detener=None):
+    """
+    Generador con todas las filas de la grilla, recorriendo todas las páginas.
+    La primera página se entrega fila a fila mientras se descarga; el resto a
+    medida que termina cada página, con a lo sumo max_en_vuelo pedidos a la vez.
+    """
+    opciones = dict(headers=headers, verify=verify, timeout=timeout, detener=detener)
+    vistos = set()
+
+    def _nuevos(registros):
+        for registro in registros:
+            clave = (registro["nro_proceso"], registro["detalle"])
+            if clave not in vistos:
+                vistos.add(clave)
+                yield registro
+
+    resp = _pedir(url, **opciones)
+    primera = ParserGrilla(url, encoding=resp.encoding)
+    yield from _nuevos(_filas(resp, primera, detener))
+
+    # pagina -> campos del formulario desde el que se puede pedir
+    pendientes = {}
+    pedidas = {1}
+
+    def _descubrir(parser):
+        if not parser.destino:
+            return
+        for n in sorted(parser.paginas):
+            if n not in pedidas and n not in pendientes and len(pedidas) + len(pendientes) < max_paginas:
+                campos = dict(parser.campos)
+                campos["__EVENTTARGET"] = parser.destino
+                campos["__EVENTARGUMENT"] = f"Page${n}"
+                pendientes[n] = campos
+
+    _descubrir(primera)
+    if not pendientes:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_en_vuelo, thread_name_prefix="comprar") as executor:
+        en_vuelo = {}
+        try:
+            while pendientes or en_vuelo:
+                while pendientes and len(en_vuelo) < max_en_vuelo:
+                    n = min(pendientes)
+                    campos = pendientes.pop(n)
+                    pedidas.add(n)
+                    en_vuelo[executor.submit(_descargar_pagina, url, campos, **opciones)] = n
+                listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    n = en_vuelo.pop(futuro)
+                    try:
+                        parser = futuro.result()
+                    except Cancelado:
+                        raise
+                    except Exception as e:
+                        print(f"   ⚠️ Página {n} descartada: {type(e).__name__}: {str(e)[:100]}")
+                        continue
+                    yield from _nuevos(parser.registros)
+                    _descubrir(parser)
+        finally:
+            for futuro in en_vuelo:
+                futuro.cancel()
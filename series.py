@@ -0,0 +1,172 @@
+"""
+Series históricas
+=================
+
+Agregados por reporte (cantidad de procesos y suma del índice por
+tipo_decision, transferencia y nivel_riesgo_teorico) guardados en
+series_agregadas.json junto al catálogo. Se actualizan al registrar cada
+reporte nuevo; los reportes históricos que todavía no tienen agregados se
+leen una única vez, la primera vez que se consulta la serie.
+
+Cuando hay varios reportes en un mismo día, la serie diaria usa el último.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from catalogo import al_registrar, obtener_catalogo
+from reportes import leer_reporte, renombrar_columnas_historicas, MAPEO_COLUMNAS_HISTORICAS
+
+ARCHIVO_SERIES = "series_agregadas.json"
+INDICE = "indice_fenomeno_corruptivo"
+DIMENSIONES = ["tipo_decision", "transferencia", "nivel_riesgo_teorico"]
+COLUMNAS_SERIES = DIMENSIONES + [INDICE] + list(MAPEO_COLUMNAS_HISTORICAS)
+
+
+def calcular_agregados(df):
+    """{total, suma_indice, dimensiones: {dimension: {valor: [cantidad, suma_indice]}}}"""
+    df = renombrar_columnas_historicas(df)
+    indice = df[INDICE].astype(float).fillna(0.0) if INDICE in df.columns else None
+    agregados = {
+        "total": int(len(df)),
+        "suma_indice": float(indice.sum()) if indice is not None else 0.0,
+        "dimensiones": {},
+    }
+    for dimension in DIMENSIONES:
+        if dimension not in df.columns:
+            continue
+        valores = df[dimension].astype(object).fillna("n/a").astype(str)
+        if indice is not None:
+            grupos = indice.groupby(valores).agg(["count", "sum"])
+            agregados["dimensiones"][dimension] = {
+                str(v): [int(fila["count"]), float(fila["sum"])] for v, fila in grupos.iterrows()
+            }
+        else:
+            agregados["dimensiones"][dimension] = {
+                str(v): [int(n), 0.0] for v, n in valores.value_counts().items()
+            }
+    return agregados
+
+
+class SeriesHistoricas:
+    def __init__(self, base_dir):
+        self.base_dir = os.path.abspath(base_dir)
+        self.ruta = os.path.join(self.base_dir, ARCHIVO_SERIES)
+        self._lock = threading.RLock()
+        self._reportes = None  # id -> agregados + fecha/timestamp/mtime
+
+    def _cargar(self):
+        if self._reportes is not None:
+            return
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                self._reportes = json.load(f).get("reportes", {})
+        except (OSError, ValueError):
+            self._reportes = {}
+
+    def _guardar(self):
+        tmp = f"{self.ruta}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "reportes": self._reportes}, f, ensure_ascii=False)
+            os.replace(tmp, self.ruta)
+        except OSError as e:
+            print(f"⚠️ No se pudieron guardar las series en {self.ruta}: {e}")
+
+    def _agregar(self, entrada, df):
+        agregados = calcular_agregados(df)
+        agregados.update({
+            "fecha": entrada["timestamp"][:10],
+            "timestamp": entrada["timestamp"],
+            "mtime": entrada["mtime"],
+        })
+        self._reportes[entrada["id"]] = agregados
+
+    def registrar(self, entrada, df):
+        """Suma un reporte recién guardado (df ya en memoria: no se relee)"""
+        with self._lock:
+            self._cargar()
+            self._agregar(entrada, df)
+            self._guardar()
+
+    def sincronizar(self):
+        """Agrega los reportes del catálogo que faltan o cambiaron y quita los que ya no existen"""
+        with self._lock:
+            self._cargar()
+            entradas = {e["id"]: e for e in obtener_catalogo(self.base_dir).listar()}
+            cambios = 0
+            for id_reporte in list(self._reportes):
+                if id_reporte not in entradas:
+                    del self._reportes[id_reporte]
+                    cambios += 1
+            for id_reporte, entrada in entradas.items():
+                previo = self._reportes.get(id_reporte)
+                if previo is not None and previo.get("mtime") == entrada["mtime"]:
+                    continue
+                try:
+                    self._agregar(entrada, leer_reporte(entrada["ruta"], COLUMNAS_SERIES))
+                    cambios += 1
+                except Exception as e:
+                    print(f"⚠️ No se pudo agregar {entrada['archivo']} a las series: {e}")
+            if cambios:
+                self._guardar()
+                print(f"📈 Series actualizadas: {cambios} reportes")
+
+    def consultar(self, desde=None, hasta=None, dimensiones=None):
+        """Serie diaria entre desde y hasta (YYYY-MM-DD, inclusive)"""
+        dimensiones = dimensiones or DIMENSIONES
+        self.sincronizar()
+        with self._lock:
+            por_dia = {}
+            for agregados in self._reportes.values():
+                fecha = agregados["fecha"]
+                if (desde and fecha < desde) or (hasta and fecha > hasta):
+                    continue
+                if fecha not in por_dia or agregados["timestamp"] > por_dia[fecha]["timestamp"]:
+                    por_dia[fecha] = agregados
+
+        serie = []
+        for fecha in sorted(por_dia):
+            agregados = por_dia[fecha]
+            punto = {
+                "fecha": fecha,
+                "total": agregados["total"],
+                "indice_promedio": _promedio(agregados["suma_indice"], agregados["total"]),
+            }
+            for dimension in dimensiones:
+                punto[dimension] = {
+                    valor: {"cantidad": n, "indice_promedio": _promedio(suma, n)}
+                    for valor, (n, suma) in agregados["dimensiones"].get(dimension, {}).items()
+                }
+            serie.append(punto)
+        return serie
+
+
+def _promedio(suma, n):
+    return round(suma / n, 2) if n else 0.0
+
+
+def validar_fecha(valor):
+    """Acepta YYYY-MM-DD; lanza ValueError con un mensaje claro si no"""
+    if valor is None:
+        return None
+    return datetime.strptime(valor, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+_series = {}
+_series_lock = threading.Lock()
+
+
+def obtener_series(base_dir):
+    clave = os.path.realpath(base_dir)
+    with _series_lock:
+        if clave not in _series:
+            _series[clave] = SeriesHistoricas(base_dir)
+        return _series[clave]
+
+
+@al_registrar
+def actualizar_series(catalogo, entrada, df):
+    if df is not None:
+        obtener_series(catalogo.base_dir).registrar(entrada, df)
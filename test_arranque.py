@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import pandas as pd
+import arranque
+from catalogo import obtener_catalogo, registrar_reporte
+from reportes import leer_resumen
+
+
+def _reporte(directorio, nombre, df):
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / nombre
+    df.to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_instantanea_del_ultimo_reporte(tmp_path):
+    df = pd.DataFrame({
+        "tipo_decision": ["Obra Pública / Contratos", "No identificado"],
+        "indice_fenomeno_corruptivo": [8.5, 0.0],
+        "nivel_riesgo_teorico": ["Alto", "Bajo"],
+    })
+    ruta = _reporte(tmp_path / "2026-02", "reporte_fenomenos_20260217_114746.csv", df)
+    entrada = registrar_reporte(ruta, str(tmp_path), filas=2, df=df)
+
+    datos = arranque.leer_instantanea(str(tmp_path), entrada)
+    assert datos["filas"] == 2
+    assert datos["resumen"] == leer_resumen(ruta)
+    tabla = arranque.leer_tabla(str(tmp_path))
+    assert tabla["tipo_decision"].dtype == "category"  # se guarda ya compactada
+    pd.testing.assert_frame_equal(tabla.astype(object), df.astype(object))
+
+    # Un reporte más viejo registrado después no reemplaza la instantánea
+    viejo = _reporte(tmp_path / "2026-01", "reporte_fenomenos_20260121.csv", df.head(1))
+    registrar_reporte(viejo, str(tmp_path), filas=1, df=df.head(1))
+    assert arranque.leer_instantanea(str(tmp_path), obtener_catalogo(str(tmp_path)).ultimo())["filas"] == 2
+
+    # Si el reporte cambió (otro mtime) la instantánea ya no vale
+    assert arranque.leer_instantanea(str(tmp_path), {**entrada, "mtime": entrada["mtime"] + 1}) is None
+
+
+def test_lectores_de_reportes_no_importan_pandas_al_cargarse():
+    codigo = "import sys, reportes, filas_reporte; print('pandas' in sys.modules)"
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == "False"
+
+    pd_perezoso = arranque.modulo_perezoso("pandas")
+    assert pd_perezoso.DataFrame is pd.DataFrame
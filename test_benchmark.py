@@ -0,0 +1,25 @@
+import json
+import benchmark
+
+
+def test_corpus_sintetico_es_reproducible():
+    a = benchmark.generar_corpus(300, semilla=7)
+    b = benchmark.generar_corpus(300, semilla=7)
+    assert len(a) == 300
+    assert a.equals(b)
+    assert a["nro_proceso"].is_unique
+
+
+def test_corrida_minima_guarda_json_comparable(tmp_path):
+    salida = str(tmp_path / "resultado.json")
+    benchmark.main([
+        "--filas", "200", "--reportes", "3", "--repeticiones", "1",
+        "--casos", "normalizacion,carga", "--salida", salida,
+    ])
+    with open(salida, encoding="utf-8") as f:
+        documento = json.load(f)
+
+    casos = {c["caso"] for c in documento["casos"]}
+    assert {"limpiar_texto_curado_frio", "buscar_todos_los_xlsx_frio", "cargar_ultimo_reporte_columnar"} <= casos
+    assert all(c["min_s"] >= 0 for c in documento["casos"])
+    assert len(benchmark.comparar(documento, documento)) == len(documento["casos"])
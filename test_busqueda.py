@@ -0,0 +1,44 @@
+import pandas as pd
+from busqueda import IndiceBusqueda
+from catalogo import obtener_catalogo, registrar_reporte
+
+
+def _reporte(directorio, nombre, filas):
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / nombre
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_busqueda_incremental_con_fechas_y_fragmentos(tmp_path):
+    # Reporte histórico: se indexa la primera vez que se busca
+    _reporte(tmp_path / "2026-01", "reporte_fenomenos_20260121.csv", {
+        "nro_proceso": ["A-1", "A-2"],
+        "detalle": ["Concesión del peaje de la ruta 7", "Compra de resmas"],
+        "tipo_decision": ["Privatización / Concesión", "No identificado"],
+        "indice_total": [9, 0],
+    })
+    obtener_catalogo(str(tmp_path))
+    indice = IndiceBusqueda(str(tmp_path))
+
+    # Reporte nuevo: llega por el registro incremental
+    df = pd.DataFrame({
+        "nro_proceso": ["B-1"],
+        "detalle": ["Licitación pública para la concesion de servicios"],
+        "tipo_decision": ["Privatización / Concesión"],
+        "indice_fenomeno_corruptivo": [9.0],
+    })
+    ruta = _reporte(tmp_path / "2026-03", "reporte_fenomenos_20260310_101010.csv", df)
+    registrar_reporte(ruta, str(tmp_path), filas=1, df=df)
+
+    todos = indice.buscar("CONCESION")
+    assert todos["total"] == 2
+    assert {r["nro_proceso"] for r in todos["resultados"]} == {"A-1", "B-1"}
+    assert any("<mark>" in r["fragmento"] for r in todos["resultados"])
+
+    recientes = indice.buscar("concesion", desde="2026-03-01")
+    assert [r["nro_proceso"] for r in recientes["resultados"]] == ["B-1"]
+    assert recientes["resultados"][0]["fecha"] == "2026-03-10"
+
+    # Sintaxis FTS5 inválida: se busca literal en lugar de fallar
+    assert indice.buscar('"peaje')["total"] == 1
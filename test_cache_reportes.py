@@ -0,0 +1,66 @@
+import threading
+import time
+import pandas as pd
+from cache_reportes import CacheReportes, tamano_en_memoria
+
+
+def _df(n):
+    return pd.DataFrame({"nro_proceso": [f"P-{i:05d}" for i in range(n)], "indice": [float(i) for i in range(n)]})
+
+
+def test_lru_con_presupuesto_e_invalidacion_por_mtime():
+    a, b, c = _df(100), _df(100), _df(100)
+    cache = CacheReportes(max_bytes=2 * tamano_en_memoria(a) + 10)
+    cargas = []
+
+    def cargar(entrada):
+        cargas.append(entrada["id"])
+        return {"a": a, "b": b, "c": c}[entrada["id"]]
+
+    cache.obtener({"id": "a", "mtime": 1}, cargar)
+    cache.obtener({"id": "b", "mtime": 1}, cargar)
+    assert cache.obtener({"id": "a", "mtime": 1}, cargar) is a  # "a" pasa a ser el más reciente
+    cache.obtener({"id": "c", "mtime": 1}, cargar)               # desaloja "b"
+    assert cache.buscar({"id": "b", "mtime": 1}) is None
+    assert cache.buscar({"id": "a", "mtime": 1}) is a
+
+    # El reporte se reescribió: otro mtime obliga a leerlo de nuevo
+    cache.obtener({"id": "a", "mtime": 2}, cargar)
+    assert cargas == ["a", "b", "c", "a"]
+
+    stats = cache.estadisticas()
+    assert (stats["entradas"], stats["desalojos"], stats["invalidaciones"]) == (2, 1, 1)
+    assert (stats["aciertos"], stats["fallos"]) == (2, 5)
+    assert stats["bytes"] <= stats["max_bytes"]
+
+    # Un reporte que no entra en el presupuesto se devuelve sin guardarlo
+    grande = _df(1000)
+    assert cache.obtener({"id": "grande", "mtime": 1}, lambda e: grande) is grande
+    assert cache.buscar({"id": "grande", "mtime": 1}) is None
+
+    cache.invalidar()
+    assert cache.estadisticas()["entradas"] == 0 and cache.bytes == 0
+
+
+def test_cargas_simultaneas_leen_una_sola_vez():
+    cache = CacheReportes(max_bytes=10 ** 8)
+    cargas = []
+
+    def cargar(entrada):
+        cargas.append(1)
+        time.sleep(0.1)
+        return _df(10)
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener({"id": "x", "mtime": 1}, cargar)))
+             for _ in range(5)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert cargas == [1]
+    assert all(r is resultados[0] for r in resultados)
+    stats = cache.estadisticas()
+    assert stats["aciertos"] + stats["fallos"] == 5  # los contadores no pierden incrementos
+    assert cache._locks == {}  # el lock de carga se descarta al terminar
@@ -0,0 +1,79 @@
+import threading
+import time
+from cache_respuestas import CACHE_CONTROL, CacheRespuestas, calcular_etag, encabezados, etag_coincide
+
+
+def test_etag_debil_y_if_none_match():
+    etag = calcular_etag("reporte_20260307", 1.5, "matriz-v1")
+    assert etag.startswith('W/"')
+    assert etag_coincide(etag, etag)
+    assert etag_coincide(f'"otro", {etag.removeprefix("W/")}', etag)
+    assert etag_coincide("*", etag)
+    assert not etag_coincide(None, etag)
+    assert etag != calcular_etag("reporte_20260308", 1.5, "matriz-v1")
+
+
+def test_fallos_simultaneos_calculan_una_sola_vez():
+    cache = CacheRespuestas()
+    llamadas = []
+
+    def producir():
+        llamadas.append(1)
+        time.sleep(0.1)
+        return b"render"
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener("/", "v1", producir))) for _ in range(5)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert llamadas == [1]
+    assert resultados == [("v1", b"render")] * 5
+
+    # Los contadores se incrementan bajo lock: con muchos hilos no se pierde ninguno
+    def consultar():
+        for _ in range(2000):
+            cache.obtener("/", "v1", producir)
+    hilos = [threading.Thread(target=consultar) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    stats = cache.estadisticas()
+    assert (stats["aciertos"] + stats["fallos"], stats["fallos"]) == (5 + 8 * 2000, 1)
+
+
+def test_sirve_version_anterior_mientras_otro_hilo_recalcula():
+    cache = CacheRespuestas()
+    cache.obtener("/", "v1", lambda: b"viejo")
+    empezo = threading.Event()
+
+    def producir_lento():
+        empezo.set()
+        time.sleep(0.2)
+        return b"nuevo"
+
+    hilo = threading.Thread(target=cache.obtener, args=("/", "v2", producir_lento))
+    hilo.start()
+    empezo.wait(1)
+
+    assert cache.obtener("/", "v2", producir_lento) == ("v1", b"viejo")
+    hilo.join()
+    assert cache.obtener("/", "v2", producir_lento) == ("v2", b"nuevo")
+    assert cache.estadisticas()["obsoletos"] == 1
+
+
+def test_version_anterior_se_sirve_sin_el_etag_nuevo():
+    cache = CacheRespuestas()
+    cache.obtener("/", 'W/"v1"', lambda: b"viejo")
+
+    # Otro hilo "está recalculando": tiene tomado el lock de la clave
+    with cache._lock_de("/"):
+        version, cuerpo = cache.obtener("/", 'W/"v2"', lambda: b"nuevo")
+
+    assert (version, cuerpo) == ('W/"v1"', b"viejo")
+    headers = encabezados('W/"v2"', version)
+    assert "ETag" not in headers and headers["Cache-Control"] == "no-store"
+    assert encabezados('W/"v2"', 'W/"v2"') == {"ETag": 'W/"v2"', "Cache-Control": CACHE_CONTROL}
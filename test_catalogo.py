@@ -0,0 +1,122 @@
+import os
+import pandas as pd
+from catalogo import CatalogoReportes, registrar_reporte, obtener_catalogo
+
+
+def _crear_reporte(directorio, nombre, filas=3):
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, nombre)
+    pd.DataFrame({
+        "detalle": ["x"] * filas,
+        "indice_fenomeno_corruptivo": [0.0] * filas,
+    }).to_csv(ruta, index=False)
+    return ruta
+
+
+def test_reconstruccion_ordena_por_fecha_del_nombre(tmp_path):
+    _crear_reporte(tmp_path / "2026-02", "reporte_fenomenos_20260202.csv")
+    _crear_reporte(tmp_path / "2026-01", "reporte_fenomenos_20260131.csv", filas=5)
+    _crear_reporte(tmp_path / "2026-02", "reporte_fenomenos_20260217_103807.csv")
+
+    catalogo = CatalogoReportes(str(tmp_path))
+    ids = [e["id"] for e in catalogo.listar()]
+
+    assert ids == [
+        "2026-02_reporte_fenomenos_20260217_103807",
+        "2026-02_reporte_fenomenos_20260202",
+        "2026-01_reporte_fenomenos_20260131",
+    ]
+    antiguo = catalogo.obtener("2026-01_reporte_fenomenos_20260131")
+    assert antiguo["mes"] == "2026-01"
+    assert antiguo["filas"] == 5
+    assert antiguo["esquema"] == 2
+    assert os.path.exists(tmp_path / "catalogo_reportes.json")
+
+
+def test_registro_actualiza_ultimo_sin_recorrer_directorio(tmp_path):
+    _crear_reporte(tmp_path / "2026-01", "reporte_fenomenos_20260131.csv")
+    catalogo = obtener_catalogo(str(tmp_path))
+    assert catalogo.total() == 1
+
+    ruta = _crear_reporte(tmp_path / "2026-03", "reporte_fenomenos_20260307_102336.csv", filas=1)
+    registrar_reporte(ruta, str(tmp_path), filas=1)
+
+    assert catalogo.ultimo()["id"] == "2026-03_reporte_fenomenos_20260307_102336"
+    assert catalogo.total() == 2
+
+    # Otra instancia (otro proceso) lee el mismo catálogo desde disco
+    otro = CatalogoReportes(str(tmp_path))
+    assert otro.ultimo()["archivo"] == "2026-03/reporte_fenomenos_20260307_102336.csv"
+
+
+def test_detecta_reportes_agregados_movidos_o_borrados_a_mano(tmp_path):
+    viejo = _crear_reporte(tmp_path / "2026-01", "reporte_fenomenos_20260131.csv")
+    nuevo = _crear_reporte(tmp_path / "2026-02", "reporte_fenomenos_20260202.csv")
+    catalogo = obtener_catalogo(str(tmp_path))
+    assert catalogo.ultimo()["id"] == "2026-02_reporte_fenomenos_20260202"
+
+    # Borrado sin pasar por el catálogo: ultimo() no devuelve un archivo inexistente
+    os.remove(nuevo)
+    assert catalogo.ultimo()["id"] == "2026-01_reporte_fenomenos_20260131"
+
+    # Copiado a una carpeta nueva y movido de carpeta, sin registrar_reporte
+    _crear_reporte(tmp_path / "2026-03", "reporte_fenomenos_20260301.csv", filas=4)
+    os.makedirs(tmp_path / "archivo")
+    os.replace(viejo, tmp_path / "archivo" / "reporte_fenomenos_20260131.csv")
+    ids = [e["id"] for e in catalogo.listar()]
+    assert ids == ["2026-03_reporte_fenomenos_20260301", "archivo_reporte_fenomenos_20260131"]
+    assert catalogo.obtener("2026-03_reporte_fenomenos_20260301")["filas"] == 4
+    assert catalogo.obtener("2026-01_reporte_fenomenos_20260131") is None
+
+    # Otro proceso arranca con el catálogo ya al día
+    assert [e["id"] for e in CatalogoReportes(str(tmp_path)).listar()] == ids
+
+
+def test_registros_concurrentes_de_varios_procesos_no_se_pisan(tmp_path):
+    import subprocess
+    import sys
+    codigo = (
+        "import sys, pandas as pd; from catalogo import registrar_reporte\n"
+        "base, proceso = sys.argv[1], sys.argv[2]\n"
+        "for i in range(15):\n"
+        "    ruta = f'{base}/2026-04/reporte_fenomenos_202604{i + 1:02d}_{proceso}0000{i:02d}.csv'\n"
+        "    pd.DataFrame({'detalle': ['x']}).to_csv(ruta, index=False)\n"
+        "    registrar_reporte(ruta, base, filas=1, proceso=proceso)\n"
+    )
+    os.makedirs(tmp_path / "2026-04")
+    CatalogoReportes(str(tmp_path)).total()  # catálogo vacío ya creado
+    procesos = [subprocess.Popen([sys.executable, "-c", codigo, str(tmp_path), str(p)]) for p in (1, 2, 3)]
+    assert all(p.wait(timeout=120) == 0 for p in procesos)
+
+    import json
+    with open(tmp_path / "catalogo_reportes.json", encoding="utf-8") as f:
+        reportes = json.load(f)["reportes"]
+    # Los datos de cada alta (no sólo el archivo, que se redescubre) sobreviven
+    assert sorted(r.get("proceso") for r in reportes) == sorted(["1", "2", "3"] * 15)
+
+
+def test_un_reporte_en_xlsx_y_csv_se_cataloga_una_sola_vez(tmp_path):
+    from reportes import EscritorReporte
+    os.makedirs(tmp_path / "2026-05")
+    base = str(tmp_path / "2026-05" / "reporte_fenomenos_20260501_101010")
+    with EscritorReporte(base, "xlsx,csv") as escritor:
+        escritor.agregar(pd.DataFrame({"detalle": ["x", "y"], "indice_fenomeno_corruptivo": [1.0, 0.0]}))
+        escritor.cerrar()
+    catalogo = obtener_catalogo(str(tmp_path))
+    assert registrar_reporte(base + ".csv", str(tmp_path), filas=2)["archivo"].endswith(".xlsx")
+    registrar_reporte(base + ".xlsx", str(tmp_path), filas=2)
+
+    # Otro reporte en la carpeta obliga a volver a listarla: la entrada sigue siendo el .xlsx
+    _crear_reporte(tmp_path / "2026-05", "reporte_fenomenos_20260502.csv")
+    entradas = {e["id"]: e["archivo"] for e in catalogo.listar()}
+    assert entradas == {
+        "2026-05_reporte_fenomenos_20260501_101010": "2026-05/reporte_fenomenos_20260501_101010.xlsx",
+        "2026-05_reporte_fenomenos_20260502": "2026-05/reporte_fenomenos_20260502.csv",
+    }
+    assert {e["id"]: e["archivo"] for e in CatalogoReportes(str(tmp_path)).listar()} == entradas
+    os.remove(tmp_path / "catalogo_reportes.json")
+    assert {e["id"]: e["archivo"] for e in CatalogoReportes(str(tmp_path)).listar()} == entradas
+
+    # Sin el .xlsx el reporte sigue disponible desde el .csv
+    os.remove(base + ".xlsx")
+    assert catalogo.obtener("2026-05_reporte_fenomenos_20260501_101010")["archivo"].endswith(".csv")
@@ -0,0 +1,69 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import cliente_http
+
+
+class _FeedRSS(BaseHTTPRequestHandler):
+    pedidos = []
+
+    def do_GET(self):
+        _FeedRSS.pedidos.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        cuerpo = "<rss><item><title>Licitación</title></item></rss>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_segundo_pedido_es_condicional_y_sale_del_disco(tmp_path, monkeypatch):
+    monkeypatch.setattr(cliente_http, "cache_http", cliente_http.CacheHTTP(str(tmp_path)))
+    servidor = HTTPServer(("127.0.0.1", 0), _FeedRSS)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_port}/rss/3"
+    try:
+        primera = cliente_http.get_condicional(url, timeout=5)
+        segunda = cliente_http.get_condicional(url, timeout=5)
+    finally:
+        servidor.shutdown()
+
+    assert _FeedRSS.pedidos == [None, '"v1"']
+    assert not primera.desde_cache
+    assert segunda.desde_cache
+    assert segunda.status_code == 200
+    assert segunda.text == primera.text
+    assert "Licitación" in segunda.text
+
+
+class _Respuesta:
+    def __init__(self, cuerpo, etag):
+        self.content = cuerpo
+        self.encoding = "utf-8"
+        self.headers = {"ETag": etag}
+
+
+def test_copia_incompleta_es_un_fallo_y_el_cache_respeta_su_tamano(tmp_path):
+    cache = cliente_http.CacheHTTP(str(tmp_path), max_bytes=2500)
+    cache.guardar("https://fuente.test/a", _Respuesta(b"a" * 1000, '"a"'))
+
+    # Sin metadatos no hay validadores ni respuesta guardada (se pide entera de nuevo)
+    os.remove(cache._rutas("https://fuente.test/a")[0])
+    assert cache.validadores("https://fuente.test/a") == {}
+    assert cache.respuesta_guardada("https://fuente.test/a", None) is None
+
+    for i, url in enumerate(("https://fuente.test/b", "https://fuente.test/c", "https://fuente.test/d")):
+        cache.guardar(url, _Respuesta(b"x" * 1000, f'"{i}"'))
+    # Se desalojan las entradas más viejas hasta quedar bajo el máximo
+    assert cache.desalojos >= 1
+    tamanos = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(tmp_path) for f in fs)
+    assert tamanos <= 2500
+    assert cache.validadores("https://fuente.test/d") == {"If-None-Match": '"2"'}
@@ -0,0 +1,32 @@
+import asyncio
+import time
+import pandas as pd
+import diario
+
+
+def _fuente(resultado, demora=0.0):
+    def funcion():
+        time.sleep(demora)
+        return pd.DataFrame({"detalle": [resultado]}) if resultado else pd.DataFrame()
+    return funcion
+
+
+def test_concurrente_respeta_prioridad_aunque_otra_fuente_responda_antes():
+    fuentes = [
+        ("primera", _fuente("prioritaria", 0.3), 5),
+        ("segunda", _fuente("rapida"), 5),
+    ]
+    df = asyncio.run(diario.extraer_licitaciones_async(fuentes))
+    assert df["detalle"].tolist() == ["prioritaria"]
+
+
+def test_concurrente_acota_el_tiempo_por_el_plazo_y_no_por_la_suma():
+    fuentes = [
+        ("colgada", _fuente("tarde", 5), 0.3),
+        ("vacia", _fuente(None), 5),
+        ("util", _fuente("ok", 0.2), 5),
+    ]
+    inicio = time.perf_counter()
+    df = asyncio.run(diario.extraer_licitaciones_async(fuentes))
+    assert df["detalle"].tolist() == ["ok"]
+    assert time.perf_counter() - inicio < 2
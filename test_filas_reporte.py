@@ -0,0 +1,81 @@
+import io
+import json
+import pandas as pd
+from filas_reporte import a_csv, a_ndjson, consultar_filas, filas_a_registros, iterar_filas
+from reportes import compactar, escribir_columnar
+
+NIVELES = ["Alto", "Medio", "Bajo"]
+
+
+def _reporte(tmp_path, n=2500, columnar=True):
+    df = pd.DataFrame({
+        "nro_proceso": [f"P-{i:05d}" for i in range(n)],
+        "detalle": [f"Licitación {i}" if i % 5 == 0 else f"Compra {i}" for i in range(n)],
+        "tipo_decision": ["Obra Pública / Contratos" if i % 2 else "No identificado" for i in range(n)],
+        "indice_fenomeno_corruptivo": [float(i % 10) for i in range(n)],
+        "nivel_riesgo_teorico": [NIVELES[i % 3] for i in range(n)],
+    })
+    ruta = tmp_path / "reporte_fenomenos_20260301.csv"
+    df.to_csv(ruta, index=False)
+    if columnar:
+        escribir_columnar(df, str(ruta))
+    return str(ruta), df
+
+
+def _esperado(df, orden_desc=True):
+    mascara = (df["nivel_riesgo_teorico"] == "Alto") & (df["indice_fenomeno_corruptivo"] >= 3)
+    return df[mascara].sort_values("indice_fenomeno_corruptivo", ascending=not orden_desc, kind="stable")
+
+
+def test_keyset_recorre_todas_las_filas_filtradas_en_orden(tmp_path, monkeypatch):
+    import reportes
+    monkeypatch.setattr(reportes, "FILAS_POR_BLOQUE", 300)
+    ruta, df = _reporte(tmp_path)
+    filtros = {"nivel": "Alto", "indice_min": 3}
+    esperado = _esperado(df)["nro_proceso"].tolist()
+
+    vistos, cursor = [], None
+    while True:
+        pagina = consultar_filas(ruta, filtros, "-indice_fenomeno_corruptivo", limite=97, despues=cursor)
+        assert pagina["total"] == len(esperado)
+        vistos += pagina["filas"]["nro_proceso"].tolist()
+        cursor = pagina["siguiente"]
+        if cursor is None:
+            break
+    assert vistos == esperado
+
+
+def test_offset_texto_y_columnas(tmp_path):
+    ruta, df = _reporte(tmp_path, columnar=False)
+    pagina = consultar_filas(ruta, {"texto": "LICITACION"}, "nro_proceso", limite=10, offset=20,
+                             columnas=["nro_proceso", "detalle"])
+    esperado = df[df["detalle"].str.startswith("Licitación")]
+    assert pagina["total"] == len(esperado)
+    assert list(pagina["filas"].columns) == ["nro_proceso", "detalle"]
+    assert pagina["filas"]["nro_proceso"].tolist() == esperado["nro_proceso"].iloc[20:30].tolist()
+
+
+def test_exportacion_ndjson_y_csv(tmp_path):
+    ruta, df = _reporte(tmp_path)
+    filtros = {"nivel": "Alto", "indice_min": 3}
+
+    lineas = "".join(a_ndjson(iterar_filas(ruta, filtros))).splitlines()
+    assert [json.loads(l)["nro_proceso"] for l in lineas] == _esperado(df).sort_index()["nro_proceso"].tolist()
+
+    csv = "".join(a_csv(iterar_filas(ruta, filtros, "-indice_fenomeno_corruptivo", ["nro_proceso"])))
+    assert pd.read_csv(io.StringIO(csv))["nro_proceso"].tolist() == _esperado(df)["nro_proceso"].tolist()
+
+
+def test_reporte_en_memoria_da_lo_mismo_que_el_archivo(tmp_path):
+    ruta, df = _reporte(tmp_path)
+    compacto = compactar(df, {"nivel_riesgo_teorico": ["Bajo", "Medio", "Alto"]})
+    filtros = {"nivel": "Alto", "texto": "compra"}
+
+    desde_archivo = consultar_filas(ruta, filtros, "-indice_fenomeno_corruptivo", limite=50, offset=10)
+    en_memoria = consultar_filas(ruta, filtros, "-indice_fenomeno_corruptivo", limite=50, offset=10, df=compacto)
+    assert en_memoria["total"] == desde_archivo["total"]
+    assert en_memoria["siguiente"] == desde_archivo["siguiente"]
+    assert filas_a_registros(en_memoria["filas"]) == filas_a_registros(desde_archivo["filas"])
+
+    csv = "".join(a_csv(iterar_filas(ruta, filtros, "nro_proceso", ["nro_proceso", "nivel_riesgo_teorico"], df=compacto)))
+    assert csv == "".join(a_csv(iterar_filas(ruta, filtros, "nro_proceso", ["nro_proceso", "nivel_riesgo_teorico"])))
@@ -0,0 +1,82 @@
+import copy
+import json
+import os
+import pandas as pd
+import pytest
+import matriz
+from analisis import MATRIZ_TEORICA
+
+
+def _escribir(ruta, categorias, version="x"):
+    ruta.write_text(json.dumps({"version": version, "categorias": categorias}, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def archivo_matriz(tmp_path, monkeypatch):
+    ruta = tmp_path / "matriz_teorica.json"
+    _escribir(ruta, MATRIZ_TEORICA)
+    monkeypatch.setattr(matriz, "ARCHIVO_MATRIZ", str(ruta))
+    monkeypatch.setattr(matriz, "_actual", None)
+    monkeypatch.setattr(matriz, "_mtime", None)
+    import analisis
+    monkeypatch.setattr(analisis, "DATA_DIR", str(tmp_path / "data"))
+    yield ruta
+    # analisis vuelve a la matriz del repo para los demás tests
+    monkeypatch.undo()
+    analisis.matriz_vigente()
+
+
+def test_recarga_en_caliente_y_mantiene_la_anterior_si_es_invalida(archivo_matriz, tmp_path):
+    import analisis
+
+    inicial = matriz.vigente()
+    assert matriz.vigente() is inicial  # sin cambios no se recompila
+
+    nuevas = copy.deepcopy(MATRIZ_TEORICA)
+    nuevas["Salarios y Paritarias"]["keywords"].append("bono docente")
+    _escribir(archivo_matriz, nuevas, "2026.2")
+    os.utime(archivo_matriz, (1, 1))
+    recargada = analisis.matriz_vigente()
+    assert recargada.version != inicial.version and recargada.etiqueta == "2026.2"
+    assert analisis.VERSION_MATRIZ == recargada.version
+    df, _, _ = analisis.analizar_boletin(pd.DataFrame({"detalle": ["Bono docente"]}), str(tmp_path),
+                                         formatos="csv", incremental=False, en_segundo_plano=True)
+    assert df["tipo_decision"].tolist() == ["Salarios y Paritarias"]
+    assert df["version_matriz"].tolist() == [recargada.version]
+
+    analisis.esperar_persistencia(timeout=30)
+    assert matriz.leer_historial(recargada.version, str(tmp_path)) == nuevas  # archivada junto al reporte
+    assert not os.path.exists(tmp_path / "data" / matriz.DIRECTORIO_HISTORIAL)
+
+    archivo_matriz.write_text("{no es json", encoding="utf-8")
+    os.utime(archivo_matriz, (2, 2))
+    assert matriz.vigente() is recargada
+    analisis.esperar_persistencia(timeout=30)
+
+
+def test_diferencia_marca_solo_las_filas_que_pueden_cambiar():
+    nuevas = copy.deepcopy(MATRIZ_TEORICA)
+    nuevas["Tarifas Servicios Públicos"]["keywords"].remove("peaje")
+    nuevas["Traslado de Impuestos"]["peso"] = 1.0
+    dif = matriz.diferencia(MATRIZ_TEORICA, nuevas)
+
+    assert dif == {"keywords": ["peaje"], "orden": False, "ponderacion": ["Traslado de Impuestos"]}
+    textos = ["aumento del peaje", "licitacion de obra", "iva"]
+    assert matriz.filas_afectadas(textos, [None] * 3, dif) == [True, False, False]
+
+    invertidas = dict(reversed(list(MATRIZ_TEORICA.items())))
+    assert matriz.huella(invertidas) != matriz.huella(MATRIZ_TEORICA)
+    dif = matriz.diferencia(MATRIZ_TEORICA, invertidas)
+    assert dif["keywords"] == [] and dif["orden"]
+    assert matriz.filas_afectadas(textos, ["A; B", "A", None], dif) == [True, False, False]
+
+
+def test_keywords_con_mayusculas_o_acentos_se_rechazan():
+    datos = {"keywords": ["Licitación Pública"], "transferencia": "Estado a Empresas", "peso": 8.5}
+    with pytest.raises(ValueError, match="'licitacion publica'"):
+        matriz.Matriz({"Obra": datos})
+
+    normalizada = matriz.Matriz({"Obra": {**datos, "keywords": ["licitacion publica"]}})
+    from analisis import limpiar_texto_curado
+    texto = limpiar_texto_curado("LICITACIÓN PÚBLICA Nº 12")
+    assert [c.categoria for c in normalizada.automata.buscar(texto)] == ["Obra"]
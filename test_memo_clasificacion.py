@@ -0,0 +1,31 @@
+from memo_clasificacion import MemoClasificacion
+
+
+def _resultado(categoria):
+    return {"categoria": categoria, "categorias": [categoria], "palabras": [], "conteo": {}, "evidencia": ""}
+
+
+def test_dos_niveles_con_limites_y_estadisticas(tmp_path):
+    memo = MemoClasificacion(str(tmp_path), max_memoria=2, max_disco=10)
+    memo.guardar({"a": _resultado("A"), "b": _resultado("B"), "c": _resultado("C")}, "v1")
+    assert memo.estadisticas()["en_memoria"] == 2  # LRU acotado: "a" quedó sólo en disco
+
+    assert memo.obtener(["c", "a", "z"], "v1") == {"c": _resultado("C"), "a": _resultado("A")}
+    assert memo.obtener(["a"], "v2") == {}  # otra versión de la matriz no sirve
+    stats = memo.estadisticas()
+    assert (stats["aciertos_memoria"], stats["aciertos_disco"], stats["fallos"]) == (1, 1, 2)
+
+    # Otro proceso (memo nuevo) lo encuentra en disco
+    otro = MemoClasificacion(str(tmp_path), max_memoria=2, max_disco=10)
+    assert otro.obtener(["b"], "v1") == {"b": _resultado("B")}
+    assert otro.estadisticas()["aciertos_disco"] == 1
+
+
+def test_disco_descarta_primero_otras_versiones(tmp_path):
+    memo = MemoClasificacion(str(tmp_path), max_memoria=0, max_disco=4)
+    memo.guardar({f"viejo{i}": _resultado("A") for i in range(3)}, "v1")
+    memo.guardar({f"nuevo{i}": _resultado("B") for i in range(3)}, "v2")
+
+    assert memo.total_en_disco() <= 4
+    assert len(memo.obtener([f"nuevo{i}" for i in range(3)], "v2")) == 3
+    assert len(memo.obtener([f"viejo{i}" for i in range(3)], "v1")) < 3
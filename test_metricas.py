@@ -0,0 +1,71 @@
+import json
+import pandas as pd
+import metricas
+from metricas import Registro
+
+
+def test_exposicion_en_formato_prometheus():
+    registro = Registro()
+    peticiones = registro.contador("x_peticiones_total", "Peticiones", ("ruta",))
+    latencia = registro.histograma("x_latencia_segundos", "Latencia", ("ruta",), limites=(0.1, 1))
+    peticiones.inc(ruta='/a"b')
+    peticiones.inc(2, ruta='/a"b')
+    latencia.observar(0.05, ruta="/a")
+    latencia.observar(0.5, ruta="/a")
+    latencia.observar(5, ruta="/a")
+
+    texto = registro.exponer()
+    assert "# TYPE x_peticiones_total counter" in texto
+    assert 'x_peticiones_total{ruta="/a\\"b"} 3' in texto
+    assert 'x_latencia_segundos_bucket{ruta="/a",le="0.1"} 1' in texto
+    assert 'x_latencia_segundos_bucket{ruta="/a",le="1"} 2' in texto
+    assert 'x_latencia_segundos_bucket{ruta="/a",le="+Inf"} 3' in texto
+    assert 'x_latencia_segundos_count{ruta="/a"} 3' in texto
+    assert registro.instantanea()["x_latencia_segundos"] == [{"ruta": "/a", "cuenta": 3, "suma": 5.55}]
+
+
+def test_etapas_de_analisis_y_reintentos_de_fuente(tmp_path, monkeypatch):
+    import diario
+    from analisis import analizar_boletin
+
+    antes = {e: metricas.ETAPA_ANALISIS.resumen(etapa=e)[0] for e in ("normalizacion", "clasificacion", "escritura")}
+    analizar_boletin(pd.DataFrame({"detalle": ["Licitacion publica"], "nro_proceso": ["M-1"]}), str(tmp_path))
+    for etapa, cuenta in antes.items():
+        assert metricas.ETAPA_ANALISIS.resumen(etapa=etapa)[0] == cuenta + 1
+
+    intentos = []
+
+    def _falla_una_vez(url, **kwargs):
+        intentos.append(url)
+        if len(intentos) == 1:
+            raise ConnectionError("caído")
+        respuesta = type("R", (), {"content": b"12345", "desde_cache": False, "raise_for_status": lambda self: None})
+        return respuesta()
+
+    monkeypatch.setattr(diario, "get_condicional", _falla_una_vez)
+    token = diario._fuente_actual.set("prueba")
+    try:
+        diario.get_con_reintentos("https://fuente.test", intentos=2, espera=0)
+    finally:
+        diario._fuente_actual.reset(token)
+    assert metricas.REINTENTOS_FUENTE.valor(fuente="prueba") == 1
+    assert metricas.BYTES_FUENTE.valor(fuente="prueba") == 5
+    assert metricas.PETICIONES_FUENTE.valor(fuente="prueba", resultado="error") == 1
+
+
+def test_linea_json_por_corrida(tmp_path):
+    ruta = tmp_path / "sub" / "metricas.jsonl"
+    metricas.escribir_linea_json(str(ruta), {"duracion_s": 1.5})
+    metricas.escribir_linea_json(str(ruta), {"duracion_s": 2.0})
+    assert [json.loads(l)["duracion_s"] for l in ruta.read_text().splitlines()] == [1.5, 2.0]
+
+
+def test_contador_que_sigue_un_acumulado_externo():
+    registro = Registro()
+    consultas = registro.contador("x_consultas_total", "Consultas", ("cache",))
+    consultas.seguir(5, cache="a")
+    consultas.seguir(8, cache="a")
+    assert consultas.valor(cache="a") == 8
+    consultas.seguir(2, cache="a")  # la fuente se reinició: no retrocede
+    assert consultas.valor(cache="a") == 10
+    assert "# TYPE x_consultas_total counter" in registro.exponer()
@@ -0,0 +1,54 @@
+import re
+import pandas as pd
+from analisis import MATRIZ_TEORICA, analizar_boletin, limpiar_texto_curado
+from motor_clasificacion import AutomataPalabrasClave
+
+TEXTOS = [
+    "Licitación pública para obra pública con redeterminación de precios",
+    "Apruébase el cuadro tarifario del peaje y la revisión tarifaria",
+    "Resolución de privatización con IVA diferencial",
+    "Convenio colectivo y paritaria del sector alimento",
+    "Declaración de interés cultural a la obra de teatro local",
+    "",
+]
+
+
+def _clasificacion_secuencial(texto):
+    # Criterio anterior: una regex por categoría, gana la última que coincide
+    resultado = "No identificado"
+    for categoria, info in MATRIZ_TEORICA.items():
+        if re.search("|".join(info["keywords"]), texto):
+            resultado = categoria
+    return resultado
+
+
+def test_automata_coincide_con_la_aplicacion_secuencial():
+    automata = AutomataPalabrasClave(MATRIZ_TEORICA)
+    for texto in map(limpiar_texto_curado, TEXTOS):
+        esperado = _clasificacion_secuencial(texto)
+        obtenido = automata.clasificar(texto)["categoria"] or "No identificado"
+        assert obtenido == esperado, texto
+
+
+def test_automata_devuelve_todas_las_coincidencias_con_posiciones():
+    automata = AutomataPalabrasClave(MATRIZ_TEORICA)
+    texto = limpiar_texto_curado(TEXTOS[2])
+    r = automata.clasificar(texto)
+
+    # "privatizacion" contiene "iva": ambas coincidencias superpuestas se informan
+    assert r["categorias"] == ["Privatización / Concesión", "Traslado de Impuestos"]
+    for m in r["coincidencias"]:
+        assert texto[m.inicio:m.fin] == m.palabra
+    assert r["conteo"]["Traslado de Impuestos"] == 2
+
+
+def test_analizar_boletin_agrega_columnas_xai_y_conteo(tmp_path):
+    df = pd.DataFrame({"detalle": TEXTOS + [TEXTOS[0]]})
+    df_res, _, df_coincidencias = analizar_boletin(df, str(tmp_path))
+
+    assert df_res.loc[0, "tipo_decision"] == "Obra Pública / Contratos"
+    assert df_res.loc[0, "palabras_clave_detectadas"] == "licitacion; obra publica; redeterminacion"
+    assert df_res.loc[4, "categorias_detectadas"] == ""
+    obra = df_coincidencias.set_index("categoria").loc["Obra Pública / Contratos"]
+    assert obra["filas"] == 2
+    assert obra["coincidencias"] == 6
@@ -0,0 +1,37 @@
+import unicodedata
+import pandas as pd
+from analisis import limpiar_texto_curado, normalizar_textos
+
+
+def _referencia(texto):
+    # Implementación original: NFD completa carácter por carácter
+    if not isinstance(texto, str):
+        return ""
+    texto = texto.lower()
+    return "".join(c for c in unicodedata.normalize("NFD", texto) if unicodedata.category(c) != "Mn")
+
+
+CASOS = [
+    "Licitación Pública N° 12/2026 – Año",
+    "PRIVATIZACIÓN Ñandú Über Çedilla Øre ß",
+    "İstanbul ǅ Ǆ Å (angstrom) Σ final ΟΔΟΣ",
+    "á combinante suelto ệ",
+    "한국어 ﬁ ligadura",
+    "",
+    None,
+    12.5,
+    float("nan"),
+]
+
+
+def test_normalizacion_identica_a_la_original():
+    for caso in CASOS:
+        assert limpiar_texto_curado(caso) == _referencia(caso), repr(caso)
+
+
+def test_normalizacion_por_columna_conserva_indice_y_valores():
+    serie = pd.Series(CASOS * 3, index=range(100, 100 + len(CASOS) * 3), dtype=object)
+    resultado = normalizar_textos(serie)
+
+    assert list(resultado.index) == list(serie.index)
+    assert resultado.tolist() == [_referencia(v) for v in serie]
@@ -0,0 +1,117 @@
+import os
+import pandas as pd
+from analisis import analizar_boletin
+from procesos_vistos import ARRASTRADO, MODIFICADO, NUEVO, hash_contenido, obtener_indice
+
+
+def _boletin(detalles):
+    return pd.DataFrame({
+        "fecha": ["2026-03-01"] * len(detalles),
+        "nro_proceso": [f"P-{i}" for i in range(len(detalles))],
+        "detalle": detalles,
+        "link": ["n/a"] * len(detalles),
+    })
+
+
+def _sin_datos_reales(monkeypatch, tmp_path):
+    """Redirige DATA_DIR y el directorio de respaldo: si algo cae ahí, el test lo ve"""
+    import analisis
+    fuera = tmp_path / "fuera_del_destino"
+    monkeypatch.setattr(analisis, "DATA_DIR", str(fuera))
+    monkeypatch.setattr(analisis, "FALLBACK_DIR", str(fuera))
+    return fuera
+
+
+def test_hash_de_contenido_es_estable():
+    assert hash_contenido("Licitación  Pública", "url") == hash_contenido("licitación pública", "url")
+    assert hash_contenido("Licitación Pública") != hash_contenido("Concesión")
+
+
+def test_segunda_corrida_solo_clasifica_lo_nuevo_o_modificado(tmp_path, monkeypatch):
+    import analisis
+
+    primero = _boletin(["Licitacion publica de obra", "Aumento de tarifa de peaje"])
+    df1, ruta1, _ = analizar_boletin(primero, str(tmp_path))
+    assert df1["estado_proceso"].tolist() == [NUEVO, NUEVO]
+    assert obtener_indice(str(tmp_path)).total() == 2
+
+    clasificados = []
+    original = analisis.AUTOMATA_MATRIZ.clasificar
+    monkeypatch.setattr(analisis.AUTOMATA_MATRIZ, "clasificar", lambda t: clasificados.append(t) or original(t))
+
+    segundo = _boletin(["Licitacion publica de obra", "Paritaria docente", "Venta de pliegos"])
+    df2, ruta2, _ = analizar_boletin(segundo, str(tmp_path))
+
+    assert df2["estado_proceso"].tolist() == [ARRASTRADO, MODIFICADO, NUEVO]
+    assert clasificados == ["paritaria docente", "venta de pliegos"]
+    # La fila arrastrada conserva su clasificación
+    assert df2.loc[0, "tipo_decision"] == df1.loc[0, "tipo_decision"]
+    assert df2.loc[0, "evidencia_xai"] == df1.loc[0, "evidencia_xai"]
+    assert "estado_proceso" in pd.read_excel(ruta2).columns
+
+
+def test_guardado_en_segundo_plano(tmp_path, monkeypatch):
+    import analisis
+    from analisis import esperar_persistencia
+    fuera = _sin_datos_reales(monkeypatch, tmp_path)
+
+    df, guardado, _ = analizar_boletin(_boletin(["Licitacion publica de obra"]), str(tmp_path),
+                                       formatos="csv", en_segundo_plano=True)
+    assert len(df) == 1
+
+    assert esperar_persistencia(timeout=30)
+    ruta = guardado.result()  # la ruta real, conocida recién al terminar
+    assert ruta.endswith(".csv")
+    assert pd.read_csv(ruta)["detalle"].tolist() == ["Licitacion publica de obra"]
+    assert obtener_indice(str(tmp_path)).total() == 1
+
+    # Si no se pudo escribir en ningún formato el Future lo dice (None), no una ruta inventada
+    monkeypatch.setattr(analisis, "guardar_reporte", lambda *a: None)
+    otro = tmp_path / "otro"
+    otro.mkdir()
+    _, guardado, _ = analizar_boletin(_boletin(["Otra licitacion"]), str(otro),
+                                      formatos="csv", en_segundo_plano=True)
+    assert guardado.result(timeout=30) is None
+    assert not [n for n in os.listdir(otro) if n.startswith("reporte_fenomenos")]
+    assert not fuera.exists()
+
+
+def test_analisis_por_bloques_equivale_al_completo(tmp_path, monkeypatch):
+    from analisis import analizar_archivo, analizar_por_bloques
+    fuera = _sin_datos_reales(monkeypatch, tmp_path)
+    from reportes import leer_reporte, leer_resumen
+
+    entrada = tmp_path / "bora.csv"
+    entrada.write_text(
+        "\ufeffFecha,Detalle,Link\n"
+        "20260120,Licitacion publica de obra,l1\n"
+        "20260120,Aumento de tarifa de peaje,l2\n"
+        "20260120,Decreto sin relevancia,l3\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "completo").mkdir()
+    completo, ruta_completo, coincidencias = analizar_boletin(
+        _boletin(["Licitacion publica de obra", "Aumento de tarifa de peaje", "Decreto sin relevancia"]),
+        str(tmp_path / "completo"), incremental=False)
+    assert os.path.dirname(ruta_completo) == str(tmp_path / "completo")
+
+    destino = tmp_path / "bloques"
+    destino.mkdir()
+    filas, ruta, coincidencias_bloques = analizar_archivo(str(entrada), str(destino), filas_por_bloque=2)
+
+    assert filas == 3
+    reporte = leer_reporte(ruta)
+    assert reporte["tipo_decision"].tolist() == completo["tipo_decision"].tolist()
+    assert coincidencias_bloques.equals(coincidencias)
+    assert leer_resumen(ruta)["total"] == 3
+    assert obtener_indice(str(destino)).total() == 3
+
+    # Cortar la iteración no deja archivos a medio escribir ni toca el índice
+    otra = tmp_path / "cortada"
+    otra.mkdir()
+    bloques = analizar_por_bloques(iter([_boletin(["Venta de pliegos"])] * 3), str(otra))
+    next(bloques)
+    bloques.close()
+    assert not [n for n in os.listdir(otra) if n.startswith("reporte_fenomenos")]
+    assert obtener_indice(str(otra)).total() == 0
+    assert not fuera.exists()  # nada se escribió fuera de los destinos pedidos
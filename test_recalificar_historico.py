@@ -0,0 +1,68 @@
+import json
+import os
+import pandas as pd
+from recalificar_historico import ARCHIVO_MANIFIESTO, recalificar_historico
+
+
+def test_recalifica_en_paralelo_combina_y_se_reanuda(tmp_path, capsys):
+    datos = tmp_path / "data"
+    for mes, detalle in [("2026-01", "Licitacion publica de obra"), ("2026-02", "Aumento de tarifa de peaje")]:
+        (datos / mes).mkdir(parents=True)
+        pd.DataFrame({
+            "nro_proceso": ["P-1", "P-2"],
+            "detalle": [detalle, "Decreto sin relevancia"],
+            "tipo_decision": ["No identificado", "No identificado"],
+        }).to_csv(datos / mes / f"reporte_fenomenos_{mes.replace('-', '')}01.csv", index=False)
+    (datos / "2026-02" / "reporte_fenomenos_20260202.csv").write_text("fecha\n2026-02-02\n")
+    salida = tmp_path / "salida"
+
+    combinado = recalificar_historico(str(datos), str(salida), procesos=2, patron="2026-*", formatos="csv,parquet")
+
+    df = pd.read_csv(combinado)
+    assert len(df) == 4
+    assert sorted(df["reporte"].unique()) == ["2026-01_reporte_fenomenos_20260101", "2026-02_reporte_fenomenos_20260201"]
+    assert (df["tipo_decision"] != df["tipo_decision_anterior"]).sum() == 2
+    assert os.path.exists(salida / "2026-01" / "reporte_fenomenos_20260101.parquet")
+    manifiesto = json.loads((salida / ARCHIVO_MANIFIESTO).read_text())
+    assert len(manifiesto["archivos"]) == 2  # el reporte sin 'detalle' queda como error
+
+    # Segunda corrida: sólo se reintenta el que falló
+    capsys.readouterr()
+    recalificar_historico(str(datos), str(salida), procesos=2, patron="2026-*", formatos="csv,parquet")
+    assert "Pendientes: 1" in capsys.readouterr().out
+
+
+def test_recalificacion_dirigida_solo_reclasifica_filas_con_keywords_cambiadas(tmp_path, monkeypatch):
+    import copy
+    import analisis
+    import matriz
+    from recalificar_historico import recalificar_archivo
+
+    datos = tmp_path / "data"
+    datos.mkdir()
+    monkeypatch.setattr(analisis, "DATA_DIR", str(datos))  # nada de esta prueba va a los datos reales
+    df, ruta, _ = analisis.analizar_boletin(
+        pd.DataFrame({"detalle": ["Aumento del peaje", "Licitacion de obra", "Suba del IVA"]}),
+        str(datos), formatos="csv", incremental=False)
+    anterior = analisis.matriz_vigente()
+    assert matriz.leer_historial(anterior.version, str(datos)) == anterior.categorias  # se archivó al escribir
+
+    nuevas = copy.deepcopy(anterior.categorias)
+    nuevas["Tarifas Servicios Públicos"]["keywords"].remove("peaje")
+    nuevas["Traslado de Impuestos"]["peso"] = 1.0
+    monkeypatch.setattr(matriz, "_actual", matriz.Matriz(nuevas, "prueba"))
+    monkeypatch.setattr(matriz, "_mtime", os.path.getmtime(matriz.ARCHIVO_MATRIZ))
+    clasificados = []
+    original = analisis.clasificar_filas
+    monkeypatch.setattr(analisis, "clasificar_filas", lambda d, *a: clasificados.extend(d["detalle"]) or original(d, *a))
+
+    resultado = recalificar_archivo(ruta, str(tmp_path / "salida" / "r"), "csv", directorios=(str(datos),))
+
+    assert clasificados == ["Aumento del peaje"]
+    assert resultado["reclasificadas"] == 1 and resultado["cambios"] == 1
+    nuevo = pd.read_csv(resultado["salida"])
+    assert nuevo["tipo_decision"].tolist() == ["No identificado", "Obra Pública / Contratos", "Traslado de Impuestos"]
+    assert nuevo["indice_fenomeno_corruptivo"].tolist() == [0.0, 8.5, 1.0]
+    assert set(nuevo["version_matriz"]) == {matriz.huella(nuevas)}
+    monkeypatch.undo()
+    analisis.matriz_vigente()
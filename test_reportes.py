@@ -0,0 +1,148 @@
+import os
+import pandas as pd
+import pytest
+import reportes
+from reportes import (
+    EscritorReporte, calcular_resumen, compactar, escribir_columnar, formatos_configurados, leer_reporte,
+    leer_resumen, ruta_columnar, ruta_resumen,
+)
+
+
+def test_lectura_prefiere_copia_columnar_y_proyecta_columnas(tmp_path):
+    ruta = str(tmp_path / "reporte_fenomenos_20260301.xlsx")
+    df = pd.DataFrame({
+        "nro_proceso": [1, "BOL-abc"],
+        "detalle": ["Licitación pública", "Cuadro tarifario"],
+        "indice_fenomeno_corruptivo": [8.5, 7.5],
+    })
+    df.to_excel(ruta, index=False)
+
+    assert escribir_columnar(df, ruta) == ruta_columnar(ruta)
+    # La copia columnar queda más nueva que el Excel: es la que se lee
+    os.utime(ruta_columnar(ruta), None)
+    proyectado = leer_reporte(ruta, ["detalle", "indice_fenomeno_corruptivo", "no_existe"])
+
+    assert list(proyectado.columns) == ["detalle", "indice_fenomeno_corruptivo"]
+    assert proyectado["indice_fenomeno_corruptivo"].tolist() == [8.5, 7.5]
+
+
+def test_copia_columnar_desactualizada_se_ignora(tmp_path):
+    ruta = str(tmp_path / "reporte.csv")
+    pd.DataFrame({"detalle": ["viejo"]}).to_csv(ruta, index=False)
+    escribir_columnar(pd.DataFrame({"detalle": ["viejo"]}), ruta)
+
+    pd.DataFrame({"detalle": ["nuevo"]}).to_csv(ruta, index=False)
+    os.utime(ruta, (os.path.getmtime(ruta_columnar(ruta)) + 10,) * 2)
+
+    assert leer_reporte(ruta, ["detalle"])["detalle"].tolist() == ["nuevo"]
+
+
+def test_resumen_se_calcula_una_vez_y_luego_se_lee_del_disco(tmp_path):
+    ruta = str(tmp_path / "reporte_fenomenos_20260302.csv")
+    pd.DataFrame({
+        "nro_proceso": ["A-1", None, "A-3"],
+        "detalle": ["Licitación", "Peaje", "Otro"],
+        "tipo_decision": ["Obra Pública / Contratos", "Tarifas Servicios Públicos", "No identificado"],
+        "transferencia": ["Estado a Empresas", "Usuarios a Concesionarias", "No identificado"],
+        "indice_fenomeno_corruptivo": [8.5, 7.5, 0.0],
+        "nivel_riesgo_teorico": ["Alto", "Medio", "Bajo"],
+    }).to_csv(ruta, index=False)
+
+    resumen = leer_resumen(ruta)
+    assert os.path.exists(ruta_resumen(ruta))
+    assert resumen["total"] == 3
+    assert resumen["indice_prom"] == 5.33
+    assert resumen["alto_riesgo"] == 1
+    assert resumen["transferencia_counts"]["Estado a Empresas"] == 1
+    assert resumen["tabla"][1]["nro_proceso"] == "n/a"
+
+    os.remove(ruta)
+    assert leer_resumen(ruta) == resumen
+
+
+def test_escritor_por_bloques_en_todos_los_formatos_sin_temporales(tmp_path):
+    base = str(tmp_path / "reporte_fenomenos_20260303")
+    bloques = [
+        pd.DataFrame({"nro_proceso": ["A-1", None], "detalle": ["Licitación", "https://x.gob.ar"], "indice": [8.5, None]}),
+        pd.DataFrame({"nro_proceso": [3], "detalle": ["Peaje"], "indice": [7.5]}),
+    ]
+    with EscritorReporte(base, "xlsx,csv,parquet") as escritor:
+        for bloque in bloques:
+            escritor.agregar(bloque)
+        ruta = escritor.cerrar()
+
+    assert ruta == base + ".xlsx"
+    assert sorted(os.listdir(tmp_path)) == [f"reporte_fenomenos_20260303.{f}" for f in ("csv", "parquet", "xlsx")]
+    for formato in ("xlsx", "csv", "parquet"):
+        df = pd.read_parquet(f"{base}.parquet") if formato == "parquet" else (
+            pd.read_csv(f"{base}.csv") if formato == "csv" else pd.read_excel(f"{base}.xlsx"))
+        assert df["detalle"].tolist() == ["Licitación", "https://x.gob.ar", "Peaje"]
+        assert df["indice"].isna().tolist() == [False, True, False]
+
+
+def test_parquet_excel_y_csv_se_leen_con_los_mismos_tipos(tmp_path):
+    base = str(tmp_path / "reporte_fenomenos_20260304")
+    df = pd.DataFrame({
+        "fecha": ["20260304", "20260304", "20260305"],
+        "nro_proceso": ["12", "0034", "A-3"],
+        "detalle": ["NA", "Peaje", "Otro"],
+        "link": ["", None, "https://x.gob.ar"],
+        "indice_fenomeno_corruptivo": [8, 0, 7],
+    })
+    with EscritorReporte(base, "xlsx,csv,parquet") as escritor:
+        escritor.agregar(df)
+        escritor.cerrar()
+
+    columnar = leer_reporte(base + ".parquet")
+    for formato in ("xlsx", "csv"):
+        os.utime(f"{base}.{formato}", (os.path.getmtime(f"{base}.parquet") + 10,) * 2)  # ignora la copia columnar
+        pd.testing.assert_frame_equal(leer_reporte(f"{base}.{formato}"), columnar)
+        pd.testing.assert_frame_equal(pd.concat(reportes.iterar_reporte(f"{base}.{formato}", filas_por_bloque=2)),
+                                      columnar)
+    assert columnar["indice_fenomeno_corruptivo"].dtype == "float64"
+    assert columnar["nro_proceso"].tolist() == ["12", "0034", "A-3"]  # texto tal cual, sin inferir números
+    assert columnar["detalle"].tolist()[0] == "NA"
+    assert columnar["link"].isna().tolist() == [True, True, False]
+
+
+def test_excel_demasiado_grande_cae_a_csv_desde_la_copia_columnar(tmp_path, monkeypatch):
+    monkeypatch.setattr(reportes, "MAX_FILAS_EXCEL", 2)
+    base = str(tmp_path / "reporte_grande")
+    escritor = EscritorReporte(base, ["xlsx", "parquet"])
+    escritor.agregar(pd.DataFrame({"detalle": ["a", "b", "c"]}))
+
+    assert escritor.cerrar() == base + ".csv"
+    assert not os.path.exists(base + ".xlsx")
+    assert leer_reporte(base + ".csv")["detalle"].tolist() == ["a", "b", "c"]
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+
+
+def test_formatos_invalidos():
+    assert formatos_configurados(" CSV, parquet,csv") == ("csv", "parquet")
+    with pytest.raises(ValueError):
+        formatos_configurados("parquet")
+    with pytest.raises(ValueError):
+        formatos_configurados("xlsx,pdf")
+
+
+def test_compactar_usa_categorias_fijas_y_descarta_transitorias():
+    df = pd.DataFrame({
+        "detalle": ["Obra de pavimento", "Compra de papel", None],
+        "texto_clean": ["obra de pavimento", "compra de papel", ""],
+        "tipo_decision": ["Obra Pública / Contratos", "No identificado", "Categoría histórica"],
+        "nivel_riesgo_teorico": ["Alto", "Bajo", "Bajo"],
+        "fuente": ["Comprar", "Comprar", "BORA"],
+        "indice_fenomeno_corruptivo": [8.5, 0.0, 0.0],
+    })
+    fijos = {"tipo_decision": ["Obra Pública / Contratos", "No identificado"], "nivel_riesgo_teorico": ["Bajo", "Medio", "Alto"]}
+
+    compacto = compactar(df, fijos)
+
+    assert "texto_clean" not in compacto.columns and "texto_clean" in df.columns
+    assert list(compacto["tipo_decision"].cat.categories) == fijos["tipo_decision"] + ["Categoría histórica"]
+    assert list(compacto["nivel_riesgo_teorico"].cat.categories) == ["Bajo", "Medio", "Alto"]
+    assert compacto["fuente"].dtype == "category"
+    assert compacto["detalle"].dtype == "str" and compacto["detalle"].isna().iloc[2]
+    pd.testing.assert_frame_equal(compacto.astype(object), df.drop(columns="texto_clean").astype(object))
+    # Las categorías sin filas no aparecen en el resumen
+    assert calcular_resumen(compacto)["riesgo_counts"] == {"Bajo": 2, "Alto": 1}
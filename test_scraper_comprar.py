@@ -0,0 +1,121 @@
+import threading
+import scraper_comprar
+from scraper_comprar import ParserGrilla, iterar_licitaciones
+
+PAGINAS_TOTALES = 7
+FILAS_POR_PAGINA = 3
+
+
+def _pagina(n):
+    filas = "".join(
+        f"<tr><td>x</td><td>P-{n}-{i}</td><td><a href='/Proceso/{n}{i}'>Licitacion {n}.{i}</a></td>"
+        f"<td>Licitación Pública</td><td>01/03/2026</td></tr>"
+        for i in range(FILAS_POR_PAGINA)
+    )
+    # Paginador con ventana de 3 páginas + "..." como en el GridView de ASP.NET
+    ventana = range(max(1, n - 1), min(PAGINAS_TOTALES, n + 2) + 1)
+    enlaces = "".join(
+        f"<td><span>{p}</span></td>" if p == n else
+        f"<td><a href=\"javascript:__doPostBack('ctl00$CPH1$GridLicitaciones','Page${p}')\">{p}</a></td>"
+        for p in ventana
+    )
+    return (
+        "<html><body><form>"
+        f"<input type='hidden' name='__VIEWSTATE' value='vs{n}'/>"
+        "<table id='ctl00_CPH1_GridLicitaciones'>"
+        "<tr><th>#</th><th>Nro</th><th>Detalle</th><th>Tipo</th><th>Apertura</th></tr>"
+        f"{filas}<tr><td colspan='5'><table><tr>{enlaces}</tr></table></td></tr>"
+        "</table></form></body></html>"
+    ).encode("utf-8")
+
+
+class _Respuesta:
+    encoding = "utf-8"
+    url = "https://comprar.test/"
+
+    def __init__(self, cuerpo):
+        self.cuerpo = cuerpo
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        # Bloques chicos para ejercitar el parseo incremental
+        for i in range(0, len(self.cuerpo), 50):
+            yield self.cuerpo[i:i + 50]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _Sesion:
+    def __init__(self):
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return _Respuesta(_pagina(1))
+
+    def post(self, url, data, **kwargs):
+        with self._lock:
+            self.posts.append((data["__EVENTARGUMENT"], data["__VIEWSTATE"]))
+        return _Respuesta(_pagina(int(data["__EVENTARGUMENT"].split("$")[1])))
+
+
+def test_parser_incremental_ignora_el_paginador_y_lee_campos_ocultos():
+    parser = ParserGrilla("https://comprar.test/")
+    cuerpo = _pagina(1)
+    registros = []
+    for i in range(0, len(cuerpo), 17):
+        registros += parser.feed(cuerpo[i:i + 17])
+    registros += parser.close()
+
+    assert [r["nro_proceso"] for r in registros] == ["P-1-0", "P-1-1", "P-1-2"]
+    assert registros[0]["link"] == "https://comprar.gob.ar/Proceso/10"
+    assert parser.campos == {"__VIEWSTATE": "vs1"}
+    assert parser.paginas == {2, 3}
+    assert parser.destino == "ctl00$CPH1$GridLicitaciones"
+
+
+def test_recorre_todas_las_paginas_con_postbacks(monkeypatch):
+    sesion = _Sesion()
+    monkeypatch.setattr(scraper_comprar, "obtener_sesion", lambda: sesion)
+
+    registros = list(iterar_licitaciones("https://comprar.test/", max_en_vuelo=2))
+
+    assert len(registros) == PAGINAS_TOTALES * FILAS_POR_PAGINA
+    assert {r["nro_proceso"] for r in registros} == {
+        f"P-{n}-{i}" for n in range(1, PAGINAS_TOTALES + 1) for i in range(FILAS_POR_PAGINA)
+    }
+    # Cada página se pide una sola vez, con el estado de la página que la ofrecía
+    pedidas = sorted(int(arg.split("$")[1]) for arg, _ in sesion.posts)
+    assert pedidas == list(range(2, PAGINAS_TOTALES + 1))
+    assert ("Page$2", "vs1") in sesion.posts
+
+
+def test_max_paginas_acota_el_recorrido(monkeypatch):
+    sesion = _Sesion()
+    monkeypatch.setattr(scraper_comprar, "obtener_sesion", lambda: sesion)
+
+    registros = list(iterar_licitaciones("https://comprar.test/", max_paginas=3))
+
+    assert len(registros) == 3 * FILAS_POR_PAGINA
+
+
+def test_el_robot_arma_el_dataframe_por_bloques(monkeypatch):
+    import pandas as pd
+    import diario
+    sesion = _Sesion()
+    monkeypatch.setattr(scraper_comprar, "obtener_sesion", lambda: sesion)
+    monkeypatch.setattr(diario, "FILAS_POR_BLOQUE", 7)  # 21 filas -> 3 bloques
+
+    df = diario.extraer_licitaciones_paginado("https://comprar.test/")
+
+    esperado = pd.DataFrame(list(iterar_licitaciones("https://comprar.test/")))
+    pd.testing.assert_frame_equal(
+        df.sort_values("nro_proceso", ignore_index=True), esperado.sort_values("nro_proceso", ignore_index=True)
+    )
+    assert diario.dataframe_por_bloques(iter([])).empty
@@ -0,0 +1,44 @@
+import pandas as pd
+from catalogo import obtener_catalogo, registrar_reporte
+from series import SeriesHistoricas
+
+
+def _reporte(directorio, nombre, filas):
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / nombre
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def test_serie_diaria_incluye_historicos_y_usa_el_ultimo_reporte_del_dia(tmp_path):
+    # Reporte de esquema 1 (nombres de columna históricos)
+    _reporte(tmp_path / "2026-01", "reporte_fenomenos_20260121.csv", {
+        "tipo_decision": ["No identificado", "Obra Pública / Contratos"],
+        "indice_total": [0, 8],
+        "nivel_riesgo": ["Bajo", "Alto"],
+    })
+    _reporte(tmp_path / "2026-02", "reporte_fenomenos_20260217_103807.csv", {
+        "tipo_decision": ["Obra Pública / Contratos"],
+        "indice_fenomeno_corruptivo": [8.5],
+        "nivel_riesgo_teorico": ["Alto"],
+    })
+    obtener_catalogo(str(tmp_path))
+
+    # Un segundo reporte del mismo día llega por el registro incremental
+    df = pd.DataFrame({
+        "tipo_decision": ["Traslado de Impuestos", "Obra Pública / Contratos"],
+        "transferencia": ["Contribuyentes al Estado", "Estado a Empresas"],
+        "indice_fenomeno_corruptivo": [9.5, 8.5],
+        "nivel_riesgo_teorico": ["Alto", "Alto"],
+    })
+    ruta = _reporte(tmp_path / "2026-02", "reporte_fenomenos_20260217_114746.csv", df)
+    registrar_reporte(ruta, str(tmp_path), filas=2, df=df)
+
+    serie = SeriesHistoricas(str(tmp_path)).consultar(desde="2026-01-01")
+
+    assert [p["fecha"] for p in serie] == ["2026-01-21", "2026-02-17"]
+    assert serie[0]["nivel_riesgo_teorico"]["Alto"] == {"cantidad": 1, "indice_promedio": 8.0}
+    assert serie[1]["total"] == 2
+    assert serie[1]["indice_promedio"] == 9.0
+    assert serie[1]["transferencia"]["Contribuyentes al Estado"]["cantidad"] == 1
+    assert SeriesHistoricas(str(tmp_path)).consultar(hasta="2026-01-31")[0]["total"] == 2
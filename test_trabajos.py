@@ -0,0 +1,52 @@
+import threading
+import time
+from trabajos import GestorTrabajos, COMPLETADO, ERROR
+
+
+def _esperar(trabajo, limite=5):
+    fin = time.time() + limite
+    while trabajo.activo and time.time() < fin:
+        time.sleep(0.01)
+
+
+def test_pedidos_concurrentes_se_adjuntan_al_trabajo_en_curso():
+    gestor = GestorTrabajos()
+    liberar = threading.Event()
+    ejecuciones = []
+
+    def analisis():
+        ejecuciones.append(1)
+        liberar.wait(5)
+        return {"total_procesos": 3}
+
+    primero, nuevo1 = gestor.enviar(analisis)
+    segundo, nuevo2 = gestor.enviar(analisis)
+    liberar.set()
+    _esperar(primero)
+
+    assert (nuevo1, nuevo2) == (True, False)
+    assert segundo is primero
+    assert ejecuciones == [1]
+    assert gestor.obtener(primero.id).a_dict()["resultado"] == {"total_procesos": 3}
+    assert primero.estado == COMPLETADO
+
+    # Terminado el anterior, un nuevo pedido lanza otro trabajo
+    tercero, nuevo3 = gestor.enviar(lambda: None)
+    assert nuevo3 and tercero is not primero
+
+
+def test_error_del_trabajo_conserva_codigo_y_detalle():
+    class SinDatos(Exception):
+        status_code = 404
+        detail = "No se pudieron obtener datos del portal."
+
+    def falla():
+        raise SinDatos()
+
+    gestor = GestorTrabajos()
+    trabajo, _ = gestor.enviar(falla)
+    _esperar(trabajo)
+
+    assert trabajo.estado == ERROR
+    assert trabajo.codigo_error == 404
+    assert trabajo.error == "No se pudieron obtener datos del portal."
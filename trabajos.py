@@ -0,0 +1,94 @@
+"""
+Trabajos en segundo plano
+=========================
+
+Ejecuta tareas largas (scraping + análisis) fuera del request. Hay un solo
+trabajo en curso a la vez: si alguien pide otro mientras tanto, recibe el
+mismo trabajo en vuelo en lugar de lanzar un segundo scraping.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDIENTE = "pendiente"
+EJECUTANDO = "ejecutando"
+COMPLETADO = "completado"
+ERROR = "error"
+
+
+class Trabajo:
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.estado = PENDIENTE
+        self.creado = time.time()
+        self.iniciado = None
+        self.finalizado = None
+        self.resultado = None
+        self.error = None
+        self.codigo_error = None
+
+    @property
+    def activo(self):
+        return self.estado in (PENDIENTE, EJECUTANDO)
+
+    def a_dict(self):
+        fin = self.finalizado or time.time()
+        return {
+            "job_id": self.id,
+            "estado": self.estado,
+            "creado": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.creado)),
+            "duracion_s": round(fin - self.iniciado, 2) if self.iniciado else None,
+            "resultado": self.resultado,
+            "error": self.error,
+            "codigo_error": self.codigo_error,
+        }
+
+
+class GestorTrabajos:
+    """Cola de un solo worker con deduplicación del trabajo en vuelo"""
+
+    def __init__(self, max_historial=20):
+        self.max_historial = max_historial
+        self._lock = threading.Lock()
+        self._trabajos = OrderedDict()
+        self._en_curso = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trabajo")
+
+    def enviar(self, funcion):
+        """Encola funcion(). Devuelve (trabajo, nuevo): nuevo=False si se adjuntó a uno en curso."""
+        with self._lock:
+            if self._en_curso is not None and self._en_curso.activo:
+                return self._en_curso, False
+            trabajo = Trabajo()
+            self._trabajos[trabajo.id] = trabajo
+            while len(self._trabajos) > self.max_historial:
+                self._trabajos.popitem(last=False)
+            self._en_curso = trabajo
+        self._executor.submit(self._ejecutar, trabajo, funcion)
+        return trabajo, True
+
+    def obtener(self, id_trabajo):
+        with self._lock:
+            return self._trabajos.get(id_trabajo)
+
+    def en_curso(self):
+        with self._lock:
+            return self._en_curso if self._en_curso is not None and self._en_curso.activo else None
+
+    def _ejecutar(self, trabajo, funcion):
+        trabajo.estado = EJECUTANDO
+        trabajo.iniciado = time.time()
+        try:
+            trabajo.resultado = funcion()
+            trabajo.estado = COMPLETADO
+        except Exception as e:
+            # HTTPException trae status_code/detail; cualquier otro error es un 500
+            trabajo.codigo_error = getattr(e, "status_code", 500)
+            trabajo.error = str(getattr(e, "detail", None) or e)
+            trabajo.estado = ERROR
+            print(f"❌ Trabajo {trabajo.id} falló: {trabajo.error}")
+        finally:
+            trabajo.finalizado = time.time()